@@ -1,22 +1,37 @@
+import argparse
+import asyncio
 import csv
-import requests
-from bs4 import BeautifulSoup
-import time
+import os
+import urllib.parse
+import aiohttp
 from tqdm import tqdm
+from tqdm.asyncio import tqdm as async_tqdm
+from fetcher import Fetcher
+import telemetry
+from html_parsing import make_soup, FACULTY_RESULTS_STRAINER
 
 # --- Script Overview ---
 # This script scrapes faculty information from the UNT faculty information website.
-# It uses a list of URLs provided in an input CSV file.
+# It scrapes the fixed list of search URLs provided in an input CSV file, or (with --adaptive)
+# finds the search pages to scrape with an adaptive name-prefix search.
 #
 # Step-by-step process:
 # 1. Configuration: Define input/output file names, base URL, and request parameters.
-# 2. Read URLs: Load a list of URLs to scrape from the INPUT_CSV_FILE.
-# 3. Fetch and Parse: For each URL:
+# 2. Plan Searches: Load the URLs from INPUT_CSV_FILE (one per line).
+#    With --adaptive, search every one-letter prefix of SEARCH_ALPHABET instead. A prefix whose
+#    result page is truncated (RESULT_LIMIT results, which must then be set) is expanded by one
+#    letter and searched again, down to MAX_PREFIX_LENGTH letters; every other page already lists
+#    everyone matching its prefix. Each searched prefix, its result count and what was done with
+#    it is written to SEARCH_COVERAGE_FILE.
+# 3. Fetch and Parse: Fetch all URLs concurrently through the shared Fetcher (fetcher.py), which
+#    rate-limits and adapts concurrency per host, up to MAX_CONCURRENT_REQUESTS (or --concurrency)
+#    requests in flight. For each URL:
 #    a. Fetch the HTML content of the page.
-#    b. Parse the HTML to find blocks of faculty data.
+#    b. Parse the HTML (in a worker thread, off the event loop) to find blocks of faculty data.
 #    c. For each faculty member found, extract their name, title, department, college,
 #       and a website link (derived from available course links or profile links).
-# 4. Collect Data: Store unique faculty members' data in a list of dictionaries.
+# 4. Collect Data: Walk the pages in search (or input) order and store unique faculty members' data
+#    in a list of dictionaries, so the output does not depend on fetch completion order.
 # 5. Sort Data: Sort the collected list of faculty members primarily by "College",
 #    then by "Department", then by "Faculty Title", and finally by "Faculty Name".
 # 6. Assign Faculty IDs: Iterate through the sorted list and assign a sequential
@@ -28,30 +43,32 @@ from tqdm import tqdm
 # --- Configuration ---
 INPUT_CSV_FILE = "0_faculty_search_links.csv"      # CSV file containing one URL per line to scrape
 OUTPUT_CSV_FILE = "faculty.csv"       # Output CSV file for faculty data (updated name)
+SEARCH_COVERAGE_FILE = "0_faculty_search_coverage.csv" # Report of every prefix searched by the adaptive search (--adaptive)
 BASE_URL = "https://facultyinfo.unt.edu"         # Base URL for constructing absolute links
+SEARCH_URL = BASE_URL + "/faculty-search?name={}" # Faculty search page for a name prefix
+SEARCH_ALPHABET = "abcdefghijklmnopqrstuvwxyz"   # Letters that prefixes are built from (same as 0_faculty_search_links.csv)
+MAX_PREFIX_LENGTH = 4                            # Truncated prefixes are not expanded beyond this length
+RESULT_LIMIT = None                              # Most results the site shows for one search; required by --adaptive (or --result-limit)
+FAILED_SEARCH_RETRIES = 2                        # Times a failed prefix is searched again before it is reported as failed
 REQUEST_TIMEOUT = 20                             # Seconds to wait for the server to send data
-DELAY_BETWEEN_REQUESTS = 0.05                     # Seconds to wait between fetching different pages
+MAX_CONCURRENT_REQUESTS = 10                     # Most pages in flight at once (can be overridden with --concurrency)
+# Request pacing (rate and adaptive concurrency per host) is configured in fetcher.py.
 # --- End Configuration ---
 
-def fetch_html(url):
-    """Fetches HTML content from a given URL."""
+async def fetch_html(fetcher, url):
+    """Fetches HTML content from a given URL through the shared rate-limited fetcher."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-        return response.text
-    except requests.exceptions.Timeout:
-        print(f"Timeout error fetching {url} after {REQUEST_TIMEOUT} seconds.")
+        return await fetcher.get_text(url, timeout=REQUEST_TIMEOUT) # Raises for HTTP errors (4xx or 5xx)
+    except asyncio.TimeoutError:
+        tqdm.write(f"Timeout error fetching {url} after {REQUEST_TIMEOUT} seconds.")
         return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching {url}: {e}")
+    except aiohttp.ClientError as e:
+        tqdm.write(f"Error fetching {url}: {e}")
         return None
 
 def parse_faculty_data(html_content, base_url):
     """Parses HTML to extract faculty details."""
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content, parse_only=FACULTY_RESULTS_STRAINER) # Only build the result blocks
     faculty_list = []
     
     results_divs = soup.find_all('div', class_='results-result')
@@ -112,12 +129,103 @@ def parse_faculty_data(html_content, base_url):
             
     return faculty_list
 
-def main():
-    seen_faculty_names = set() # To keep track of unique faculty names
-    all_faculty_data = []      # To store all unique faculty data dictionaries
-    urls_to_scrape = []
+async def scrape_page(fetcher, url):
+    """
+    Fetches one search page and parses it in a worker thread so the event loop keeps
+    other downloads moving. Returns the page's faculty list, or None if the fetch failed.
+    """
+    html_content = await fetch_html(fetcher, url)
+    if not html_content:
+        return None
+    return await asyncio.to_thread(telemetry.timed_parse, parse_faculty_data, html_content, BASE_URL)
+
+def search_url(prefix):
+    return SEARCH_URL.format(urllib.parse.quote(prefix))
+
+def page_is_truncated(result_count, result_limit):
+    """True if a search page hit the site's result limit, so it may be missing results and its prefix should be expanded."""
+    return result_count >= result_limit
+
+async def adaptive_search(concurrency, result_limit):
+    """
+    Searches prefixes level by level (a, b, ..., then e.g. aa, ab, ... for truncated ones).
+    Returns (pages, coverage): pages is a list of (url, faculty list or None) in search order,
+    and coverage has one row per searched prefix for SEARCH_COVERAGE_FILE.
+    """
+    pages = []
+    coverage = []
+    attempts = {}
+    level = list(SEARCH_ALPHABET)
+
+    async with Fetcher(max_concurrency=concurrency) as fetcher:
+        while level:
+            urls = [search_url(prefix) for prefix in level]
+            tasks = [scrape_page(fetcher, url) for url in urls]
+            level_pages = await async_tqdm.gather(*tasks, desc=f"Searching {len(level)} prefixes of length {len(level[0])}", unit="page")
 
-    # Read URLs from the input CSV
+            next_level = []
+            for prefix, url, faculty_from_page in zip(level, urls, level_pages):
+                attempts[prefix] = attempts.get(prefix, 0) + 1
+                if faculty_from_page is None:
+                    if attempts[prefix] <= FAILED_SEARCH_RETRIES:
+                        telemetry.record_retry(urllib.parse.urlsplit(url).hostname)
+                        next_level.append(prefix) # Search it again with the next level
+                        continue
+                    status = "failed"
+                elif page_is_truncated(len(faculty_from_page), result_limit):
+                    if len(prefix) < MAX_PREFIX_LENGTH:
+                        status = "expanded"
+                        next_level.extend(prefix + letter for letter in SEARCH_ALPHABET)
+                    else:
+                        status = "truncated at max length"
+                else:
+                    status = "complete"
+                pages.append((url, faculty_from_page))
+                coverage.append({
+                    "Prefix": prefix,
+                    "URL": url,
+                    "Results": len(faculty_from_page) if faculty_from_page is not None else "",
+                    "New Faculty": 0,
+                    "Status": status,
+                })
+            level = next_level
+        tqdm.write(f"Final request rates: {fetcher.describe_rates()}")
+    return pages, coverage
+
+def write_coverage_report(coverage, all_faculty_data, previous_names):
+    """Writes SEARCH_COVERAGE_FILE and prints a summary of the adaptive search."""
+    headers = ["Prefix", "URL", "Results", "New Faculty", "Status"]
+    try:
+        with open(SEARCH_COVERAGE_FILE, mode='w', newline='', encoding='utf-8') as outfile:
+            writer = csv.DictWriter(outfile, fieldnames=headers)
+            writer.writeheader()
+            writer.writerows(coverage)
+    except Exception as e:
+        print(f"Error writing coverage report '{SEARCH_COVERAGE_FILE}': {e}")
+
+    status_counts = {}
+    for row in coverage:
+        status_counts[row["Status"]] = status_counts.get(row["Status"], 0) + 1
+    fixed_sweep = len(SEARCH_ALPHABET) ** 2
+    print(f"\nSearch coverage ({SEARCH_COVERAGE_FILE}): {len(coverage)} prefixes searched "
+          f"(vs. {fixed_sweep} for the fixed two-letter sweep); " + ", ".join(f"{count} {status}" for status, count in sorted(status_counts.items())))
+    if status_counts.get("truncated at max length") or status_counts.get("failed"):
+        print("  Warning: some prefixes may be missing results (see rows that are not 'complete' or 'expanded').")
+    if previous_names:
+        found_names = {faculty["Faculty Name"] for faculty in all_faculty_data}
+        missing = sorted(previous_names - found_names)
+        print(f"  {len(missing)} faculty member(s) in the previous {OUTPUT_CSV_FILE} were not found" + (f", e.g. {', '.join(missing[:5])}" if missing else "."))
+
+def load_previous_faculty_names():
+    """Names in the existing faculty.csv (if any), used to check the adaptive search's coverage."""
+    if not os.path.exists(OUTPUT_CSV_FILE):
+        return set()
+    with open(OUTPUT_CSV_FILE, mode='r', encoding='utf-8') as infile:
+        return {row["Faculty Name"] for row in csv.DictReader(infile) if row.get("Faculty Name")}
+
+def read_search_links():
+    """Reads the fixed list of search URLs from INPUT_CSV_FILE. Returns None if it cannot be read."""
+    urls_to_scrape = []
     try:
         with open(INPUT_CSV_FILE, mode='r', encoding='utf-8-sig') as infile:
             reader = csv.reader(infile)
@@ -134,40 +242,67 @@ def main():
 
     except FileNotFoundError:
         print(f"Error: Input file '{INPUT_CSV_FILE}' not found.")
-        return
+        return None
     except Exception as e:
         print(f"Error reading input CSV '{INPUT_CSV_FILE}': {e}")
-        return
+        return None
+    return urls_to_scrape
 
-    if not urls_to_scrape:
-        print(f"No URLs found in '{INPUT_CSV_FILE}'. Exiting.")
-        return
+async def scrape_all_pages(urls, concurrency):
+    """Scrapes every URL with at most `concurrency` requests in flight. Results keep the input order."""
+    async with Fetcher(max_concurrency=concurrency) as fetcher:
+        tasks = [scrape_page(fetcher, url) for url in urls]
+        pages = await async_tqdm.gather(*tasks, desc="Processing URLs", unit="page")
+        tqdm.write(f"Final request rates: {fetcher.describe_rates()}")
+        return pages
 
-    print(f"Starting to process {len(urls_to_scrape)} URLs from {INPUT_CSV_FILE}...")
+def main(concurrency=MAX_CONCURRENT_REQUESTS, adaptive=False, result_limit=RESULT_LIMIT):
+    seen_faculty_names = set() # To keep track of unique faculty names
+    all_faculty_data = []      # To store all unique faculty data dictionaries
+    coverage = None
+    telemetry.start_stage("1_generate_faculty")
 
-    for url in tqdm(urls_to_scrape, desc="Processing URLs"):
-        print(f"\nFetching URL: {url}")
-        html_content = fetch_html(url)
-        
-        if html_content:
-            faculty_from_page = parse_faculty_data(html_content, BASE_URL)
-            
-            new_faculty_on_page = 0
-            for faculty_member_data in faculty_from_page:
-                if faculty_member_data["Faculty Name"] != "N/A" and faculty_member_data["Faculty Name"] not in seen_faculty_names:
-                    all_faculty_data.append(faculty_member_data)
-                    seen_faculty_names.add(faculty_member_data["Faculty Name"])
-                    new_faculty_on_page +=1
-
-            if new_faculty_on_page > 0:
-                print(f"  Added {new_faculty_on_page} new unique faculty member(s) from this page.")
-            elif faculty_from_page:
-                print(f"  Found {len(faculty_from_page)} faculty member(s), but all were already processed or had N/A names.")
-            else:
-                print(f"  No faculty data blocks found on this page.")
+    if not adaptive:
+        urls_to_scrape = read_search_links()
+        if urls_to_scrape is None:
+            return
+        if not urls_to_scrape:
+            print(f"No URLs found in '{INPUT_CSV_FILE}'. Exiting.")
+            return
+
+        print(f"Starting to process {len(urls_to_scrape)} URLs from {INPUT_CSV_FILE} (up to {concurrency} at a time)...")
+        pages = asyncio.run(scrape_all_pages(urls_to_scrape, concurrency))
+        searched_pages = list(zip(urls_to_scrape, pages))
+    else:
+        previous_names = load_previous_faculty_names()
+        if not result_limit:
+            print("Error: the adaptive search needs RESULT_LIMIT (or --result-limit), the most results the site shows for one search. Exiting.")
+            return
+        print(f"Starting adaptive prefix search of {SEARCH_URL.format('')} (up to {concurrency} pages at a time, expanding pages with {result_limit} results)...")
+        searched_pages, coverage = asyncio.run(adaptive_search(concurrency, result_limit))
+        coverage_by_url = {row["URL"]: row for row in coverage}
 
-        if DELAY_BETWEEN_REQUESTS > 0:
-            time.sleep(DELAY_BETWEEN_REQUESTS)
+    # Deduplicate in search/input order so the result matches a one-page-at-a-time sweep.
+    for url, faculty_from_page in searched_pages:
+        if faculty_from_page is None:
+            continue
+        print(f"\nProcessed URL: {url}")
+
+        new_faculty_on_page = 0
+        for faculty_member_data in faculty_from_page:
+            if faculty_member_data["Faculty Name"] != "N/A" and faculty_member_data["Faculty Name"] not in seen_faculty_names:
+                all_faculty_data.append(faculty_member_data)
+                seen_faculty_names.add(faculty_member_data["Faculty Name"])
+                new_faculty_on_page +=1
+
+        if coverage is not None:
+            coverage_by_url[url]["New Faculty"] = new_faculty_on_page
+        if new_faculty_on_page > 0:
+            print(f"  Added {new_faculty_on_page} new unique faculty member(s) from this page.")
+        elif faculty_from_page:
+            print(f"  Found {len(faculty_from_page)} faculty member(s), but all were already processed or had N/A names.")
+        else:
+            print(f"  No faculty data blocks found on this page.")
 
     # Sort data before assigning IDs and writing
     if all_faculty_data:
@@ -195,5 +330,23 @@ def main():
     else:
         print("\nNo faculty data was collected to write to the output file.")
 
+    if coverage is not None:
+        write_coverage_report(coverage, all_faculty_data, previous_names)
+    telemetry.write_reports()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape faculty.csv from the UNT faculty search pages.")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_REQUESTS,
+                        help=f"Maximum number of search pages in flight at once; the fetcher adapts below this (default: {MAX_CONCURRENT_REQUESTS}).")
+    parser.add_argument("--adaptive", action="store_true",
+                        help=f"Find the search pages with an adaptive prefix search instead of the fixed list of URLs in {INPUT_CSV_FILE}.")
+    parser.add_argument("--result-limit", type=int, default=RESULT_LIMIT,
+                        help="Most results the site shows for one search; --adaptive expands only pages with this many (default: RESULT_LIMIT).")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.adaptive and not args.result_limit:
+        parser.error("--adaptive needs --result-limit (or RESULT_LIMIT set in the script)")
+    if args.result_limit is not None and args.result_limit < 1:
+        parser.error("--result-limit must be at least 1")
+    main(args.concurrency, args.adaptive, args.result_limit)
\ No newline at end of file
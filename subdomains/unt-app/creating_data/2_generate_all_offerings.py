@@ -1,11 +1,16 @@
+import argparse
+import asyncio
 import csv
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
 import os
 import re
 import datetime
 from tqdm import tqdm
+from tqdm.asyncio import tqdm as async_tqdm
 import urllib.parse
+from fetcher import Fetcher
+import telemetry
+from html_parsing import make_soup, PROFILE_COURSE_TABLES_STRAINER
 
 # --- Configuration ---
 FACULTY_CSV_FILE = "faculty.csv"
@@ -14,6 +19,10 @@ ALL_OFFERINGS_OUTPUT_FILE = "0_all_offerings.csv"
 ERRORS_OUTPUT_FILE = "errors.csv"
 
 REQUEST_TIMEOUT_SECONDS = 30
+# Maximum number of faculty profile pages in flight at once (can be overridden with --concurrency).
+# Requests go through the shared Fetcher (fetcher.py): one pooled aiohttp session, with the rate and
+# concurrency for facultyinfo.unt.edu adapted below this ceiling as responses come back.
+MAX_CONCURRENT_REQUESTS = 16
 
 # --- Output Headers ---
 ALL_OFFERINGS_HEADERS = [
@@ -25,15 +34,19 @@ ERRORS_HEADERS = ["Timestamp", "Error Type", "Affected Item", "Message"]
 # --- Global list for errors ---
 errors_list = []
 
-def log_error(error_type, affected_item, message):
-    """Appends an error to the global errors_list."""
+def make_error(error_type, affected_item, message):
+    """Builds a single error row in the errors.csv format."""
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    errors_list.append({
+    return {
         "Timestamp": timestamp,
         "Error Type": error_type,
         "Affected Item": affected_item,
         "Message": str(message)
-    })
+    }
+
+def log_error(error_type, affected_item, message):
+    """Appends an error to the global errors_list."""
+    errors_list.append(make_error(error_type, affected_item, message))
 
 def load_semester_mapping(filename=SEMESTER_MAPPING_FILE):
     """
@@ -143,13 +156,120 @@ def generate_highlight_link(base_faculty_url, text_start, text_end, prefix_text=
     return f"{base_faculty_url}#previous-teaching:~:text={highlight_text}"
 
 
-def generate_course_offerings_report():
+def walk_course_table(table):
+    """
+    Yields (course code, course title, semester, prefix, suffix) for every row of a
+    "profile-courses-table" with at least 3 cells, in a single pass over the table.
+    The prefix is the text of the last cell of the previous row and the suffix is the text of
+    the cell right after the semester cell (normally the next row's course code); both anchor
+    the highlight link. Each cell's text is extracted once and cells are located by position,
+    so the walk is linear in the size of the table.
+    """
+    all_table_cells = table.find_all('td')
+    cell_positions = {id(cell): position for position, cell in enumerate(all_table_cells)}
+    cell_texts = [cell.get_text(strip=True) for cell in all_table_cells]
+
+    prev_row_cells = None
+    for table_row in table.find_all('tr'):
+        cells = table_row.find_all('td')
+        if len(cells) >= 3:
+            code, title, semester = (cell_texts[cell_positions[id(cell)]] for cell in cells[:3])
+            # Prefix: text from the last cell of the previous row
+            prefix_text = cell_texts[cell_positions[id(prev_row_cells[-1])]] if prev_row_cells else None
+            # Suffix: text from the very next cell in the table
+            next_position = cell_positions[id(cells[2])] + 1
+            suffix_text = cell_texts[next_position] if next_position < len(cell_texts) else None
+            yield code, title, semester, prefix_text, suffix_text
+        prev_row_cells = cells
+
+def parse_profile_offerings(html, website_link, faculty_id, faculty_name, semester_map, offerings, errors):
+    """
+    Parses one faculty profile page, appending a row to `offerings` for every course
+    offering in its "profile-courses-table" tables and any warnings to `errors`.
+    """
+    soup = make_soup(html, parse_only=PROFILE_COURSE_TABLES_STRAINER) # Only build the course tables
+
+    course_tables = soup.find_all('table', class_='profile-courses-table')
+    if not course_tables:
+        return
+
+    for table in course_tables:
+        for full_course_name_raw, course_name_scraped, semester_string_raw, prefix_text, suffix_text in walk_course_table(table):
+            if not full_course_name_raw and not course_name_scraped and not semester_string_raw:
+                continue
+            if full_course_name_raw.lower() == "course code" or course_name_scraped.lower() == "course title":
+                continue
+
+            course_code = extract_course_code(full_course_name_raw)
+            year, specific_semester = extract_year_specific_semester(semester_string_raw)
+            broad_semester = get_broad_semester(specific_semester, semester_string_raw, semester_map)
+            
+            # Call the updated function with prefix and suffix
+            link_highlight = generate_highlight_link(
+                website_link,
+                text_start=full_course_name_raw,
+                text_end=semester_string_raw,
+                prefix_text=prefix_text,
+                suffix_text=suffix_text
+            )
+
+            offerings.append({
+                "Full Course Name": full_course_name_raw,
+                "Course Code": course_code,
+                "Course Name": course_name_scraped,
+                "Year": year,
+                "Specific Semester": specific_semester,
+                "Broad Semester": broad_semester,
+                "Faculty ID": faculty_id,
+                "Link To Highlight": link_highlight
+            })
+
+async def scrape_faculty_profile(fetcher, faculty_row, semester_map):
+    """
+    Fetches and parses a single faculty profile.
+    Returns (offerings, errors) for that faculty member; errors are returned rather than
+    logged so the caller can merge them in faculty.csv order.
+    """
+    offerings = []
+    errors = []
+    faculty_id = faculty_row.get("Faculty ID", "").strip()
+    website_link = faculty_row.get("Website Link", "").strip()
+    faculty_name = faculty_row.get("Faculty Name", f"Faculty ID {faculty_id}").strip()
+
+    if not faculty_id:
+        errors.append(make_error("Data Warning", f"Row in {FACULTY_CSV_FILE} (Name: {faculty_name})", "Missing 'Faculty ID'. Skipping."))
+        return offerings, errors
+    if not website_link:
+        errors.append(make_error("Data Warning", f"Faculty: {faculty_name} (ID: {faculty_id})", "Missing 'Website Link'. Skipping."))
+        return offerings, errors
+
+    try:
+        html = await fetcher.get_text(website_link, timeout=REQUEST_TIMEOUT_SECONDS)
+        # Parse in a worker thread so other downloads keep moving while this page is processed.
+        await asyncio.to_thread(telemetry.timed_parse, parse_profile_offerings, html, website_link, faculty_id, faculty_name, semester_map, offerings, errors)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        errors.append(make_error("Network Error", website_link, f"Could not fetch URL for {faculty_name} (ID: {faculty_id}): {e}"))
+    except Exception as e:
+        errors.append(make_error("Processing Error", f"Faculty: {faculty_name} (ID: {faculty_id}) at {website_link}", f"Unexpected error: {e}"))
+
+    return offerings, errors
+
+async def scrape_all_profiles(faculty_data_list, semester_map, concurrency):
+    """Scrapes every faculty profile with at most `concurrency` requests in flight. Results keep the input order."""
+    async with Fetcher(max_concurrency=concurrency) as fetcher:
+        tasks = [scrape_faculty_profile(fetcher, faculty_row, semester_map) for faculty_row in faculty_data_list]
+        results = await async_tqdm.gather(*tasks, desc="Processing faculty profiles")
+        tqdm.write(f"Final request rates: {fetcher.describe_rates()}")
+        return results
+
+def generate_course_offerings_report(concurrency=MAX_CONCURRENT_REQUESTS):
     """
     Main function to scrape faculty pages, process data, and generate the all_offerings.csv report.
     """
     global errors_list
     errors_list = [] 
     all_offerings_data = []
+    telemetry.start_stage("2_generate_all_offerings")
 
     print("--- Starting UNT Course Offerings Generation ---")
 
@@ -183,97 +303,12 @@ def generate_course_offerings_report():
         print(f"No faculty data found in '{FACULTY_CSV_FILE}'. Exiting.")
         return
 
-    for faculty_row in tqdm(faculty_data_list, desc="Processing faculty profiles"):
-        faculty_id = faculty_row.get("Faculty ID", "").strip()
-        website_link = faculty_row.get("Website Link", "").strip()
-        faculty_name = faculty_row.get("Faculty Name", f"Faculty ID {faculty_id}").strip()
-
-        if not faculty_id:
-            log_error("Data Warning", f"Row in {FACULTY_CSV_FILE} (Name: {faculty_name})", "Missing 'Faculty ID'. Skipping.")
-            continue
-        if not website_link:
-            log_error("Data Warning", f"Faculty: {faculty_name} (ID: {faculty_id})", "Missing 'Website Link'. Skipping.")
-            continue
-
-        try:
-            response = requests.get(website_link, timeout=REQUEST_TIMEOUT_SECONDS)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            course_tables = soup.find_all('table', class_='profile-courses-table')
-            if not course_tables:
-                continue
-
-            for table in course_tables:
-                all_table_cells = table.find_all('td')
-                # Get all rows to easily find previous/next siblings
-                all_rows = table.find_all('tr')
-                for i, table_row in enumerate(all_rows):
-                    cells = table_row.find_all('td')
-                    
-                    if not cells or len(cells) < 3:
-                        continue
-                    
-                    full_course_name_raw = cells[0].get_text(strip=True)
-                    course_name_scraped = cells[1].get_text(strip=True)
-                    semester_string_raw = cells[2].get_text(strip=True)
+    profile_results = asyncio.run(scrape_all_profiles(faculty_data_list, semester_map, concurrency))
 
-                    if not full_course_name_raw and not course_name_scraped and not semester_string_raw:
-                        continue
-                    if full_course_name_raw.lower() == "course code" or course_name_scraped.lower() == "course title":
-                        continue
-
-                    # --- New Prefix/Suffix Logic ---
-                    prefix_text = None
-                    suffix_text = None
-
-                    # Get Prefix: text from the last cell of the previous row
-                    if i > 0:
-                        prev_row_cells = all_rows[i-1].find_all('td')
-                        if prev_row_cells:
-                            # Use text from the last cell of the previous row
-                            prefix_text = prev_row_cells[-1].get_text(strip=True)
-
-                    # Get Suffix: text from the very next cell in the table
-                    try:
-                        current_cell_index = all_table_cells.index(cells[2])
-                        if current_cell_index + 1 < len(all_table_cells):
-                            next_cell = all_table_cells[current_cell_index + 1]
-                            suffix_text = next_cell.get_text(strip=True)
-                    except ValueError:
-                        # This can happen if a row has less than 3 cells but wasn't skipped.
-                        # As a safeguard, we can log this or just pass.
-                        log_error("Processing Warning", f"Faculty: {faculty_name} (ID: {faculty_id})", f"Could not find cell in all_table_cells for row '{full_course_name_raw}'.")
-                    # --- End New Logic ---
-
-                    course_code = extract_course_code(full_course_name_raw)
-                    year, specific_semester = extract_year_specific_semester(semester_string_raw)
-                    broad_semester = get_broad_semester(specific_semester, semester_string_raw, semester_map)
-                    
-                    # Call the updated function with prefix and suffix
-                    link_highlight = generate_highlight_link(
-                        website_link,
-                        text_start=full_course_name_raw,
-                        text_end=semester_string_raw,
-                        prefix_text=prefix_text,
-                        suffix_text=suffix_text
-                    )
-
-                    all_offerings_data.append({
-                        "Full Course Name": full_course_name_raw,
-                        "Course Code": course_code,
-                        "Course Name": course_name_scraped,
-                        "Year": year,
-                        "Specific Semester": specific_semester,
-                        "Broad Semester": broad_semester,
-                        "Faculty ID": faculty_id,
-                        "Link To Highlight": link_highlight
-                    })
-
-        except requests.exceptions.RequestException as e:
-            log_error("Network Error", website_link, f"Could not fetch URL for {faculty_name} (ID: {faculty_id}): {e}")
-        except Exception as e:
-            log_error("Processing Error", f"Faculty: {faculty_name} (ID: {faculty_id}) at {website_link}", f"Unexpected error: {e}")
+    # Merge per-profile results in faculty.csv order so the output matches a sequential run.
+    for profile_offerings, profile_errors in profile_results:
+        all_offerings_data.extend(profile_offerings)
+        errors_list.extend(profile_errors)
 
     print(f"Stage 2 finished. Processed {len(faculty_data_list)} faculty. Found {len(all_offerings_data)} course offerings.")
 
@@ -314,7 +349,8 @@ def generate_course_offerings_report():
             print(f"Critical Error: Could not write errors to '{ERRORS_OUTPUT_FILE}': {e}")
     else:
         print(f"\nNo errors reported during the process. '{ERRORS_OUTPUT_FILE}' not created.")
-    
+
+    telemetry.write_reports()
     print("\n--- UNT Course Offerings Generation Complete ---")
 
 if __name__ == "__main__":
@@ -325,5 +361,12 @@ if __name__ == "__main__":
     if not os.path.exists(SEMESTER_MAPPING_FILE):
         print(f"'{SEMESTER_MAPPING_FILE}' not found. Creating a dummy version for demonstration.")
         # Dummy data generation logic...
-        
-    generate_course_offerings_report()
\ No newline at end of file
+
+    parser = argparse.ArgumentParser(description="Scrape course offerings from every faculty profile in faculty.csv.")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_REQUESTS,
+                        help=f"Maximum number of profile pages in flight at once; the fetcher adapts below this (default: {MAX_CONCURRENT_REQUESTS}).")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    generate_course_offerings_report(args.concurrency)
\ No newline at end of file
@@ -1,32 +1,43 @@
+import argparse
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup, NavigableString
+from bs4 import NavigableString
 import csv
 from tqdm.asyncio import tqdm as async_tqdm # For asyncio-compatible gather
 from tqdm import tqdm as regular_tqdm # For the synchronous outer loop
 import re
 from urllib.parse import urljoin
 import os # For checking file existence
+import time
+import telemetry # Per-host request metrics and parse time for the run report
+from fetcher import Fetcher # Shared rate-limited, adaptive fetch layer
+from html_parsing import make_soup, CATALOG_PAGINATION_STRAINER, CATALOG_RESULTS_STRAINER
+from intermediates import write_typed_copy # Typed Parquet copy of the output for scripts 4-6
 
 # --- Configuration ---
 BASE_URL = "https://catalog.unt.edu/"
 SEARCH_URL_TEMPLATE = "https://catalog.unt.edu/search_advanced.php?cur_cat_oid={catalog_oid}&cpage={page_num}&search_database=Search&filter%5Bkeyword%5D=&filter%5B3%5D=1"
 OUTPUT_FILE = "0_all_catalog1.csv"
+# Persisted (catoid, coid) -> Catalog ID table. Courses keep their Catalog ID across runs, and new
+# courses get the next unused ID, so one new listing no longer shifts every later ID downstream.
+CATALOG_ID_MAP_FILE = "0_catalog_id_map.csv"
 CATALOG_MAPPING_FILE = "0_catalog_mapping.csv" # New CSV for catalog info
-
-# Global user agent to mimic a browser, can help avoid blocking
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-}
+# Incremental mode (--incremental): catalogs marked "Frozen" in the mapping file are not scraped again.
+# Their rows are reused from the previous OUTPUT_FILE and merged with freshly scraped open catalogs.
+INCREMENTAL_MODE = False
+# Upper bound on pages in flight. The shared Fetcher (fetcher.py) rate-limits catalog.unt.edu and
+# adapts concurrency below this ceiling based on latency and 429/5xx responses.
+MAX_CONCURRENT_REQUESTS = 32
 
 # --- Helper Functions ---
 
 def load_catalog_mapping(filepath):
     """
-    Loads catalog information (Year, Catalog Type) from a CSV file.
+    Loads catalog information (Year, Catalog Type, Frozen) from a CSV file.
     The CSV should have headers: Catalog ID,Year,Catalog Type
+    An optional "Frozen" column (True/False) marks closed catalogs that incremental runs can skip.
     Returns a dictionary mapping catalog_oid (str) to its info.
-    Example: {"37": {"year": "2025-2026", "type": "Undergraduate"}}
+    Example: {"37": {"year": "2025-2026", "type": "Undergraduate", "frozen": False}}
     """
     if not os.path.exists(filepath):
         regular_tqdm.write(f"CRITICAL: Catalog mapping file not found at '{filepath}'. Please create it.")
@@ -45,8 +56,9 @@ def load_catalog_mapping(filepath):
                 catalog_id = row.get("Catalog ID", "").strip()
                 year = row.get("Year", "").strip()
                 catalog_type = row.get("Catalog Type", "").strip()
+                frozen = (row.get("Frozen") or "").strip().lower() in ('true', '1', 't')
                 if catalog_id and year and catalog_type:
-                    mapping[catalog_id] = {"year": year, "type": catalog_type}
+                    mapping[catalog_id] = {"year": year, "type": catalog_type, "frozen": frozen}
                 else:
                     regular_tqdm.write(f"Warning: Skipping row in '{filepath}' due to missing data: {row}")
     except Exception as e:
@@ -58,12 +70,79 @@ def load_catalog_mapping(filepath):
         return None
     return mapping
 
-async def fetch_html(session, url):
+def load_previous_catalog_rows(filepath, catalog_oids):
+    """
+    Reads rows for the given catalog OIDs (strs) back out of a previous OUTPUT_FILE.
+    Returns a dictionary mapping catalog_oid to its rows, in the same list format that
+    process_course_page produces (without the Catalog ID column).
+    """
+    rows_by_catalog = {}
+    if not os.path.exists(filepath):
+        return rows_by_catalog
+    try:
+        with open(filepath, mode='r', encoding='utf-8', newline='') as infile:
+            reader = csv.DictReader(infile)
+            for row in reader:
+                catalog_code = row.get('Catalog Code', '')
+                if catalog_code in catalog_oids:
+                    rows_by_catalog.setdefault(catalog_code, []).append([
+                        row['Course Code'], row['Course Name'], catalog_code,
+                        row['Year'], row['Catalog Type'], row['Course Link']
+                    ])
+    except Exception as e:
+        regular_tqdm.write(f"Warning: Could not read previous rows from '{filepath}' ({e}). Scraping every catalog.")
+        return {}
+    return rows_by_catalog
+
+def course_link_key(course_link, seen_counts):
+    """
+    Returns the stable key for a course row: (catoid, coid, occurrence) taken from its course link.
+    `occurrence` separates the rare case of one link listed more than once in the same catalog.
+    """
+    match = re.search(r'catoid=(\d+)&coid=(\d+)', course_link)
+    base_key = (match.group(1), match.group(2)) if match else ("", course_link)
+    occurrence = seen_counts.get(base_key, 0)
+    seen_counts[base_key] = occurrence + 1
+    return base_key + (str(occurrence),)
+
+def load_catalog_id_map(filepath):
+    """Loads the persisted (catoid, coid, occurrence) -> Catalog ID table. Returns {} if it doesn't exist yet."""
+    id_map = {}
+    if not os.path.exists(filepath):
+        return id_map
+    with open(filepath, mode='r', encoding='utf-8', newline='') as infile:
+        for row in csv.DictReader(infile):
+            id_map[(row['Catalog OID'], row['Course OID'], row['Occurrence'])] = int(row['Catalog ID'])
+    return id_map
+
+def save_catalog_id_map(filepath, id_map):
+    with open(filepath, mode='w', encoding='utf-8', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(['Catalog ID', 'Catalog OID', 'Course OID', 'Occurrence'])
+        for key, catalog_id in sorted(id_map.items(), key=lambda item: item[1]):
+            writer.writerow([catalog_id, *key])
+
+def assign_catalog_ids(sorted_rows, id_map):
+    """
+    Returns a Catalog ID for each row. Known courses reuse their ID from `id_map`; new courses
+    get the next unused ID in sorted order (so a first run numbers rows 0..n-1 as before).
+    New keys are added to `id_map`.
+    """
+    next_id = max(id_map.values(), default=-1) + 1
+    seen_counts = {}
+    catalog_ids = []
+    for row_data in sorted_rows:
+        key = course_link_key(row_data[5], seen_counts)
+        if key not in id_map:
+            id_map[key] = next_id
+            next_id += 1
+        catalog_ids.append(id_map[key])
+    return catalog_ids
+
+async def fetch_html(fetcher, url):
     """Fetches HTML content from a URL with error handling."""
     try:
-        async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=30)) as response:
-            response.raise_for_status()
-            return await response.text()
+        return await fetcher.get_text(url, timeout=30)
     except aiohttp.ClientError as e:
         regular_tqdm.write(f"Network error fetching {url}: {e}")
         await asyncio.sleep(1)
@@ -76,7 +155,7 @@ async def fetch_html(session, url):
         await asyncio.sleep(1)
         return None
 
-async def get_pagemax_and_descriptive_title(session, catalog_oid):
+async def get_pagemax_and_descriptive_title(fetcher, catalog_oid):
     """
     Fetches the first page of a catalog (cpage=1) to:
     1. Determine PAGEMAX (Instruction 2c.2)
@@ -84,11 +163,13 @@ async def get_pagemax_and_descriptive_title(session, catalog_oid):
     Returns (pagemax, descriptive_title_string)
     """
     url = SEARCH_URL_TEMPLATE.format(catalog_oid=catalog_oid, page_num=1)
-    html = await fetch_html(session, url)
+    html = await fetch_html(fetcher, url)
     if not html:
         return None, "Unknown Title (Fetch Error)"
 
-    soup = BeautifulSoup(html, 'html.parser')
+    parse_started = time.perf_counter()
+    # Only the <title> and <nav> elements are needed unless the fallback below has to search the whole page
+    soup = make_soup(html, parse_only=CATALOG_PAGINATION_STRAINER)
 
     # 1. Get descriptive title from page <title>
     descriptive_title = "Unknown Title"
@@ -142,6 +223,7 @@ async def get_pagemax_and_descriptive_title(session, catalog_oid):
             elif pagination_nav.find('strong') and not page_links: 
                pagemax = 1 
     else: 
+        soup = make_soup(html)
         if soup.find(string=re.compile(r"^\s*Page:")) and \
            soup.find('strong', string='1') and \
            not soup.find('a', href=re.compile(r'cpage=2')):
@@ -149,20 +231,22 @@ async def get_pagemax_and_descriptive_title(session, catalog_oid):
         else:
             regular_tqdm.write(f"Warning: No clear pagination nav found for OID {catalog_oid} on {url}. Assuming PAGEMAX=1. Check page structure if this is unexpected.")
             pagemax = 1
-            
+
+    telemetry.record_parse(time.perf_counter() - parse_started)
     return pagemax, descriptive_title
 
-async def process_course_page(session, catalog_oid, page_num, catalog_year_type_info):
+async def process_course_page(fetcher, catalog_oid, page_num, catalog_year_type_info):
     """
     Fetches a single page of courses, parses it, and returns a list of course data.
     catalog_year_type_info is a dict like {"year": "YYYY-YYYY", "type": "Type"}
     """
     url = SEARCH_URL_TEMPLATE.format(catalog_oid=catalog_oid, page_num=page_num)
-    html = await fetch_html(session, url)
+    html = await fetch_html(fetcher, url)
     if not html:
         return []
 
-    soup = BeautifulSoup(html, 'html.parser')
+    parse_started = time.perf_counter()
+    soup = make_soup(html, parse_only=CATALOG_RESULTS_STRAINER) # The course list is a <table>
     courses_data = [] # Store this page's courses here
 
     header_td = soup.find('td', class_='th_lt acalog-highlight-ignore nowrap', string=re.compile(r'Courses - Locations/Keyword/Phrase Matches'))
@@ -213,16 +297,62 @@ async def process_course_page(session, catalog_oid, page_num, catalog_year_type_
         else:
             if page_num == 1: 
                 regular_tqdm.write(f"Warning: Found course table header_td but no parent table for OID {catalog_oid}, Page {page_num}. URL: {url}")
-    else:
+    elif page_num == 1:
+        soup = make_soup(html) # The "no results" message may be outside any table
         no_results_msg = soup.find(string=re.compile(r"No courses found matching your criteria|Your search returned no results", re.IGNORECASE))
-        if not no_results_msg and page_num == 1: 
+        if not no_results_msg: 
              regular_tqdm.write(f"Warning: Course table header not found for OID {catalog_oid}, Page {page_num}. URL: {url}")
-    
+
+    telemetry.record_parse(time.perf_counter() - parse_started)
     return courses_data
 
-async def main_scraper():
+async def discover_catalog_pages(fetcher, catalog_oid_int, catalog_year_type_info, page_queue, page_pbar):
+    """
+    Finds PAGEMAX for one catalog and puts every (oid, page) of it on the shared page queue,
+    so workers can start on this catalog while other catalogs are still being discovered.
+    Returns the number of pages queued.
+    """
+    pagemax, descriptive_title = await get_pagemax_and_descriptive_title(fetcher, catalog_oid_int)
+
+    if pagemax is None: # Indicates an error during fetch for pagemax
+        regular_tqdm.write(f"Skipping Catalog OID {catalog_oid_int} due to error fetching page 1 info.")
+        return 0
+
+    # Use descriptive_title for logging, year/type from CSV for data
+    log_title = descriptive_title if descriptive_title != "Unknown Title" else f"Catalog OID {catalog_oid_int}"
+    regular_tqdm.write(f"Processing Catalog: {log_title} (OID: {catalog_oid_int}), Year: {catalog_year_type_info['year']}, Type: {catalog_year_type_info['type']}, Pages: {pagemax}")
+
+    if pagemax < 1:
+        regular_tqdm.write(f"No pages to process for Catalog OID {catalog_oid_int} (pagemax was {pagemax}).")
+        return 0
+
+    page_pbar.total += pagemax
+    page_pbar.refresh()
+    for page_num in range(1, pagemax + 1):
+        await page_queue.put((catalog_oid_int, page_num, catalog_year_type_info))
+    return pagemax
+
+async def page_worker(fetcher, page_queue, page_results, page_pbar):
+    """Takes (oid, page) tasks off the shared queue until it receives the None sentinel."""
+    while True:
+        task = await page_queue.get()
+        if task is None:
+            page_queue.task_done()
+            return
+        catalog_oid_int, page_num, catalog_year_type_info = task
+        try:
+            page_results[(catalog_oid_int, page_num)] = await process_course_page(fetcher, catalog_oid_int, page_num, catalog_year_type_info)
+        except Exception as e:
+            # Only this page is lost; the worker and the rest of the run carry on
+            regular_tqdm.write(f"Error processing Catalog OID {catalog_oid_int}, Page {page_num}: {e}")
+        finally:
+            page_queue.task_done()
+            page_pbar.update(1)
+
+async def main_scraper(incremental=INCREMENTAL_MODE):
     """Main function to orchestrate the scraping process."""
-    
+    telemetry.start_stage("3_generate_all_catalog")
+
     catalog_data_map = load_catalog_mapping(CATALOG_MAPPING_FILE)
     if not catalog_data_map:
         print(f"Failed to load catalog mapping from '{CATALOG_MAPPING_FILE}'. Exiting.")
@@ -230,40 +360,55 @@ async def main_scraper():
 
     all_scraped_data = [] # This will hold all data before sorting and writing
 
-    async with aiohttp.ClientSession() as session:
-        # Iterate through catalog OIDs from the loaded mapping file
-        for catalog_oid_str, catalog_year_type_info in regular_tqdm(catalog_data_map.items(), desc="Overall Catalog Progress", unit="catalog"):
-            try:
-                catalog_oid_int = int(catalog_oid_str) # Ensure it's an int for URL formatting
-            except ValueError:
-                regular_tqdm.write(f"Warning: Invalid Catalog ID '{catalog_oid_str}' in mapping file. Skipping.")
-                continue
+    # In incremental mode, frozen catalogs that already have rows in the previous output are reused as-is
+    reused_rows_by_catalog = {}
+    if incremental:
+        frozen_oids = {oid for oid, info in catalog_data_map.items() if info['frozen']}
+        reused_rows_by_catalog = load_previous_catalog_rows(OUTPUT_FILE, frozen_oids)
+        missing = sorted(frozen_oids - reused_rows_by_catalog.keys(), key=lambda oid: int(oid) if oid.isdigit() else oid)
+        if missing:
+            regular_tqdm.write(f"Frozen catalogs with no rows in '{OUTPUT_FILE}' will be scraped: {', '.join(missing)}")
+        regular_tqdm.write(f"Incremental mode: reusing {sum(len(r) for r in reused_rows_by_catalog.values())} rows from {len(reused_rows_by_catalog)} frozen catalogs.")
 
-            pagemax, descriptive_title = await get_pagemax_and_descriptive_title(session, catalog_oid_int)
+    catalogs_to_scrape = []
+    for catalog_oid_str, catalog_year_type_info in catalog_data_map.items():
+        if catalog_oid_str in reused_rows_by_catalog:
+            all_scraped_data.extend(reused_rows_by_catalog[catalog_oid_str])
+            continue
+        try:
+            catalog_oid_int = int(catalog_oid_str) # Ensure it's an int for URL formatting
+        except ValueError:
+            regular_tqdm.write(f"Warning: Invalid Catalog ID '{catalog_oid_str}' in mapping file. Skipping.")
+            continue
+        catalogs_to_scrape.append((catalog_oid_int, catalog_year_type_info))
 
-            if pagemax is None: # Indicates an error during fetch for pagemax
-                regular_tqdm.write(f"Skipping Catalog OID {catalog_oid_int} due to error fetching page 1 info.")
-                continue
-            
-            # Use descriptive_title for logging, year/type from CSV for data
-            log_title = descriptive_title if descriptive_title != "Unknown Title" else f"Catalog OID {catalog_oid_int}"
-            regular_tqdm.write(f"Processing Catalog: {log_title} (OID: {catalog_oid_int}), Year: {catalog_year_type_info['year']}, Type: {catalog_year_type_info['type']}, Pages: {pagemax}")
-
-            page_tasks = []
-            for page_num in range(1, pagemax + 1):
-                page_tasks.append(
-                    process_course_page(session, catalog_oid_int, page_num, catalog_year_type_info)
-                )
-            
-            if page_tasks:
-                # Gather results from all pages of the current catalog
-                results_from_gather = await async_tqdm.gather(*page_tasks, desc=f"Scraping OID {catalog_oid_int} ({catalog_year_type_info['year']})", unit="page", leave=False)
-                # Flatten the list of lists and add to our master list
-                for page_result in results_from_gather:
-                    if page_result: # page_result is a list of courses from one page
-                        all_scraped_data.extend(page_result)
-            else:
-                regular_tqdm.write(f"No pages to process for Catalog OID {catalog_oid_int} (pagemax was {pagemax}).")
+    # Every page of every catalog goes through one queue and one fixed pool of workers, so the
+    # connection never sits idle at a catalog boundary or behind one catalog's slowest page.
+    page_queue = asyncio.Queue()
+    page_results = {} # (oid, page_num) -> list of courses from that page
+    page_pbar = regular_tqdm(total=0, desc="Scraping catalog pages", unit="page")
+
+    async with Fetcher(max_concurrency=MAX_CONCURRENT_REQUESTS) as fetcher:
+        workers = [asyncio.create_task(page_worker(fetcher, page_queue, page_results, page_pbar)) for _ in range(MAX_CONCURRENT_REQUESTS)]
+
+        # Discover pagination for all catalogs at once; pages are queued as soon as each catalog is known.
+        pages_per_catalog = await async_tqdm.gather(
+            *[discover_catalog_pages(fetcher, oid, info, page_queue, page_pbar) for oid, info in catalogs_to_scrape],
+            desc="Overall Catalog Progress", unit="catalog"
+        )
+        for _ in workers:
+            await page_queue.put(None)
+        await asyncio.gather(*workers)
+        page_pbar.close()
+
+        regular_tqdm.write(f"Final request rates: {fetcher.describe_rates()}")
+
+    # Flatten in catalog-then-page order (the order a catalog-by-catalog run produces)
+    for (catalog_oid_int, _), pagemax in zip(catalogs_to_scrape, pages_per_catalog):
+        for page_num in range(1, pagemax + 1):
+            page_result = page_results.get((catalog_oid_int, page_num))
+            if page_result: # page_result is a list of courses from one page
+                all_scraped_data.extend(page_result)
 
     # --- Post-processing after all scraping is done ---
     regular_tqdm.write(f"\nScraping complete. Found {len(all_scraped_data)} total courses.")
@@ -273,6 +418,13 @@ async def main_scraper():
     all_scraped_data.sort(key=lambda row: (row[0], row[1], row[2]))
 
     regular_tqdm.write("Writing sorted data with unique IDs to CSV...")
+
+    # Catalog IDs come from the persisted (catoid, coid) table, so existing courses keep their IDs
+    catalog_id_map = load_catalog_id_map(CATALOG_ID_MAP_FILE)
+    known_ids = len(catalog_id_map)
+    catalog_ids = assign_catalog_ids(all_scraped_data, catalog_id_map)
+    save_catalog_id_map(CATALOG_ID_MAP_FILE, catalog_id_map)
+    regular_tqdm.write(f"Assigned {len(catalog_id_map) - known_ids} new Catalog IDs ({known_ids} already known in '{CATALOG_ID_MAP_FILE}').")
     
     # Define the final CSV headers including the new "ID" column
     final_csv_headers = ['Catalog ID', 'Course Code', 'Course Name', 'Catalog Code', 'Year', 'Catalog Type', 'Course Link']
@@ -280,11 +432,18 @@ async def main_scraper():
     with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         writer.writerow(final_csv_headers)
-        # Use enumerate to create the unique ID (starting from 0) as we write the sorted rows
-        for i, row_data in enumerate(all_scraped_data):
-            writer.writerow([i] + row_data)
+        for catalog_id, row_data in zip(catalog_ids, all_scraped_data):
+            writer.writerow([catalog_id] + row_data)
     
     print(f"\nProcessing complete. Data saved to {OUTPUT_FILE}")
+    typed_copy = write_typed_copy(OUTPUT_FILE)
+    if typed_copy:
+        print(f"Typed copy saved to {typed_copy}")
+    telemetry.write_reports()
 
 if __name__ == '__main__':
-    asyncio.run(main_scraper())
+    parser = argparse.ArgumentParser(description="Scrape every course listing from the catalogs in the catalog mapping file.")
+    parser.add_argument("--incremental", action="store_true", default=INCREMENTAL_MODE,
+                        help=f"Reuse rows for catalogs marked Frozen in '{CATALOG_MAPPING_FILE}' from the previous '{OUTPUT_FILE}' and only scrape the open ones.")
+    args = parser.parse_args()
+    asyncio.run(main_scraper(args.incremental))
@@ -1,10 +1,16 @@
+import argparse
 import csv
-import re
+import heapq
+import os
 import sys
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Tuple, Callable, Set
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable, Hashable
 from tqdm import tqdm
+from intermediates import deduplicated_list, load_catalog_frame, write_typed_copy, PARSED_COLUMNS
 
 # ======================================================================================
 #                            COURSE GROUPING METHODS
@@ -63,6 +69,10 @@ class Config:
     overlap_output_file: str = "overlap.csv"
     old_groups_output_file: str = "old_groups.csv"
     
+    # --- Parallel Merging (opt-in) ---
+    merge_workers: int = 1 # Processes for merge steps 4-7; above 1, their large buckets are merged in a process pool (at most one per CPU core)
+    parallel_min_bucket: int = 16 # Buckets with fewer groups stay in the main process, where they cost less than sending them
+
     # --- Optional Intermediate File Generation ---
     output_intermediate_files: bool = False # Set to True to get detailed match files
     intermediate_groups_output_file: str = "all_groups.csv" # Used if above is True
@@ -81,98 +91,136 @@ class Config:
     YEAR_COL: str = "Year"
     LINK_COL: str = "Course Link"
 
-# --- Data Class for a Course ---
-@dataclass
-class Course:
-    """Represents a single course entry, enriched with parsed data."""
-    data: Dict[str, Any]
-    original_index: int
-
-    # Enriched data, initialized post-load
-    parsed_year: int = -1
-    dept_code: str = ""
-    course_number: str = ""
-    grade_level: int = -1
-    
-    # Semantic name components
-    base_name: str = ""
-    roman_numeral: str = ""
-    subtitle: str = ""
-
-    # Grouping results
-    group_id: int = -1
-    match_method: str = ""
-
-    def __post_init__(self):
-        """Extract additional fields after the object is created."""
-        self.parsed_year = self._extract_year()
-        self.dept_code = self._extract_dept_code()
-        self.course_number, self.grade_level = self._extract_course_number_and_level()
-        self.base_name, self.roman_numeral, self.subtitle = self._parse_semantic_name()
-
-    def _extract_year(self) -> int:
-        """Extracts the first year from a string like '2024-2025'."""
-        year_str = self.data.get(Config.YEAR_COL, "")
-        if not isinstance(year_str, str): return -1
-        match = re.match(r"(\d{4})", year_str.strip())
-        return int(match.group(1)) if match else -1
-
-    def _extract_dept_code(self) -> str:
-        """Extracts the department code (e.g., 'ENGL') from the course code."""
-        code_str = self.data.get(Config.CODE_COL, "")
-        if not isinstance(code_str, str): return ""
-        match = re.search(r"\b([A-Z]{3,4})\b", code_str.strip())
-        return match.group(1) if match else ""
-    
-    def _extract_course_number_and_level(self) -> Tuple[str, int]:
-        """Extracts the 3-4 digit course number and its first digit (grade level)."""
-        code_str = self.data.get(Config.CODE_COL, "")
-        if not isinstance(code_str, str): return "", -1
-        match = re.search(r'\b(\d{3,4})\b', code_str)
-        if not match:
-            return "", -1
-        
-        course_num = match.group(1)
-        try:
-            grade_lvl = int(course_num[0])
-            return course_num, grade_lvl
-        except (ValueError, IndexError):
-            return course_num, -1
-
-    def _parse_semantic_name(self) -> Tuple[str, str, str]:
-        """Parses a course name into its base, Roman numeral, and subtitle."""
-        name = self.name
-        subtitle = ""
-        
-        if ':' in name:
-            parts = name.split(':', 1)
-            name, subtitle = parts[0].strip(), parts[1].strip()
-        
-        roman_match = re.search(r'\s+(X|IX|VIII|VII|VI|V|IV|III|II|I)$', name)
-        if roman_match:
-            numeral = roman_match.group(1)
-            base = name[:roman_match.start()].strip()
-            return base, numeral, subtitle
-        
-        return name, "", subtitle
+# --- Course Records ---
+class CatalogRows:
+    """The rows of the input file as tuples in column order, shared by every Course loaded from it."""
+    __slots__ = ("fieldnames", "rows")
 
-    @property
-    def code(self) -> str:
-        return self.data.get(Config.CODE_COL, "").strip()
+    def __init__(self, fieldnames: List[str], rows: List[Tuple]):
+        self.fieldnames = fieldnames
+        self.rows = rows
 
-    @property
-    def name(self) -> str:
-        return self.data.get(Config.NAME_COL, "").strip()
+    def row(self, index: int) -> Dict[str, Any]:
+        """Row `index` as a {column: value} dict (a new one on every call)."""
+        return dict(zip(self.fieldnames, self.rows[index]))
 
-    @property
-    def normalized_name(self) -> str:
-        """Returns the course name as lowercase and alphanumeric only."""
-        return "".join(char for char in self.name.lower() if char.isalnum())
+
+class Course:
+    """
+    Represents a single course entry. Every field the grouping methods compare comes parsed from
+    the catalog's typed columns (see intermediates.PARSED_COLUMNS), in which repeated strings (dept
+    codes, numbers, names) are one shared object. The original CSV row is only looked up (`data`)
+    when the course is written.
+    """
+    __slots__ = ("rows", "original_index", "code", "name",
+                 "parsed_year", "dept_code", "course_number", "grade_level", "year_bit",
+                 "base_name", "roman_numeral", "subtitle", "normalized_name", "normalized_base_name",
+                 "group_id", "match_method")
+
+    def __init__(self, rows: CatalogRows, original_index: int, code: str, name: str, parsed_year: int, year_bit: int,
+                 dept_code: str, course_number: str, grade_level: int, normalized_name: str,
+                 base_name: str, roman_numeral: str, subtitle: str, normalized_base_name: str):
+        self.rows = rows
+        self.original_index = original_index
+        self.code = code # Stripped "Course Code"
+        self.name = name # Stripped "Course Name"
+        self.parsed_year = parsed_year
+        self.year_bit = year_bit # This course's bit in a group's year mask (0 without a year, see Grouper.load_courses)
+        self.dept_code = dept_code
+        self.course_number = course_number
+        self.grade_level = grade_level
+        self.normalized_name = normalized_name # Lowercase and alphanumeric only
+
+        # Semantic name components ("Topics II: Ethics" -> "Topics", "II", "Ethics")
+        self.base_name = base_name
+        self.roman_numeral = roman_numeral
+        self.subtitle = subtitle
+        self.normalized_base_name = normalized_base_name
+
+        # Grouping results
+        self.group_id = -1
+        self.match_method = ""
 
     @property
-    def normalized_base_name(self) -> str:
-        """Returns the base name as lowercase and alphanumeric only."""
-        return "".join(char for char in self.base_name.lower() if char.isalnum())
+    def data(self) -> Dict[str, Any]:
+        return self.rows.row(self.original_index)
+
+    def __getstate__(self):
+        # Courses are sent to merge workers without the rows table, which only writing the output needs
+        return {slot: getattr(self, slot) for slot in self.__slots__ if slot != "rows"}
+
+    def __setstate__(self, state):
+        self.rows = None
+        for slot, value in state.items(): setattr(self, slot, value)
+
+
+# --- A Group of Courses ---
+class CourseGroup:
+    """
+    A group of courses that keeps its most recent course, earliest course and years up to date
+    as other groups are merged into it, so they never have to be recomputed. The years are a bit
+    mask (see Course.year_bit): two groups share a year if `a.year_mask & b.year_mask`.
+    """
+    def __init__(self, courses: List[Course]):
+        self.courses: List[Course] = list(courses)
+        # Ties go to the first course in the group, like max()/min() over the list
+        self.most_recent: Optional[Course] = max(self.courses, key=lambda c: c.parsed_year, default=None)
+        self.earliest: Optional[Course] = min(self.courses, key=lambda c: c.parsed_year, default=None)
+        self.year_mask = 0
+        for course in self.courses:
+            self.year_mask |= course.year_bit
+
+    def __iter__(self):
+        return iter(self.courses)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def merge(self, other: "CourseGroup"):
+        """Appends the courses of `other` to this group."""
+        self.courses.extend(other.courses)
+        if other.most_recent and (not self.most_recent or other.most_recent.parsed_year > self.most_recent.parsed_year):
+            self.most_recent = other.most_recent
+        if other.earliest and (not self.earliest or other.earliest.parsed_year < self.earliest.parsed_year):
+            self.earliest = other.earliest
+        self.year_mask |= other.year_mask
+
+
+@dataclass(frozen=True)
+class CandidateKey:
+    """
+    A condition a merge rule always checks, used to index the groups of a bucket so the rule is only
+    tried on pairs that can pass it: key(most recent course of A) must equal (or, with same=False,
+    differ from) key(earliest course of B). A key of None never matches.
+    """
+    key: Callable[[Course], Optional[Hashable]]
+    same: bool = True
+
+
+# --- Merge Rules of Methods 4-7 ---
+def check_overlap(y1: int, y2: int) -> bool:
+    """True if two year masks share no year."""
+    return not y1 & y2
+
+# For each merge step: can_merge(A's most recent course, B's earliest course, A's year mask, B's year mask),
+# and what it compares for equality (or, for 5e and 7, inequality) to index the buckets by. They live at
+# module level so merge worker processes can look them up by step name.
+MERGE_RULES: Dict[str, Tuple[Callable, Optional[CandidateKey]]] = {
+    "4": (lambda r_a, e_b, y1, y2: check_overlap(y1, y2), None),
+    "5a": (lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and r_a.course_number and r_a.course_number == e_b.course_number and check_overlap(y1, y2),
+           CandidateKey(lambda c: (c.roman_numeral, c.course_number) if c.course_number else None)),
+    "5b": (lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and len(r_a.course_number) >= 4 and len(e_b.course_number) >= 4 and r_a.course_number[:3] == e_b.course_number[:3] and r_a.course_number[3] != e_b.course_number[3] and check_overlap(y1, y2),
+           CandidateKey(lambda c: (c.roman_numeral, c.course_number[:3]) if len(c.course_number) >= 4 else None)),
+    "5c": (lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and len(r_a.course_number) >= 3 and len(e_b.course_number) >= 3 and r_a.course_number[:2] == e_b.course_number[:2] and r_a.course_number[2:] != e_b.course_number[2:] and check_overlap(y1, y2),
+           CandidateKey(lambda c: (c.roman_numeral, c.course_number[:2]) if len(c.course_number) >= 3 else None)),
+    "5d": (lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and r_a.grade_level != -1 and r_a.grade_level == e_b.grade_level and r_a.course_number != e_b.course_number and check_overlap(y1, y2),
+           CandidateKey(lambda c: (c.roman_numeral, c.grade_level) if c.grade_level != -1 else None)),
+    "5e": (lambda r_a, e_b, y1, y2: r_a.roman_numeral != e_b.roman_numeral and check_overlap(y1, y2),
+           CandidateKey(lambda c: c.roman_numeral, same=False)),
+    "6": (lambda r_a, e_b, y1, y2: check_overlap(y1, y2), None),
+    "7": (lambda r_a, e_b, y1, y2: r_a.dept_code != e_b.dept_code and check_overlap(y1, y2),
+          CandidateKey(lambda c: c.dept_code, same=False)),
+}
 
 
 # --- Utility Class for Group Operations & I/O ---
@@ -216,7 +264,7 @@ class CourseManager:
         except Exception as e:
             print(f"Error writing groups to {filepath}: {e}")
     
-    def format_groups_for_intermediate_log(self, groups: List[List[Course]]) -> List[List[Dict]]:
+    def format_groups_for_intermediate_log(self, groups: List[Iterable[Course]]) -> List[List[Dict]]:
         """Formats groups for intermediate log files, including new ID columns."""
         output = []
         for group in groups:
@@ -237,14 +285,16 @@ class CourseManager:
         return output
 
     @staticmethod
-    def get_most_recent_course(group: List[Course]) -> Optional[Course]:
+    def get_most_recent_course(group: Iterable[Course]) -> Optional[Course]:
         """Returns the course with the highest year in a group."""
+        if isinstance(group, CourseGroup): return group.most_recent
         if not group: return None
         return max(group, key=lambda c: c.parsed_year)
 
     @staticmethod
-    def get_earliest_course(group: List[Course]) -> Optional[Course]:
+    def get_earliest_course(group: Iterable[Course]) -> Optional[Course]:
         """Returns the course with the lowest year in a group."""
+        if isinstance(group, CourseGroup): return group.earliest
         if not group: return None
         return min(group, key=lambda c: c.parsed_year)
 
@@ -257,23 +307,38 @@ class Grouper:
         self.all_courses: List[Course] = []
         self.original_fieldnames: List[str] = []
         self.manager: Optional[CourseManager] = None
+        self.merge_pool: Optional[ProcessPoolExecutor] = None # Set by merge_workers()
+        self.merge_pool_size = 1
 
     def load_courses(self):
-        """Loads courses from the input CSV and initializes the manager."""
+        """
+        Loads courses from the input file and initializes the manager. Every parsed field comes ready
+        from the typed copy of the input (or one vectorized pass over the CSV) and the Courses are built
+        straight from those columns; the rows themselves are kept once, as tuples, in a CatalogRows table.
+        """
         print(f"Loading and preprocessing {self.config.input_file}...")
         try:
-            with open(self.config.input_file, mode='r', encoding='utf-8') as f:
-                total_lines = sum(1 for line in f) - 1 
-
-            with open(self.config.input_file, mode='r', encoding='utf-8', newline='') as infile:
-                reader = csv.DictReader(infile)
-                self.original_fieldnames = reader.fieldnames or []
-                if not self.original_fieldnames:
-                    print(f"Error: No headers found in {self.config.input_file}.")
-                    return
-                
-                for i, row in enumerate(tqdm(reader, total=total_lines, desc="Loading courses")):
-                    self.all_courses.append(Course(data=row, original_index=i))
+            frame = load_catalog_frame(self.config.input_file)
+            self.original_fieldnames = [col for col in frame.columns if col not in PARSED_COLUMNS]
+            if not self.original_fieldnames:
+                print(f"Error: No headers found in {self.config.input_file}.")
+                return
+
+            rows = CatalogRows(self.original_fieldnames, list(zip(*[frame[col].tolist() for col in self.original_fieldnames])))
+            years = frame["Start Year"].tolist()
+            # Bit i of a year mask stands for the catalog's first year + i
+            first_year = min((year for year in years if year != -1), default=0)
+            year_bits = [1 << (year - first_year) if year != -1 else 0 for year in years]
+            columns = [
+                [code.strip() for code in frame[self.config.CODE_COL].tolist()],
+                [name.strip() for name in frame[self.config.NAME_COL].tolist()],
+                years, year_bits,
+                deduplicated_list(frame["Dept Code"]), deduplicated_list(frame["Course Number"]), frame["Grade Level"].tolist(),
+                deduplicated_list(frame["Normalized Name"]), deduplicated_list(frame["Base Name"]), deduplicated_list(frame["Roman Numeral"]),
+                frame["Subtitle"].tolist(), deduplicated_list(frame["Normalized Base Name"]),
+            ]
+            for i, fields in enumerate(tqdm(zip(*columns), total=len(frame), desc="Loading courses")):
+                self.all_courses.append(Course(rows, i, *fields))
 
             self.manager = CourseManager(self.original_fieldnames)
             print(f"Loaded {len(self.all_courses)} course entries.")
@@ -305,7 +370,8 @@ class Grouper:
         self.find_and_write_overlaps()
 
         groups, matched_groups_by_method = self._perform_initial_grouping()
-        groups = self._perform_merging(groups, matched_groups_by_method)
+        with self.merge_workers():
+            groups = self._perform_merging(groups, matched_groups_by_method)
         final_groups, conflicts, removed_courses = self._perform_finalization_method_8(groups, matched_groups_by_method)
         
         # Assign final Group IDs after all processing is complete
@@ -320,11 +386,11 @@ class Grouper:
 
         self._print_summary(len(final_groups), len(conflicts), sum(len(g) for g in final_groups))
 
-    def _perform_initial_grouping(self) -> Tuple[List[List[Course]], Dict[str, List[List[Course]]]]:
+    def _perform_initial_grouping(self) -> Tuple[List[CourseGroup], Dict[str, List[CourseGroup]]]:
         """Runs initial grouping methods."""
         assigned_indices = set()
-        groups: List[List[Course]] = []
-        matched_groups: Dict[str, List[List[Course]]] = defaultdict(list)
+        groups: List[CourseGroup] = []
+        matched_groups: Dict[str, List[CourseGroup]] = defaultdict(list)
 
         initial_methods: List[Tuple[str, Callable[[Course], Optional[Tuple]]]] = [
             ("1", lambda c: (c.code, c.name)),
@@ -343,7 +409,7 @@ class Grouper:
 
             print(f"Method {method_num}: Found {len(key_to_candidates)} potential groups.")
             for candidates in key_to_candidates.values():
-                new_group = [c for c in candidates if c.original_index not in assigned_indices]
+                new_group = CourseGroup([c for c in candidates if c.original_index not in assigned_indices])
                 if new_group:
                     groups.append(new_group)
                     matched_groups[method_num].append(new_group)
@@ -353,13 +419,10 @@ class Grouper:
         
         return groups, matched_groups
 
-    def _perform_merging(self, groups: List[List[Course]], matched_groups_by_method: Dict) -> List[List[Course]]:
+    def _perform_merging(self, groups: List[CourseGroup], matched_groups_by_method: Dict) -> List[CourseGroup]:
         """Runs all iterative merging methods in sequence."""
         if not self.manager: return groups
         
-        def check_overlap(y1: Set[int], y2: Set[int]) -> bool:
-            return not y1.intersection(y2)
-
         # --- Method 3: Sequential Roman Numerals ---
         groups, merged_log_3 = self._merge_sequential_courses(groups)
         if merged_log_3: matched_groups_by_method["3"] = merged_log_3
@@ -367,48 +430,43 @@ class Grouper:
         # --- Method 4 (was 3) ---
         groups, merged_log_4 = self._merge_within_buckets(
             groups, "4",
-            bucket_key_generator=lambda g: (self.manager.get_most_recent_course(g).dept_code, self.manager.get_most_recent_course(g).normalized_name, self.manager.get_most_recent_course(g).grade_level),
-            can_merge=lambda r_a, e_b, y1, y2: check_overlap(y1, y2)
+            bucket_key_generator=lambda g: (g.most_recent.dept_code, g.most_recent.normalized_name, g.most_recent.grade_level),
+            can_merge=MERGE_RULES["4"][0]
         )
         if merged_log_4: matched_groups_by_method["4"] = merged_log_4
         
         # --- Method 5 (was 4) ---
         print("\n--- Applying Successive Merging Method 5 ---")
-        can_merge_5a = lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and r_a.course_number and r_a.course_number == e_b.course_number and check_overlap(y1, y2)
-        can_merge_5b = lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and len(r_a.course_number) >= 4 and len(e_b.course_number) >= 4 and r_a.course_number[:3] == e_b.course_number[:3] and r_a.course_number[3] != e_b.course_number[3] and check_overlap(y1, y2)
-        can_merge_5c = lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and len(r_a.course_number) >= 3 and len(e_b.course_number) >= 3 and r_a.course_number[:2] == e_b.course_number[:2] and r_a.course_number[2:] != e_b.course_number[2:] and check_overlap(y1, y2)
-        can_merge_5d = lambda r_a, e_b, y1, y2: r_a.roman_numeral == e_b.roman_numeral and r_a.grade_level != -1 and r_a.grade_level == e_b.grade_level and r_a.course_number != e_b.course_number and check_overlap(y1, y2)
-        can_merge_5e = lambda r_a, e_b, y1, y2: r_a.roman_numeral != e_b.roman_numeral and check_overlap(y1, y2)
-        
-        method_5_steps = [("5a", can_merge_5a), ("5b", can_merge_5b), ("5c", can_merge_5c), ("5d", can_merge_5d), ("5e", can_merge_5e)]
-        
-        for name, criterion in method_5_steps:
+        for name in ["5a", "5b", "5c", "5d", "5e"]:
+             criterion, candidates = MERGE_RULES[name]
              groups, merged_this_step = self._merge_within_buckets(
                 groups, name,
-                bucket_key_generator=lambda g: (self.manager.get_most_recent_course(g).dept_code, self.manager.get_most_recent_course(g).normalized_base_name),
-                can_merge=criterion
+                bucket_key_generator=lambda g: (g.most_recent.dept_code, g.most_recent.normalized_base_name),
+                can_merge=criterion,
+                candidate_key=candidates
             )
              if merged_this_step: matched_groups_by_method[name] = merged_this_step
 
         # --- Method 6 (was 5) ---
         groups, merged_log_6 = self._merge_within_buckets(
             groups, "6",
-            bucket_key_generator=lambda g: (self.manager.get_most_recent_course(g).code),
-            can_merge=lambda r_a, e_b, y1, y2: check_overlap(y1, y2)
+            bucket_key_generator=lambda g: (g.most_recent.code),
+            can_merge=MERGE_RULES["6"][0]
         )
         if merged_log_6: matched_groups_by_method["6"] = merged_log_6
 
         # --- Method 7 (was 6) ---
         groups, merged_log_7 = self._merge_within_buckets(
             groups, "7",
-            bucket_key_generator=lambda g: (self.manager.get_most_recent_course(g).normalized_name, self.manager.get_most_recent_course(g).course_number),
-            can_merge=lambda r_a, e_b, y1, y2: r_a.dept_code != e_b.dept_code and check_overlap(y1, y2)
+            bucket_key_generator=lambda g: (g.most_recent.normalized_name, g.most_recent.course_number),
+            can_merge=MERGE_RULES["7"][0],
+            candidate_key=MERGE_RULES["7"][1]
         )
         if merged_log_7: matched_groups_by_method["7"] = merged_log_7
 
         return groups
 
-    def _merge_sequential_courses(self, groups: List[List[Course]]) -> Tuple[List[List[Course]], List[List[Course]]]:
+    def _merge_sequential_courses(self, groups: List[CourseGroup]) -> Tuple[List[CourseGroup], List[CourseGroup]]:
         """New Method 3: Merges courses with sequential Roman numerals."""
         if not self.manager: return groups, []
         print("--- Running Merge Step 3 (Sequential Roman Numerals) ---")
@@ -417,7 +475,7 @@ class Grouper:
         
         key_to_groups = defaultdict(list)
         for group in groups:
-            rep = self.manager.get_most_recent_course(group)
+            rep = group.most_recent
             if rep and rep.dept_code and rep.normalized_base_name:
                 key = (rep.dept_code, rep.normalized_base_name)
                 key_to_groups[key].append(group)
@@ -433,31 +491,32 @@ class Grouper:
             while True:
                 merged_in_pass = False
                 merged_indices = set()
-                bucket.sort(key=lambda g: roman_map.get(self.manager.get_most_recent_course(g).roman_numeral, 99))
+                bucket.sort(key=lambda g: roman_map.get(g.most_recent.roman_numeral, 99))
+
+                # A can only take B if B's numeral is the next one and B's most recent year the next year,
+                # so index the bucket by (numeral, year) and look that pair up instead of trying every B
+                positions_by_key = defaultdict(list)
+                for j, group_b in enumerate(bucket):
+                    rep_b = group_b.most_recent
+                    if rep_b and rep_b.roman_numeral:
+                        positions_by_key[(roman_map.get(rep_b.roman_numeral, -1), rep_b.parsed_year)].append(j)
 
                 for i in range(len(bucket)):
                     if i in merged_indices: continue
                     group_a = bucket[i]
-                    rep_a = self.manager.get_most_recent_course(group_a)
+                    rep_a = group_a.most_recent
                     if not rep_a or not rep_a.roman_numeral: continue
 
-                    for j in range(i + 1, len(bucket)):
-                        if j in merged_indices: continue
+                    positions = positions_by_key.get((roman_map.get(rep_a.roman_numeral, -2) + 1, rep_a.parsed_year + 1), [])
+                    j = next((j for j in positions[bisect_right(positions, i):] if j not in merged_indices), None)
+                    if j is not None:
                         group_b = bucket[j]
-                        rep_b = self.manager.get_most_recent_course(group_b)
-                        if not rep_b or not rep_b.roman_numeral: continue
-
-                        is_sequential_numeral = roman_map.get(rep_b.roman_numeral, -1) == roman_map.get(rep_a.roman_numeral, -2) + 1
-                        is_sequential_year = rep_b.parsed_year - rep_a.parsed_year <= 1 and rep_b.parsed_year > rep_a.parsed_year
-
-                        if is_sequential_numeral and is_sequential_year:
-                            for course in group_a: course.match_method = "3"
-                            for course in group_b: course.match_method = "3"
-                            group_a.extend(group_b)
-                            merged_indices.add(j)
-                            all_merged_in_step.append(group_a)
-                            merged_in_pass = True
-                            break
+                        for course in group_a: course.match_method = "3"
+                        for course in group_b: course.match_method = "3"
+                        group_a.merge(group_b)
+                        merged_indices.add(j)
+                        all_merged_in_step.append(group_a)
+                        merged_in_pass = True
                 
                 if merged_in_pass:
                     bucket = [group for idx, group in enumerate(bucket) if idx not in merged_indices]
@@ -468,15 +527,14 @@ class Grouper:
 
         return final_groups, all_merged_in_step
 
-    def _merge_within_buckets(self, groups: List[List[Course]], step_name: str, bucket_key_generator: Callable, can_merge: Callable) -> Tuple[List[List[Course]], List[List[Course]]]:
+    def _merge_within_buckets(self, groups: List[CourseGroup], step_name: str, bucket_key_generator: Callable, can_merge: Callable, candidate_key: Optional[CandidateKey] = None) -> Tuple[List[CourseGroup], List[CourseGroup]]:
         """A generic merging engine that buckets groups by a key and merges them based on a rule."""
         if not self.manager: return groups, []
         print(f"--- Running Merge Step {step_name} ---")
         
         key_to_groups = defaultdict(list)
         for group in groups:
-            rep = self.manager.get_most_recent_course(group)
-            if rep:
+            if group.most_recent:
                 key = bucket_key_generator(group)
                 if isinstance(key, tuple):
                     if all(str(k) != '' and k is not None and k != -1 for k in key):
@@ -484,53 +542,171 @@ class Grouper:
                 elif key:
                     key_to_groups[key].append(group)
 
+        buckets = list(key_to_groups.values())
+        merges_by_bucket: Dict[int, List[Tuple[int, int]]] = {}
+        if self.merge_pool and MERGE_RULES.get(step_name) == (can_merge, candidate_key): # Custom rules stay in this process
+            merges_by_bucket = self._merge_buckets_in_pool(buckets, step_name)
+
         final_groups = []
         all_merged_in_step = []
 
-        for key, bucket in tqdm(key_to_groups.items(), desc=f"Merging Step {step_name}", leave=False):
+        for position, bucket in enumerate(tqdm(buckets, desc=f"Merging Step {step_name}", leave=False)):
             if len(bucket) < 2:
                 final_groups.extend(bucket)
                 continue
-            
-            while True:
-                merged_in_pass = False
-                merged_indices = set()
-                
-                for i in range(len(bucket)):
-                    if i in merged_indices: continue
-                    group_a = bucket[i]
-                    years_a = {c.parsed_year for c in group_a if c.parsed_year != -1}
-                    rep_a = self.manager.get_most_recent_course(group_a)
 
-                    for j in range(i + 1, len(bucket)):
-                        if j in merged_indices: continue
-                        group_b = bucket[j]
-                        years_b = {c.parsed_year for c in group_b if c.parsed_year != -1}
-                        rep_b = self.manager.get_earliest_course(group_b)
-                        
-                        if not rep_a or not rep_b: continue
-                        
-                        if can_merge(rep_a, rep_b, years_a, years_b):
-                            for course in group_a: course.match_method = step_name
-                            for course in group_b: course.match_method = step_name
-                            group_a.extend(group_b)
-                            years_a.update(years_b)
-                            rep_a = self.manager.get_most_recent_course(group_a)
-                            
-                            merged_indices.add(j)
-                            merged_in_pass = True
-                            all_merged_in_step.append(group_a)
-                
-                if merged_in_pass:
-                    bucket = [bucket[i] for i in range(len(bucket)) if i not in merged_indices]
-                else:
-                    break
-            
-            final_groups.extend(bucket)
+            if position in merges_by_bucket:
+                merges = merges_by_bucket[position]
+                for i, j in merges: self._take(bucket[i], bucket[j], step_name)
+            else:
+                merges = self._merge_bucket(bucket, step_name, can_merge, candidate_key)
+            taken = {j for _, j in merges}
+            final_groups.extend(group for k, group in enumerate(bucket) if k not in taken)
+            all_merged_in_step.extend(bucket[i] for i, _ in merges)
 
         return final_groups, all_merged_in_step
+
+    def _merge_buckets_in_pool(self, buckets: List[List[CourseGroup]], step_name: str) -> Dict[int, List[Tuple[int, int]]]:
+        """
+        Merges the buckets of at least parallel_min_bucket groups in the merge pool. Returns the merges made
+        in each, by bucket position, for the caller to replay on its own groups (see _merge_bucket).
+        """
+        courses_in = {p: sum(len(group) for group in bucket) for p, bucket in enumerate(buckets) if len(bucket) >= max(3, self.config.parallel_min_bucket)}
+        if not courses_in: return {}
+        # Largest buckets first, each into the shard with the fewest courses so far, so the shards finish together
+        shard_count = min(len(courses_in), self.merge_pool_size * 4)
+        shards: List[List[int]] = [[] for _ in range(shard_count)]
+        shard_sizes = [0] * shard_count
+        for p in sorted(courses_in, key=lambda p: -courses_in[p]):
+            smallest = shard_sizes.index(min(shard_sizes))
+            shards[smallest].append(p)
+            shard_sizes[smallest] += courses_in[p]
+
+        tasks = [[[[course.original_index for course in group] for group in buckets[p]] for p in shard] for shard in shards]
+        merges_by_bucket = {}
+        results = self.merge_pool.map(_merge_buckets_in_worker, [step_name] * len(tasks), tasks)
+        for shard, shard_merges in zip(shards, tqdm(results, total=len(tasks), desc=f"Merge Step {step_name} in {self.merge_pool_size} processes", leave=False)):
+            merges_by_bucket.update(zip(shard, shard_merges))
+        return merges_by_bucket
+
+    @contextmanager
+    def merge_workers(self):
+        """
+        Starts the merge pool for the duration of a with block, when config.merge_workers is above 1.
+        The pool has at most one process per CPU core; with a single core, merging stays serial.
+        """
+        self.merge_pool_size = min(self.config.merge_workers, os.cpu_count() or 1)
+        if self.merge_pool_size < self.config.merge_workers:
+            print(f"ℹ️ {self.config.merge_workers} merge workers requested, but only {os.cpu_count() or 1} CPU core(s): "
+                  + (f"using {self.merge_pool_size}." if self.merge_pool_size > 1 else "merging in the main process."))
+        if self.merge_pool_size <= 1:
+            yield
+            return
+        # Every worker gets the courses once; tasks then only name them by original_index
+        self.merge_pool = ProcessPoolExecutor(max_workers=self.merge_pool_size, initializer=_init_merge_worker, initargs=(self.all_courses,))
+        try:
+            yield
+        finally:
+            self.merge_pool.shutdown()
+            self.merge_pool = None
+
+    @staticmethod
+    def _take(group_a: CourseGroup, group_b: CourseGroup, step_name: str):
+        """Merges group B into group A, marking the courses of both with the step."""
+        for course in group_a: course.match_method = step_name
+        for course in group_b: course.match_method = step_name
+        group_a.merge(group_b)
+
+    @staticmethod
+    def _merge_bucket(bucket: List[CourseGroup], step_name: str, can_merge: Callable, candidate_key: Optional[CandidateKey]) -> List[Tuple[int, int]]:
+        """
+        Merges the groups of one bucket with the result of the original pass loop: each group A, in
+        bucket order, takes every later group B that can_merge(A's most recent course, B's earliest
+        course, A's year mask, B's year mask) accepts, and passes repeat until one merges nothing.
+
+        Each pass only tries pairs that may have a different answer than the last time they were tried:
+        after the first pass, that is pairs where A or B took in a group since then. Candidates for B
+        are looked up in an index by candidate_key, and pairs whose years overlap are never merged
+        (which every rule of methods 4-7 requires), so those are never passed to can_merge.
+
+        The groups are merged in place. Returns the merges in the order they were made, as (position of A,
+        position of B) pairs: replaying them with _take on copies of the bucket's groups gives the same groups.
+        """
+        if len(bucket) == 2: # The most common case, decided by a single check
+            group_a, group_b = bucket
+            if can_merge(group_a.most_recent, group_b.earliest, group_a.year_mask, group_b.year_mask):
+                Grouper._take(group_a, group_b, step_name)
+                return [(0, 1)]
+            return []
+
+        key_of = candidate_key.key if candidate_key else (lambda c: ())
+        same = candidate_key.same if candidate_key else True
+        alive = [True] * len(bucket)
+        merge_order: List[Tuple[int, int]] = []
+
+        # Groups only change when they take others, which they do after every earlier group has had its turn,
+        # so within a pass each B is tried as it was at the start of the pass, and so is the index of B keys
+        keys = [key_of(group.earliest) for group in bucket]
+        index: Dict[Hashable, List[int]] = defaultdict(list)
+        for j, key in enumerate(keys):
+            if key is not None: index[key].append(j)
+
+        def find(group_a: CourseGroup, key: Optional[Hashable], index: Dict[Hashable, List[int]], after: int, before: int = len(bucket)) -> Optional[int]:
+            if key is None: return None
+            if same:
+                positions = index.get(key, ())
+                candidates = positions[bisect_right(positions, after):bisect_left(positions, before)]
+            else:
+                candidates = heapq.merge(*(positions[bisect_right(positions, after):bisect_left(positions, before)] for k, positions in index.items() if k != key))
+            rep_a, mask_a = group_a.most_recent, group_a.year_mask
+            for j in candidates:
+                group_b = bucket[j]
+                if alive[j] and not mask_a & group_b.year_mask and can_merge(rep_a, group_b.earliest, mask_a, group_b.year_mask):
+                    return j
+            return None
+
+        last_merges: Optional[Dict[int, int]] = None # Position of the last group each group took in the previous pass
+        while True:
+            merges: Dict[int, int] = {}
+            if last_merges is not None:
+                changed_index: Dict[Hashable, List[int]] = defaultdict(list)
+                for j in sorted(last_merges):
+                    if keys[j] is not None: changed_index[keys[j]].append(j)
+
+            for i, group_a in enumerate(bucket):
+                if not alive[i]: continue
+                key_a = key_of(group_a.most_recent)
+
+                if last_merges is None:
+                    j = find(group_a, key_a, index, i)
+                else:
+                    # A is unchanged since it last tried the groups after the last one it took, and so are the
+                    # groups after that point which took nothing: only the others can give a different answer now
+                    last_taken = last_merges.get(i, i)
+                    j = find(group_a, key_a, index, i, last_taken)
+                    if j is None: j = find(group_a, key_a, changed_index, last_taken)
+
+                # Once A has changed in this pass, every later group is worth trying again
+                while j is not None:
+                    Grouper._take(group_a, bucket[j], step_name)
+                    alive[j] = False
+                    merges[i] = j
+                    merge_order.append((i, j))
+                    j = find(group_a, key_of(group_a.most_recent), index, j)
+
+            if not merges: break
+            # The groups that took others may have a new earliest course, and so a new key
+            for i in merges:
+                key = key_of(bucket[i].earliest)
+                if key != keys[i]:
+                    if keys[i] is not None: index[keys[i]].remove(i)
+                    if key is not None: insort(index[key], i)
+                    keys[i] = key
+            last_merges = merges
+
+        return merge_order
     
-    def _perform_finalization_method_8(self, groups: List[List[Course]], matched_groups_by_method: Dict) -> Tuple[List[List[Course]], List[Dict], List[Course]]:
+    def _perform_finalization_method_8(self, groups: List[CourseGroup], matched_groups_by_method: Dict) -> Tuple[List[CourseGroup], List[Dict], List[Course]]:
         """Method 8: Scans groups for year conflicts, keeps one, removes others, and logs them."""
         if not self.manager: return [], [], []
         print("\n--- Applying Method 8: Final Conflict Resolution ---")
@@ -540,6 +716,13 @@ class Grouper:
         removed_courses = []
 
         for group in tqdm(groups, desc="Resolving Conflicts"):
+            dated_courses = [course for course in group if course.parsed_year != -1]
+            if group.year_mask.bit_count() == len(dated_courses): # One course per year: nothing to resolve
+                if dated_courses:
+                    dated_courses.sort(key=lambda c: c.parsed_year, reverse=True)
+                    final_groups.append(CourseGroup(dated_courses))
+                continue
+
             courses_by_year = defaultdict(list)
             for course in group:
                 if course.parsed_year != -1:
@@ -567,23 +750,23 @@ class Grouper:
             
             if valid_courses_in_group:
                 valid_courses_in_group.sort(key=lambda c: c.parsed_year, reverse=True)
-                final_groups.append(valid_courses_in_group)
+                final_groups.append(CourseGroup(valid_courses_in_group))
         
         if removed_courses:
             matched_groups_by_method["8"] = [[c] for c in removed_courses]
 
         return final_groups, conflict_log_rows, removed_courses
 
-    def assign_group_ids(self, final_groups: List[List[Course]]):
+    def assign_group_ids(self, final_groups: List[CourseGroup]):
         """Sorts final groups and assigns a unique Group ID to each course."""
         if not self.manager: return
         print("Assigning final Group IDs...")
-        final_groups.sort(key=lambda g: (self.manager.get_most_recent_course(g).code, self.manager.get_most_recent_course(g).name) if g else ("", ""))
+        final_groups.sort(key=lambda g: (g.most_recent.code, g.most_recent.name) if g else ("", ""))
         for i, group in enumerate(tqdm(final_groups, desc="Assigning IDs")):
             for course in group:
                 course.group_id = i
 
-    def write_intermediate_files(self, final_groups: List[List[Course]], matched_groups_by_method: Dict, conflicts: List[Dict], removed_courses: List[Course]):
+    def write_intermediate_files(self, final_groups: List[CourseGroup], matched_groups_by_method: Dict, conflicts: List[Dict], removed_courses: List[Course]):
         """Writes all intermediate matched_#.csv files and the classic all_groups.csv."""
         if not self.manager: return
         print("\n--- Writing Intermediate Log Files ---")
@@ -598,7 +781,7 @@ class Grouper:
         all_groups_data = self.manager.format_groups_for_intermediate_log(final_groups)
         self.manager.write_groups_to_csv(self.config.intermediate_groups_output_file, all_groups_data, self.manager.intermediate_headers)
         
-    def write_final_catalog(self, final_groups: List[List[Course]], removed_courses: List[Course]):
+    def write_final_catalog(self, final_groups: List[CourseGroup], removed_courses: List[Course]):
         """Writes the primary output file (e.g., all_catalog_2.csv)."""
         if not self.manager: return
         print(f"\n--- Writing Final Output File: {self.config.final_output_file} ---")
@@ -609,7 +792,7 @@ class Grouper:
 
         output_data = []
         for course in all_output_courses:
-            row = course.data.copy()
+            row = course.data
             row["Group ID"] = course.group_id
             row["Match Number"] = course.match_method
             output_data.append(row)
@@ -627,11 +810,14 @@ class Grouper:
             final_headers = ["Group ID", "Match Number"] + final_headers
 
         self.manager.write_csv(self.config.final_output_file, output_data, final_headers)
+        typed_copy = write_typed_copy(self.config.final_output_file)
+        if typed_copy:
+            print(f"Successfully wrote typed copy to {typed_copy}")
         
-    def write_old_groups_catalog(self, final_groups: List[List[Course]]):
+    def write_old_groups_catalog(self, final_groups: List[CourseGroup]):
         """Writes a separate file for groups whose most recent course is before 2025."""
         if not self.manager: return
-        old_groups = [g for g in final_groups if self.manager.get_most_recent_course(g).parsed_year < 2025]
+        old_groups = [g for g in final_groups if g.most_recent.parsed_year < 2025]
         if old_groups:
             old_groups_as_dicts = [[c.data for c in group] for group in old_groups]
             self.manager.write_groups_to_csv(self.config.old_groups_output_file, old_groups_as_dicts, self.manager.original_headers)
@@ -644,13 +830,33 @@ class Grouper:
         print(f"Total year conflict pairs found by Method 8: {num_conflicts}")
         print(f"Total courses included in final groups: {num_courses_in_groups}")
 
-def main():
+# --- Merge Worker Processes (see Grouper.merge_workers) ---
+_worker_courses: List[Course] = []
+
+def _init_merge_worker(courses: List[Course]):
+    global _worker_courses
+    _worker_courses = courses
+
+def _merge_buckets_in_worker(step_name: str, buckets: List[List[List[int]]]) -> List[List[Tuple[int, int]]]:
+    """Merges buckets given as the original_index of each course of each group. Returns the merges made in each bucket."""
+    can_merge, candidate_key = MERGE_RULES[step_name]
+    return [Grouper._merge_bucket([CourseGroup([_worker_courses[i] for i in group]) for group in bucket], step_name, can_merge, candidate_key)
+            for bucket in buckets]
+
+
+def main(merge_workers: int = 1):
     """Main execution function."""
-    config = Config()
+    config = Config(merge_workers=merge_workers)
     grouper = Grouper(config)
     
     grouper.load_courses()
     grouper.run_pipeline()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Group the course listings of 0_all_catalog1.csv into 0_all_catalog2.csv.")
+    parser.add_argument("--merge-workers", type=int, default=Config.merge_workers,
+                        help="Processes for merge steps 4-7, at most one per CPU core; the output is identical for any number (default: 1, no pool).")
+    args = parser.parse_args()
+    if args.merge_workers < 1:
+        parser.error("--merge-workers must be at least 1")
+    main(args.merge_workers)
@@ -4,6 +4,7 @@ from tqdm import tqdm
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Tuple, Callable
 from collections import defaultdict
+from intermediates import load_catalog_frame
 
 # ======================================================================================
 #                            METHOD DESCRIPTIONS
@@ -73,6 +74,10 @@ class Config:
     CAT_CRS_NAME = "Course Name"
     CAT_CRS_YEAR = "Year"
     CAT_CRS_LINK = "Course Link"
+    # Parsed catalog columns (see intermediates.py)
+    CAT_START_YEAR = "Start Year"
+    CAT_DEPT = "Dept Code"
+    CAT_NORM_NAME = "Normalized Name"
 
 # --- Utility Functions ---
 def normalize_string_alphanumeric_lowercase(text: str) -> str:
@@ -119,12 +124,6 @@ def parse_offering_year(year_str) -> int:
     try: return int(year_str.strip())
     except (ValueError, TypeError): return -1
 
-def extract_catalog_start_year(year_str_catalog: str) -> int:
-    """Extracts the start year from catalog's 'YYYY-YYYY' format. Int or -1."""
-    if not isinstance(year_str_catalog, str): return -1
-    match = re.match(r"(\d{4})", year_str_catalog.strip())
-    return int(match.group(1)) if match else -1
-
 def load_csv_as_list_of_dicts(filepath: str) -> Tuple[Optional[List[Dict]], List[str]]:
     """Loads CSV to list of dicts, returns (data, fieldnames)."""
     try:
@@ -140,6 +139,19 @@ def load_csv_as_list_of_dicts(filepath: str) -> Tuple[Optional[List[Dict]], List
         print(f"Error reading {filepath}: {e}")
         return None, []
 
+def load_catalog_as_list_of_dicts(filepath: str) -> Optional[List[Dict]]:
+    """Loads the catalog with its parsed columns (start year, dept code, normalized name, ...), from its typed copy if current."""
+    try:
+        catalog = load_catalog_frame(filepath).to_dict('records')
+        print(f"Loaded {len(catalog)} catalog rows from {filepath}")
+        return catalog
+    except FileNotFoundError:
+        print(f"Error: File not found - {filepath}")
+        return None
+    except Exception as e:
+        print(f"Error reading {filepath}: {e}")
+        return None
+
 def write_list_of_dicts_to_csv(filepath: str, data: List[Dict], fieldnames: List[str]):
     """Writes list of dicts to CSV."""
     if not data and not fieldnames: return True # Nothing to write
@@ -162,7 +174,7 @@ def is_year_match(offering: Dict, catalog_row: Dict) -> bool:
     """Checks if the offering's academic year aligns with the catalog entry's year."""
     ofr_y = parse_offering_year(offering.get(Config.OFR_CRS_YEAR,""))
     ofr_s = offering.get(Config.OFR_BROAD_SEMESTER,"").strip().lower()
-    cat_start_y = extract_catalog_start_year(catalog_row.get(Config.CAT_CRS_YEAR,""))
+    cat_start_y = catalog_row[Config.CAT_START_YEAR]
 
     if ofr_y == -1 or cat_start_y == -1:
         return False
@@ -200,8 +212,9 @@ def build_lookups(catalog_data: List[Dict]):
     for r in tqdm(catalog_data, desc="Building Lookups"):
         code = r.get(Config.CAT_CRS_CODE,"").strip()
         name = r.get(Config.CAT_CRS_NAME,"").strip()
-        norm_name = normalize_string_alphanumeric_lowercase(name)
-        dept = extract_department_code(code)
+        norm_name = r[Config.CAT_NORM_NAME]
+        dept = r[Config.CAT_DEPT]
+        # Grade level and course number are matched with this script's own looser rules (any digit / any 3-4 digit run)
         gl = extract_grade_level(code)
         course_num = extract_course_number(code)
         
@@ -315,7 +328,7 @@ def main():
     config = Config()
     
     offerings, offerings_hdrs = load_csv_as_list_of_dicts(config.offerings_input_file)
-    catalog, _ = load_csv_as_list_of_dicts(config.catalog_input_file)
+    catalog = load_catalog_as_list_of_dicts(config.catalog_input_file)
 
     if offerings is None or catalog is None:
         print("Failed to load required files. Exiting.")
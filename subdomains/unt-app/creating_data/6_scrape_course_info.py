@@ -1,225 +1,281 @@
 import asyncio
 import csv
-import re
+import json
 import os
 import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urlsplit
 import pandas as pd
-import aiohttp
-from bs4 import BeautifulSoup
-from tqdm.asyncio import tqdm as async_tqdm
 from tqdm import tqdm
+from fetcher import Fetcher
+from course_preview_parser import parse_course_html, SCRAPED_DATA_COLUMNS
+import telemetry
+from intermediates import load_catalog_frame
 
 # --- Configuration ---
 INPUT_CSV = '0_all_catalog2.csv'
 OUTPUT_CSV = 'all_catalog.csv'
+# Every scraped course is appended to this journal as one JSON line as soon as it is parsed.
+# A rerun replays it and only scrapes the rest; delete it to scrape everything again.
+# Each line records the course's Catalog ID and Course Link; lines whose link no longer matches the
+# input row with that Catalog ID (e.g. after the IDs were renumbered) are ignored.
+JOURNAL_FILE = '0_course_info_journal.jsonl'
 REPEAT_UNTIL_COMPLETE = True
-SAVE_FREQUENCY = 100
-RETRY_PAUSE_SECONDS = 10
+MAX_FAILED_PASSES = 3 # A course given up on in this many passes (e.g. a 404) is left out of later passes and reported
+SAVE_FREQUENCY = 100 # Results between forced writes (fsync) of the journal to disk (and rate reports)
+# --- Retries ---
+# A failed course is put back at the tail of the queue after its own exponential backoff
+# (RETRY_BASE_DELAY_SECONDS * 2^(attempt-1), capped, with +/-50% jitter); the other workers keep going.
+RETRY_BASE_DELAY_SECONDS = 2
+RETRY_MAX_DELAY_SECONDS = 120
+MAX_ATTEMPTS_PER_PASS = 8 # After this many failures a course is left for the next pass
 # --- Throttling and Rate-Limiting ---
 # The maximum number of requests that can be "in-flight" at any given time.
-# This is the most important setting for preventing rate-limit issues.
+# Requests go through the shared Fetcher (fetcher.py), which paces catalog.unt.edu with a
+# token bucket and adapts the number of in-flight requests below this ceiling (AIMD).
 MAX_CONCURRENT_REQUESTS = 15
-# The base delay before each request begins.
-REQUEST_DELAY_SECONDS = 0.25
-HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+# --- Parsing ---
+# Pages are parsed in a pool of worker processes while the event loop keeps fetching,
+# so the number of requests in flight is not limited by single-core parse speed.
+PARSE_WORKERS = os.cpu_count() or 1
+# Workers pulling courses from the queue. Enough to keep every fetch slot busy while other pages are parsed.
+NUM_WORKERS = MAX_CONCURRENT_REQUESTS + PARSE_WORKERS
+QUEUE_SIZE = 2 * NUM_WORKERS # Courses buffered ahead of the workers
 
 FINAL_COLUMN_ORDER = [
     'Catalog ID', 'Group ID', 'Match Number', 'Course Code', 'Course Name',
     'Catalog Code', 'Year', 'Catalog Type', 'Course Link', 'Course Scraped',
     'Hours', 'Specific Hours', 'Description', 'Prerequisite(s)', 'Course Fees', 'Other'
 ]
-SCRAPED_DATA_COLUMNS = ['Hours', 'Specific Hours', 'Description', 'Prerequisite(s)', 'Course Fees', 'Other']
-
-def clean_text(text):
-    """Normalizes whitespace in a string."""
-    return ' '.join(text.split()).replace(' ,', ',')
-
-def save_progress(df: pd.DataFrame):
-    """Helper function to save the current state of the DataFrame to the output file."""
-    temp_df = df.reindex(columns=FINAL_COLUMN_ORDER)
-    temp_df = temp_df.drop(columns=['Year_Int'], errors='ignore')
-    temp_df.fillna('', inplace=True)
-    temp_df.to_csv(OUTPUT_CSV, index=False, quoting=csv.QUOTE_MINIMAL)
-
-def parse_course_html(html_content: str) -> dict:
-    """Parses course HTML with robust logic for all fields."""
-    details = {key: '' for key in SCRAPED_DATA_COLUMNS}
-    extracted_fragments = []
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    h1 = soup.find('h1', id='course_preview_title')
-    if not h1 or not h1.parent or h1.parent.name != 'p': return details
-
-    h1_text = h1.get_text(strip=True)
-    data_text = ' '.join(h1.parent.get_text(separator='---').strip().split('---'))
-    data_text = clean_text(data_text.replace(h1_text, '', 1))
-    original_data_text = data_text
-
-    hours_match = re.match(r'([\d–-]+\s+hours?(\s*\([^)]+\))?)', data_text)
-    if hours_match:
-        hours_block = hours_match.group(0)
-        extracted_fragments.append(hours_block)
-        details['Hours'] = (re.search(r'[\d–-]+', hours_block) or pd.NA).group(0) or ''
-        specific_match = re.search(r'\([^)]+\)', hours_block)
-        if specific_match: details['Specific Hours'] = specific_match.group(0)
-        data_text = data_text[hours_match.end():].strip()
-
-    other_triggers = ['May be repeated', 'May only be taken', 'Not offered every term']
-    stop_pattern = '|'.join(['Course specific fees'] + other_triggers)
-    prereq_match = re.search(r'Prerequisite\(s\):', data_text, re.I)
-    fees_match = re.search(r'Course specific fees', data_text, re.I)
-    
-    first_marker_pos = len(data_text)
-    if prereq_match: first_marker_pos = min(first_marker_pos, prereq_match.start())
-    if fees_match: first_marker_pos = min(first_marker_pos, fees_match.start())
-    
-    description_text = data_text[:first_marker_pos].strip()
-    if description_text:
-        details['Description'] = description_text
-        extracted_fragments.append(description_text)
-
-    if prereq_match:
-        prereq_search_text = data_text[prereq_match.start():]
-        prereq_block_match = re.search(f'Prerequisite\\(s\\):.*?(?=({stop_pattern}|$))', prereq_search_text, re.I | re.S)
-        if prereq_block_match:
-            prereq_full_block = prereq_block_match.group(0).strip()
-            extracted_fragments.append(prereq_full_block)
-            prereq_content = re.sub(r'Prerequisite\(s\):', '', prereq_full_block, flags=re.I).strip()
-            if prereq_content.lower() not in ('none', 'none.'): details['Prerequisite(s)'] = prereq_content
-
-    if fees_match:
-        fees_search_text = data_text[fees_match.start():]
-        fees_block_match = re.search(r'Course specific fees.*', fees_search_text, re.I | re.S)
-        if fees_block_match:
-            fees_full_block = fees_block_match.group(0).strip()
-            extracted_fragments.append(fees_full_block)
-            fees_content = re.sub(r'Course specific fees(?:.|\n)*?:\s*', '', fees_full_block, flags=re.I).strip()
-            details['Course Fees'] = fees_content
-    
-    other_text = original_data_text
-    for fragment in extracted_fragments:
-        other_text = other_text.replace(fragment, '', 1).strip()
-    details['Other'] = other_text
-    
-    for key, value in details.items():
-        if isinstance(value, str): details[key] = clean_text(value)
-    return details
-
-async def fetch_and_parse(session: aiohttp.ClientSession, course: pd.Series, semaphore: asyncio.Semaphore) -> dict:
-    """Acquires a semaphore slot, then performs a single fetch and parse."""
-    # This will wait until a "pass" is available from the semaphore.
-    async with semaphore:
-        await asyncio.sleep(REQUEST_DELAY_SECONDS)
-        async with session.get(course['Course Link'], headers=HEADERS, timeout=20) as response:
-            response.raise_for_status()
-            html = await response.text()
-            return {'Catalog ID': course['Catalog ID'], **parse_course_html(html)}
-
-async def safe_fetch_and_parse(session: aiohttp.ClientSession, course: pd.Series, semaphore: asyncio.Semaphore) -> dict:
-    """Wrapper that catches exceptions from fetch_and_parse to prevent halting gather."""
+
+def replay_journal(filepath: str, course_links: dict) -> tuple:
+    """
+    Reads the journal into {Catalog ID: scraped details}, keeping only records whose Course Link
+    matches course_links ({Catalog ID: Course Link} of the input). Later lines win, and a line cut
+    off by an interrupted run is skipped (that course is simply scraped again).
+    Returns the journal and the number of records dropped because their link didn't match.
+    """
+    journal = {}
+    stale = 0
+    if not os.path.exists(filepath):
+        return journal, stale
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('Course Link') != course_links.get(record['Catalog ID']):
+                stale += 1
+                continue
+            journal[record['Catalog ID']] = record
+    return journal, stale
+
+def append_to_journal(journal_file, record: dict):
+    """Appends one scraped course to the open journal file."""
+    journal_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    journal_file.flush()
+
+def build_output(df: pd.DataFrame, journal: dict) -> pd.DataFrame:
+    """Joins the journaled details onto the input rows by Catalog ID, in one vectorized merge."""
+    journal_df = pd.DataFrame.from_records(list(journal.values()), columns=['Catalog ID'] + SCRAPED_DATA_COLUMNS)
+    output_df = df.drop(columns=SCRAPED_DATA_COLUMNS + ['Course Scraped', 'Year_Int'], errors='ignore')
+    output_df = output_df.merge(journal_df, on='Catalog ID', how='left')
+    output_df['Course Scraped'] = output_df['Catalog ID'].isin(journal.keys())
+    output_df = output_df.reindex(columns=FINAL_COLUMN_ORDER)
+    return output_df.fillna('')
+
+def save_output(df: pd.DataFrame, journal: dict):
+    """Writes the final CSV from the input rows and the journal."""
+    build_output(df, journal).to_csv(OUTPUT_CSV, index=False, quoting=csv.QUOTE_MINIMAL)
+
+def timed_parse_course_html(html_content: str) -> tuple:
+    """Runs in a parse worker process. Returns the parsed details and the seconds spent parsing."""
+    started = time.perf_counter()
+    details = parse_course_html(html_content)
+    return details, time.perf_counter() - started
+
+class PipelineStats:
+    """Counts fetched and parsed pages to report the throughput of each stage separately."""
+    def __init__(self, parse_workers: int):
+        self.parse_workers = parse_workers
+        self.started_at = time.monotonic()
+        self.fetched = 0
+        self.parsed = 0
+        self.parse_seconds = 0.0
+
+    def describe(self) -> str:
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        per_worker = self.parsed / self.parse_seconds if self.parse_seconds else 0.0
+        return (f"fetch: {self.fetched} pages ({self.fetched / elapsed:.1f} pages/s); "
+                f"parse: {self.parsed} pages ({self.parsed / elapsed:.1f} pages/s, "
+                f"capacity {per_worker * self.parse_workers:.1f} pages/s on {self.parse_workers} workers)")
+
+@dataclass
+class CourseJob:
+    """One course waiting in the queue (only the fields needed to scrape it)."""
+    catalog_id: str
+    course_code: str
+    course_link: str
+    attempts: int = 0
+
+def retry_delay(attempts: int) -> float:
+    """Jittered exponential backoff for a course that has failed `attempts` times."""
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+async def fetch_and_parse(fetcher: Fetcher, job: CourseJob, parse_pool: ProcessPoolExecutor, stats: PipelineStats) -> dict:
+    """
+    Performs a single rate-limited fetch, then hands the page to the parse pool.
+    The fetcher slot is released as soon as the download finishes, so the next fetch
+    starts while this page is still being parsed.
+    """
+    html = await fetcher.get_text(job.course_link, timeout=20)
+    stats.fetched += 1
+    details, parse_seconds = await asyncio.get_running_loop().run_in_executor(parse_pool, timed_parse_course_html, html)
+    stats.parsed += 1
+    stats.parse_seconds += parse_seconds
+    telemetry.record_parse(parse_seconds)
+    return {'Catalog ID': job.catalog_id, 'Course Link': job.course_link, **details}
+
+async def scrape_pass(fetcher: Fetcher, jobs, total: int, desc: str, parse_pool: ProcessPoolExecutor, stats: PipelineStats,
+                      journal: dict, journal_file, overall_pbar=None) -> int:
+    """
+    Scrapes one pass of courses with a fixed pool of NUM_WORKERS workers fed from a bounded queue.
+    `jobs` is consumed lazily, so only QUEUE_SIZE courses (plus those waiting to be retried) are
+    held in memory at once. Returns the Catalog IDs of the courses given up on for this pass.
+    """
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    pass_pbar = tqdm(total=total, desc=desc, unit="course")
+    retry_tasks = set()
+    given_up = []
+    completed_since_report = 0
+
+    async def requeue(job: CourseJob, delay: float):
+        await asyncio.sleep(delay)
+        await queue.put(job)
+        queue.task_done() # Marks the failed attempt done only once the retry is queued, so join() keeps waiting
+
+    async def worker():
+        nonlocal completed_since_report
+        while True:
+            job = await queue.get()
+            try:
+                result = await fetch_and_parse(fetcher, job, parse_pool, stats)
+            except Exception as e:
+                job.attempts += 1
+                if job.attempts >= MAX_ATTEMPTS_PER_PASS:
+                    given_up.append(job.catalog_id)
+                    tqdm.write(f"❌ Giving up on {job.course_code} for this pass after {job.attempts} attempts. Reason: {e.__class__.__name__}")
+                    queue.task_done()
+                    continue
+                delay = retry_delay(job.attempts)
+                telemetry.record_retry(urlsplit(job.course_link).hostname)
+                tqdm.write(f"⚠️ Request for {job.course_code} failed ({e.__class__.__name__}). Retrying in {delay:.1f}s.")
+                task = asyncio.create_task(requeue(job, delay))
+                retry_tasks.add(task)
+                task.add_done_callback(retry_tasks.discard)
+                continue
+
+            journal[result['Catalog ID']] = result
+            append_to_journal(journal_file, result)
+            pass_pbar.update(1)
+            if overall_pbar is not None:
+                overall_pbar.update(1)
+            completed_since_report += 1
+            if completed_since_report >= SAVE_FREQUENCY:
+                os.fsync(journal_file.fileno())
+                completed_since_report = 0
+                tqdm.write(f"Current request rates: {fetcher.describe_rates()}")
+                tqdm.write(f"Throughput: {stats.describe()}")
+            queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(NUM_WORKERS)]
     try:
-        return await fetch_and_parse(session, course, semaphore)
-    except Exception as e:
-        return {'error': e, 'course_code': course['Course Code']}
+        for job in jobs:
+            await queue.put(job)
+        await queue.join()
+    finally:
+        for task in workers + list(retry_tasks):
+            task.cancel()
+        await asyncio.gather(*workers, *retry_tasks, return_exceptions=True)
+        pass_pbar.close()
+    return given_up
 
 async def main():
     """Main function to orchestrate the scraping process."""
+    telemetry.start_stage("6_scrape_course_info")
     if not os.path.exists(INPUT_CSV):
         print(f"❌ Error: Input file '{INPUT_CSV}' not found.")
         return
 
-    source_file_for_loop = OUTPUT_CSV if os.path.exists(OUTPUT_CSV) else INPUT_CSV
+    # String columns plus parsed ones such as "Start Year", from the typed copy of the input when it is current
+    df = load_catalog_frame(INPUT_CSV)
+    df['Year_Int'] = df['Start Year'].where(df['Start Year'] >= 0)
+    journal, stale = replay_journal(JOURNAL_FILE, dict(zip(df['Catalog ID'], df['Course Link'])))
+    if journal:
+        print(f"📖 Replayed {len(journal)} scraped courses from '{JOURNAL_FILE}'.")
+    if stale:
+        print(f"⚠️ Ignored {stale} journal records whose Course Link no longer matches their Catalog ID; those courses will be scraped again.")
+
     overall_pbar = None
     if REPEAT_UNTIL_COMPLETE:
-        temp_df = pd.read_csv(source_file_for_loop, dtype=str)
-        if 'Course Scraped' not in temp_df.columns: temp_df['Course Scraped'] = 'False'
-        temp_df['Course Scraped'] = temp_df['Course Scraped'].fillna('False').str.lower().isin(['true', '1', 't'])
-        total_to_scrape = (~temp_df['Course Scraped']).sum()
+        total_to_scrape = (~df['Catalog ID'].isin(journal.keys())).sum()
         if total_to_scrape == 0:
-            print("✅ All courses already marked as scraped.")
+            save_output(df, journal)
+            print(f"✅ All courses already scraped. Output written to '{OUTPUT_CSV}'.")
             return
         overall_pbar = tqdm(total=total_to_scrape, desc="Overall Progress", unit="course", smoothing=0)
 
     pass_num = 1
     main_loop_active = True
-    # Create the semaphore to control concurrency
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-    
-    while main_loop_active:
-        if pass_num == 1:
-            source_file = INPUT_CSV
-            print(f"--- Starting Pass 1: Reading from '{source_file}' ---")
-        else:
-            source_file = OUTPUT_CSV
-            print(f"\n--- Starting Pass {pass_num}: Reading from '{source_file}' to continue progress ---")
-        
-        if not os.path.exists(source_file):
-            print(f"❌ Error: Source file '{source_file}' not found. Halting.")
-            break
-            
-        df = pd.read_csv(source_file, dtype=str)
-        if 'Course Scraped' not in df.columns: df['Course Scraped'] = 'False'
-        for col in SCRAPED_DATA_COLUMNS:
-            if col not in df.columns: df[col] = ''
-        df['Course Scraped'] = df['Course Scraped'].fillna('False').str.lower().isin(['true', '1', 't'])
-        df['Year_Int'] = pd.to_numeric(df['Year'].str.split('-').str[0], errors='coerce')
-
-        unscraped_df = df[~df['Course Scraped']].copy()
-        unscraped_df.dropna(subset=['Year_Int', 'Group ID'], inplace=True)
-
-        if unscraped_df.empty:
-            if pass_num == 1: print("\n✅ No unscraped courses found to process.")
-            else: print("\n✅ All available courses have been scraped.")
-            break
-        
-        pass_courses_to_scrape = df.loc[unscraped_df.groupby('Group ID')['Year_Int'].idxmax()].index
-        pass_desc = f"Pass {pass_num}" if REPEAT_UNTIL_COMPLETE else "Scraping Courses"
-        scraped_since_last_save = 0
-        
-        async with aiohttp.ClientSession() as session:
-            while not pass_courses_to_scrape.empty:
-                # Pass the semaphore to each task
-                tasks = [safe_fetch_and_parse(session, df.loc[idx], semaphore) for idx in pass_courses_to_scrape]
-                results = await async_tqdm.gather(*tasks, desc=pass_desc, unit="course")
-
-                successful_indices = []
-                failed_indices = []
-
-                for i, res in enumerate(results):
-                    original_df_index = pass_courses_to_scrape[i]
-                    if 'error' in res:
-                        failed_indices.append(original_df_index)
-                        tqdm.write(f"⚠️ Request for {res['course_code']} failed. Reason: {res['error'].__class__.__name__}")
-                    else:
-                        successful_indices.append(original_df_index)
-                        idx = df[df['Catalog ID'] == res['Catalog ID']].index
-                        if not idx.empty:
-                            for key, value in res.items():
-                                if key in df.columns: df.loc[idx, key] = value
-                            df.loc[idx, 'Course Scraped'] = True
-                        scraped_since_last_save += 1
-                
-                if overall_pbar is not None:
-                    overall_pbar.update(len(successful_indices))
-                
-                if scraped_since_last_save >= SAVE_FREQUENCY:
-                    save_progress(df)
-                    print(f"💾 Progress saved. {scraped_since_last_save} courses since last save.")
-                    scraped_since_last_save = 0
-
-                pass_courses_to_scrape = pd.Index(failed_indices)
-
-                if not pass_courses_to_scrape.empty:
-                    print(f"Encountered {len(failed_indices)} errors. Pausing for {RETRY_PAUSE_SECONDS}s before retrying...")
-                    await asyncio.sleep(RETRY_PAUSE_SECONDS)
-
-        save_progress(df)
-        print(f"💾 Pass {pass_num} complete. Final progress saved to '{OUTPUT_CSV}'.")
-
-        if not REPEAT_UNTIL_COMPLETE:
-            main_loop_active = False
-        pass_num += 1
+    failed_passes = Counter() # Catalog ID -> passes in which the course was given up on
+    # One fetcher for the whole run, so the learned rate and concurrency carry over between passes
+    fetcher = Fetcher(max_concurrency=MAX_CONCURRENT_REQUESTS)
+    stats = PipelineStats(PARSE_WORKERS)
+    with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as parse_pool, open(JOURNAL_FILE, 'a', encoding='utf-8') as journal_file:
+        while main_loop_active:
+            print(f"\n--- Starting Pass {pass_num} ---")
+
+            unscraped_df = df[~df['Catalog ID'].isin(journal.keys())]
+            unscraped_df = unscraped_df[unscraped_df['Year_Int'].notna() & (unscraped_df['Group ID'] != '')]
+            unresolved_ids = [cid for cid, count in failed_passes.items() if count >= MAX_FAILED_PASSES]
+            unscraped_df = unscraped_df[~unscraped_df['Catalog ID'].isin(unresolved_ids)]
+
+            if unscraped_df.empty:
+                if pass_num == 1: print("\n✅ No unscraped courses found to process.")
+                else: print("\n✅ All available courses have been scraped.")
+                break
+
+            pass_courses_to_scrape = unscraped_df.groupby('Group ID')['Year_Int'].idxmax().values
+            pass_desc = f"Pass {pass_num}" if REPEAT_UNTIL_COMPLETE else "Scraping Courses"
+            jobs = (CourseJob(*row) for row in df.loc[pass_courses_to_scrape, ['Catalog ID', 'Course Code', 'Course Link']].itertuples(index=False))
+
+            async with fetcher:
+                given_up = await scrape_pass(fetcher, jobs, len(pass_courses_to_scrape), pass_desc, parse_pool, stats,
+                                             journal, journal_file, overall_pbar)
+            os.fsync(journal_file.fileno())
+            tqdm.write(f"Current request rates: {fetcher.describe_rates()}")
+            if given_up:
+                failed_passes.update(given_up)
+                print(f"⚠️ {len(given_up)} courses kept failing and were left for the next pass.")
+
+            print(f"💾 Pass {pass_num} complete. {len(journal)} courses recorded in '{JOURNAL_FILE}'.")
+
+            if not REPEAT_UNTIL_COMPLETE:
+                main_loop_active = False
+            pass_num += 1
 
+    unresolved_ids = [cid for cid, count in failed_passes.items() if count >= MAX_FAILED_PASSES]
+    if unresolved_ids:
+        print(f"⚠️ {len(unresolved_ids)} courses failed in {MAX_FAILED_PASSES} passes and were not scraped (Catalog IDs: {', '.join(unresolved_ids)}).")
+    save_output(df, journal)
+    print(f"💾 Output written to '{OUTPUT_CSV}'.")
+    print(f"Final throughput: {stats.describe()}")
+    telemetry.write_reports()
     if overall_pbar is not None:
         overall_pbar.close()
         print("\n🎉 Full scraping process complete.")
@@ -0,0 +1,188 @@
+import argparse
+import contextlib
+import csv
+import filecmp
+import glob
+import importlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# --- Script Overview ---
+# Checks 4_catalog_groups.py against the original script (benchmarks/baseline_catalog_groups.py,
+# an unchanged copy of it from before the merge engine was rewritten) and times the merge steps of both.
+# 1. Runs both scripts on the same "0_all_catalog1.csv", each in its own temporary folder and with
+#    "output_intermediate_files" on.
+# 2. Every file written (0_all_catalog2.csv, all_groups.csv and each matched_*.csv) must be
+#    byte-identical between the two runs. This check always runs.
+# 3. With --golden FILE, the new 0_all_catalog2.csv must also match FILE, e.g. the
+#    0_all_catalog2.csv you already have for the same input.
+# Without --input, a catalog is generated with the cases that make buckets large: generic names
+# ("Special Topics") on many course numbers in one department, numbered sequences (I, II, III) and
+# course codes that are renumbered over the years. The default (DEFAULT_HISTORIES histories in
+# DEFAULT_DEPARTMENTS departments) has large buckets, where the indexed merge engine pays off most.
+# With small buckets (e.g. --histories 6000 --departments 60) the engine itself is no faster than
+# the original pass loops run on the same groups (0.9-1.5x between runs), since building its indexes
+# costs about as much as the few pairs it skips; the script is still faster overall (about 3x on
+# merge steps 3-7) thanks to the cheaper courses and year sets.
+# Run from the "creating_data" folder:
+#   python benchmarks/bench_catalog_groups.py [--histories N] [--departments N] [--seed N]
+#   python benchmarks/bench_catalog_groups.py --input 0_all_catalog1.csv --golden 0_all_catalog2.csv
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CREATING_DATA_DIR = os.path.dirname(HERE)
+sys.path.insert(0, CREATING_DATA_DIR)
+sys.path.insert(0, HERE)
+
+catalog_groups = importlib.import_module("4_catalog_groups")
+baseline_catalog_groups = importlib.import_module("baseline_catalog_groups")
+
+CATALOG_HEADERS = ["Catalog ID", "Course Code", "Course Name", "Catalog Code", "Year", "Catalog Type", "Course Link"]
+GENERIC_NAMES = ["Special Topics", "Independent Study", "Topics in Music", "Readings", "Seminar"]
+WORDS = "Introduction Advanced Topics Principles Theory Methods Analysis Design Systems Programming Laboratory Research Applied Data History Ethics Statistics Networks".split()
+ROMAN_NUMERALS = ["I", "II", "III", "IV", "V"]
+MERGE_STEPS = ["3", "4", "5a", "5b", "5c", "5d", "5e", "6", "7"]
+DEFAULT_HISTORIES = 20000
+DEFAULT_DEPARTMENTS = 10
+
+
+def generate_catalog(filename, histories, departments, seed):
+    """Writes a synthetic 0_all_catalog1.csv with `histories` course histories. Returns the row count."""
+    rng = random.Random(seed)
+    depts = ["".join(rng.choice("ABCDEFGHIKLMNOPRSTUW") for _ in range(rng.choice([3, 4, 4]))) for _ in range(departments)]
+    rows = []
+
+    def add(code, name, year):
+        rows.append([code, name, str(30 + year - 2011), f"{year}-{year + 1}", "Undergraduate",
+                     f"https://catalog.unt.edu/preview_course_nopop.php?catoid={year}&coid={100000 + len(rows)}"])
+
+    for _ in range(histories):
+        dept, number, kind = rng.choice(depts), rng.randint(1000, 4999), rng.random()
+        if kind < 0.3: # A generic name on one course number, for a few years
+            name = rng.choice(GENERIC_NAMES) + (" " + rng.choice(ROMAN_NUMERALS[:3]) if rng.random() < 0.2 else "")
+            start = rng.randint(2011, 2025)
+            for year in range(start, min(2025, start + rng.randint(0, 6)) + 1):
+                if rng.random() < 0.85:
+                    add(f"{dept} {number}", name + (": " + rng.choice(WORDS) if rng.random() < 0.2 else ""), year)
+        elif kind < 0.4: # A sequence (I, II, III, ...) started in consecutive years
+            base, start = " ".join(rng.sample(WORDS, 2)), rng.randint(2011, 2022)
+            for k in range(rng.randint(2, 4)):
+                for year in range(start + k, min(2025, start + k + rng.randint(0, 2)) + 1):
+                    add(f"{dept} {number + k}", f"{base} {ROMAN_NUMERALS[k]}", year)
+        else: # A regular course that is renumbered or renamed now and then
+            code, name = f"{dept} {number}", " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+            start = rng.randint(2011, 2025)
+            for year in range(start, rng.randint(start, 2025) + 1):
+                change = rng.random()
+                if change < 0.04: code = f"{dept} {number // 10 * 10 + rng.randint(0, 9)}"
+                elif change < 0.07: code = f"{dept} {number // 100 * 100 + rng.randint(0, 99)}"
+                elif change < 0.09: code = f"{dept} {number // 1000 * 1000 + rng.randint(0, 999)}"
+                elif change < 0.10: code = f"{rng.choice(depts)} {code.split()[1]}"
+                if rng.random() < 0.04: name += " " + rng.choice(WORDS)
+                for _ in range(2 if rng.random() < 0.01 else 1):
+                    add(code, name, year)
+
+    rows.sort()
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CATALOG_HEADERS)
+        writer.writerows([i] + row for i, row in enumerate(rows))
+    return len(rows)
+
+
+def timed(step_times, step_name, function):
+    """Wraps a merge method so the time of each call is added to step_times[step_name]."""
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = function(*args, **kwargs)
+        step = step_name if step_name != "buckets" else args[1]
+        step_times[step] = step_times.get(step, 0.0) + time.perf_counter() - started
+        return result
+    return wrapper
+
+
+def run_grouper(module, input_file, workdir):
+    """Runs a catalog grouping script (module) on input_file, writing into workdir. Returns the merge time of each step."""
+    config = module.Config(input_file=input_file, output_intermediate_files=True)
+    grouper = module.Grouper(config)
+    step_times = {}
+    grouper._merge_sequential_courses = timed(step_times, "3", grouper._merge_sequential_courses)
+    grouper._merge_within_buckets = timed(step_times, "buckets", grouper._merge_within_buckets)
+
+    previous_cwd = os.getcwd()
+    os.makedirs(workdir)
+    try:
+        os.chdir(workdir)
+        with open("grouper.log", "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            grouper.load_courses()
+            grouper.run_pipeline()
+    finally:
+        os.chdir(previous_cwd)
+    return step_times
+
+
+def compare_outputs(reference_dir, new_dir):
+    """Names of the CSV files that differ (or exist in only one of the folders)."""
+    names = sorted({os.path.basename(path) for folder in (reference_dir, new_dir) for path in glob.glob(os.path.join(folder, "*.csv"))})
+    return [name for name in names
+            if not (os.path.exists(os.path.join(reference_dir, name)) and os.path.exists(os.path.join(new_dir, name))
+                    and filecmp.cmp(os.path.join(reference_dir, name), os.path.join(new_dir, name), shallow=False))]
+
+
+def main(args):
+    workdir = tempfile.mkdtemp(prefix="catalog_groups_bench_")
+    try:
+        if args.input:
+            input_file = os.path.abspath(args.input)
+            print(f"Input: {args.input}")
+        else:
+            input_file = os.path.join(workdir, "0_all_catalog1.csv")
+            departments = args.departments
+            rows = generate_catalog(input_file, args.histories, departments, args.seed)
+            print(f"Input: generated catalog with {rows} rows ({args.histories} course histories in {departments} departments, seed {args.seed})")
+
+        reference_dir, new_dir = os.path.join(workdir, "original"), os.path.join(workdir, "new")
+        reference_times = run_grouper(baseline_catalog_groups, input_file, reference_dir)
+        new_times = run_grouper(catalog_groups, input_file, new_dir)
+
+        print(f"{'Step':<6}{'original s':>13}{'new s':>10}{'speedup':>10}")
+        for step in MERGE_STEPS + ["total"]:
+            reference_time = sum(reference_times.values()) if step == "total" else reference_times.get(step, 0.0)
+            new_time = sum(new_times.values()) if step == "total" else new_times.get(step, 0.0)
+            print(f"{step:<6}{reference_time:>13.3f}{new_time:>10.3f}{reference_time / new_time if new_time else float('nan'):>9.1f}x")
+
+        mismatches = compare_outputs(reference_dir, new_dir)
+        for name in mismatches:
+            print(f"❌ {name} differs from the original script's.")
+        print(f"Compared {len(glob.glob(os.path.join(new_dir, '*.csv')))} output files with the original script's: {len(mismatches)} differ.")
+
+        if args.golden:
+            new_catalog = os.path.join(new_dir, catalog_groups.Config.final_output_file)
+            if filecmp.cmp(args.golden, new_catalog, shallow=False):
+                print(f"✅ {catalog_groups.Config.final_output_file} matches '{args.golden}'.")
+            else:
+                print(f"❌ {catalog_groups.Config.final_output_file} differs from '{args.golden}'.")
+                mismatches.append(args.golden)
+
+        if args.keep_workdir:
+            print(f"Inputs, outputs and logs kept in '{workdir}'.")
+    finally:
+        if not args.keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check 4_catalog_groups.py against the original script and time the merge steps of both.")
+    parser.add_argument("--input", default=None, help="0_all_catalog1.csv to group (default: a generated catalog).")
+    parser.add_argument("--golden", default=None, help="0_all_catalog2.csv the new output must be identical to.")
+    parser.add_argument("--histories", type=int, default=DEFAULT_HISTORIES, help=f"Course histories in the generated catalog (default: {DEFAULT_HISTORIES}).")
+    parser.add_argument("--departments", type=int, default=DEFAULT_DEPARTMENTS, help=f"Departments in the generated catalog; fewer makes bigger buckets (default: {DEFAULT_DEPARTMENTS}).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated catalog (default: 0).")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the temporary folder with both runs' files and logs.")
+    main(parser.parse_args())
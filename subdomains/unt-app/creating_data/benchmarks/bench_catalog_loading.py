@@ -0,0 +1,214 @@
+import argparse
+import contextlib
+import csv
+import gc
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from tqdm import tqdm
+
+# --- Script Overview ---
+# Checks and times the catalog loading of 4_catalog_groups.py (Grouper.load_courses, which builds
+# its Courses from the columns parsed by intermediates.add_parsed_columns) against the original
+# loader (reference_load_courses below: csv.DictReader, with four regexes run on every row).
+# 1. Generates a catalog (about 1M rows by default) plus EDGE_NAMES, names that are easy to parse
+#    wrong (colons, spacing, numerals without a space, non-ASCII letters).
+# 2. Loads it with the reference loader, then with load_courses from the CSV (one vectorized pass),
+#    then writes the typed Parquet copy and loads it with load_courses again (needs pyarrow).
+# 3. Every course must have the same row and parsed fields as the reference (compared by hash,
+#    so the three loads never have to be in memory at the same time).
+# 4. Prints the time of each load and the speedup over the reference.
+# Run from the "creating_data" folder:
+#   python benchmarks/bench_catalog_loading.py [--histories N] [--seed N]
+#   python benchmarks/bench_catalog_loading.py --input 0_all_catalog1.csv
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from bench_catalog_groups import catalog_groups, generate_catalog # noqa: E402
+import intermediates # noqa: E402
+
+EDGE_NAMES = [
+    "Topics II: Ethics", "Topics  II : Ethics: Part 2", "Seminar:", ": Untitled", "Readings IIII", "Readings XI",
+    "Studio IX", "Studio\tVIII", "Calculus II ", " Calculus I", "II", "Music V", "Topics in ÉTUDES I",
+    "Études Françaises II: Littérature", "Straße III", "Advanced_Topics", "Data Science 2", "Lab-II",
+]
+FIELDS = ["code", "name", "parsed_year", "dept_code", "course_number", "grade_level", "normalized_name",
+          "base_name", "roman_numeral", "subtitle", "normalized_base_name"]
+
+
+# --- The original loader, as it was before the vectorized pass ---
+@dataclass
+class ReferenceCourse:
+    data: Dict[str, Any]
+    original_index: int
+    parsed_year: int = -1
+    dept_code: str = ""
+    course_number: str = ""
+    grade_level: int = -1
+    base_name: str = ""
+    roman_numeral: str = ""
+    subtitle: str = ""
+
+    def __post_init__(self):
+        self.parsed_year = self._extract_year()
+        self.dept_code = self._extract_dept_code()
+        self.course_number, self.grade_level = self._extract_course_number_and_level()
+        self.base_name, self.roman_numeral, self.subtitle = self._parse_semantic_name()
+
+    def _extract_year(self) -> int:
+        year_str = self.data.get("Year", "")
+        if not isinstance(year_str, str): return -1
+        match = re.match(r"(\d{4})", year_str.strip())
+        return int(match.group(1)) if match else -1
+
+    def _extract_dept_code(self) -> str:
+        code_str = self.data.get("Course Code", "")
+        if not isinstance(code_str, str): return ""
+        match = re.search(r"\b([A-Z]{3,4})\b", code_str.strip())
+        return match.group(1) if match else ""
+
+    def _extract_course_number_and_level(self) -> Tuple[str, int]:
+        code_str = self.data.get("Course Code", "")
+        if not isinstance(code_str, str): return "", -1
+        match = re.search(r'\b(\d{3,4})\b', code_str)
+        if not match:
+            return "", -1
+        course_num = match.group(1)
+        try:
+            return course_num, int(course_num[0])
+        except (ValueError, IndexError):
+            return course_num, -1
+
+    def _parse_semantic_name(self) -> Tuple[str, str, str]:
+        name = self.name
+        subtitle = ""
+        if ':' in name:
+            parts = name.split(':', 1)
+            name, subtitle = parts[0].strip(), parts[1].strip()
+        roman_match = re.search(r'\s+(X|IX|VIII|VII|VI|V|IV|III|II|I)$', name)
+        if roman_match:
+            return name[:roman_match.start()].strip(), roman_match.group(1), subtitle
+        return name, "", subtitle
+
+    @property
+    def code(self) -> str:
+        return self.data.get("Course Code", "").strip()
+
+    @property
+    def name(self) -> str:
+        return self.data.get("Course Name", "").strip()
+
+    @property
+    def normalized_name(self) -> str:
+        return "".join(char for char in self.name.lower() if char.isalnum())
+
+    @property
+    def normalized_base_name(self) -> str:
+        return "".join(char for char in self.base_name.lower() if char.isalnum())
+
+
+def reference_load_courses(input_file):
+    with open(input_file, mode='r', encoding='utf-8') as f:
+        total_lines = sum(1 for line in f) - 1
+    courses = []
+    with open(input_file, mode='r', encoding='utf-8', newline='') as infile:
+        reader = csv.DictReader(infile)
+        for i, row in enumerate(tqdm(reader, total=total_lines, desc="Loading courses")):
+            courses.append(ReferenceCourse(data=row, original_index=i))
+    return courses
+
+
+def fingerprint(course):
+    """Hash of a course's row and parsed fields."""
+    return hash((tuple(course.data.items()), tuple(getattr(course, field) for field in FIELDS)))
+
+
+def add_edge_rows(filename):
+    """Appends one row per EDGE_NAMES entry to a generated catalog."""
+    with open(filename, newline="", encoding="utf-8") as f:
+        next_id = sum(1 for _ in f) - 1
+    with open(filename, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for i, name in enumerate(EDGE_NAMES):
+            writer.writerow([next_id + i, f"EDGE {1000 + i}", name, "50", "2030-2031", "Undergraduate", f"https://example.invalid/{i}"])
+
+
+def timed_load(load):
+    """Runs load() quietly. Returns (seconds, fingerprint of each course)."""
+    gc.collect()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        started = time.perf_counter()
+        courses = load()
+        seconds = time.perf_counter() - started
+    return seconds, [fingerprint(course) for course in courses]
+
+
+def load_with_grouper(input_file):
+    grouper = catalog_groups.Grouper(catalog_groups.Config(input_file=input_file))
+    grouper.load_courses()
+    return grouper.all_courses
+
+
+def first_mismatch(expected, actual):
+    if len(expected) != len(actual):
+        return f"{len(actual)} courses instead of {len(expected)}"
+    for i, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            return f"course {i} differs"
+    return None
+
+
+def main(args):
+    with tempfile.TemporaryDirectory(prefix="catalog_loading_bench_") as workdir:
+        input_file = os.path.join(workdir, "0_all_catalog1.csv")
+        if args.input:
+            with open(args.input, newline="", encoding="utf-8") as src, open(input_file, "w", newline="", encoding="utf-8") as dst:
+                dst.write(src.read())
+            print(f"Input: {args.input}")
+        else:
+            departments = max(4, args.histories // 100)
+            rows = generate_catalog(input_file, args.histories, departments, args.seed)
+            add_edge_rows(input_file)
+            print(f"Input: generated catalog with {rows + len(EDGE_NAMES)} rows ({args.histories} course histories, seed {args.seed}, {len(EDGE_NAMES)} edge-case names)")
+
+        reference_time, expected = timed_load(lambda: reference_load_courses(input_file))
+        print(f"Reference (per-row regexes):  {reference_time:6.2f} s  {len(expected) / reference_time:>10,.0f} rows/s")
+
+        failed = False
+        loads = [("load_courses from the CSV", None)]
+        if intermediates.PYARROW_AVAILABLE:
+            loads.append(("load_courses from Parquet", lambda: intermediates.write_typed_copy(input_file)))
+        else:
+            print("⚠️ pyarrow is not installed, skipping the Parquet load.")
+        intermediates.USE_PARQUET = True
+        for label, prepare in loads:
+            if prepare:
+                started = time.perf_counter()
+                prepare()
+                print(f"  (typed copy written in {time.perf_counter() - started:.2f} s, once per catalog by script 3)")
+            seconds, actual = timed_load(lambda: load_with_grouper(input_file))
+            mismatch = first_mismatch(expected, actual)
+            status = "identical" if not mismatch else f"❌ {mismatch}"
+            print(f"{label + ':':<29} {seconds:6.2f} s  {len(actual) / seconds:>10,.0f} rows/s  {reference_time / seconds:5.2f}x  {status}")
+            failed = failed or bool(mismatch)
+
+    if failed:
+        print("❌ The loaders parsed some courses differently.")
+        sys.exit(1)
+    print("Every loader gave the same rows and parsed fields.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and time Grouper.load_courses against the original per-row loader.")
+    parser.add_argument("--input", default=None, help="0_all_catalog1.csv to load (default: a generated catalog).")
+    parser.add_argument("--histories", type=int, default=240000, help="Course histories in the generated catalog, about 4 rows each (default: 240000, about 1M rows).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated catalog (default: 0).")
+    main(parser.parse_args())
@@ -0,0 +1,169 @@
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+
+# --- Script Overview ---
+# Checks course_preview_parser.parse_course_html against the original implementation
+# (reference_parse_course_html below) and measures both in pages per second.
+# 1. Every saved preview page in benchmarks/fixtures/course_preview_*.html must parse identically.
+# 2. So must a set of generated pages that combine hours blocks, descriptions, prerequisites,
+#    fee notes and repeat/term notes in random order and letter case.
+# Run from the "creating_data" folder:
+#   python benchmarks/bench_course_preview_parser.py [--iterations N] [--generated N]
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+sys.path.insert(0, os.path.dirname(HERE))
+
+import pandas as pd # noqa: E402
+from course_preview_parser import parse_course_html, extract_preview_text, parse_preview_text, clean_text, SCRAPED_DATA_COLUMNS # noqa: E402
+from html_parsing import make_soup, COURSE_PREVIEW_STRAINER # noqa: E402
+
+PAGE_TEMPLATE = '<html><body><table><tr><td><p><h1 id="course_preview_title">{title}</h1><hr>{body}</p></td></tr></table></body></html>'
+GENERATED_SEGMENTS = [
+    ["3 hours", "1–6 hours (0;0;6)", "4 hours (3;3)", "1 hour", "0-3 hours"],
+    ["Introduction to the field, with labs.", "Survey of topics , including ethics.", "Hands-on studio work."],
+    ["Prerequisite(s): CSCE 1030.", "prerequisite(s): None.", "Prerequisite(s): None", "PREREQUISITE(S): MATH 1710. Prerequisite(s): PHYS 1710."],
+    ["Course specific fees apply: $25.", "course specific fees: Lab fee $30.", "Course specific fees apply", "Course Specific Fees (per semester): $10"],
+    ["May be repeated for credit.", "May only be taken once.", "Not offered every term.", "may be repeated up to 3 times."],
+]
+
+
+# The original parser from 6_scrape_course_info.py, kept as the reference output. It is split at the
+# point where the page text has been extracted, so the text stage can be timed on its own; the
+# code itself is unchanged.
+def reference_parse_course_html(html_content: str) -> dict:
+    # html.parser keeps the page's <h1> nested inside its <p>, which the extraction below relies on
+    soup = make_soup(html_content, parse_only=COURSE_PREVIEW_STRAINER, backend='html.parser')
+
+    h1 = soup.find('h1', id='course_preview_title')
+    if not h1 or not h1.parent or h1.parent.name != 'p': return {key: '' for key in SCRAPED_DATA_COLUMNS}
+
+    h1_text = h1.get_text(strip=True)
+    data_text = ' '.join(h1.parent.get_text(separator='---').strip().split('---'))
+    data_text = clean_text(data_text.replace(h1_text, '', 1))
+    return reference_parse_text(data_text)
+
+
+def reference_parse_text(data_text: str) -> dict:
+    details = {key: '' for key in SCRAPED_DATA_COLUMNS}
+    extracted_fragments = []
+    original_data_text = data_text
+
+    hours_match = re.match(r'([\d–-]+\s+hours?(\s*\([^)]+\))?)', data_text)
+    if hours_match:
+        hours_block = hours_match.group(0)
+        extracted_fragments.append(hours_block)
+        details['Hours'] = (re.search(r'[\d–-]+', hours_block) or pd.NA).group(0) or ''
+        specific_match = re.search(r'\([^)]+\)', hours_block)
+        if specific_match: details['Specific Hours'] = specific_match.group(0)
+        data_text = data_text[hours_match.end():].strip()
+
+    other_triggers = ['May be repeated', 'May only be taken', 'Not offered every term']
+    stop_pattern = '|'.join(['Course specific fees'] + other_triggers)
+    prereq_match = re.search(r'Prerequisite\(s\):', data_text, re.I)
+    fees_match = re.search(r'Course specific fees', data_text, re.I)
+    
+    first_marker_pos = len(data_text)
+    if prereq_match: first_marker_pos = min(first_marker_pos, prereq_match.start())
+    if fees_match: first_marker_pos = min(first_marker_pos, fees_match.start())
+    
+    description_text = data_text[:first_marker_pos].strip()
+    if description_text:
+        details['Description'] = description_text
+        extracted_fragments.append(description_text)
+
+    if prereq_match:
+        prereq_search_text = data_text[prereq_match.start():]
+        prereq_block_match = re.search(f'Prerequisite\\(s\\):.*?(?=({stop_pattern}|$))', prereq_search_text, re.I | re.S)
+        if prereq_block_match:
+            prereq_full_block = prereq_block_match.group(0).strip()
+            extracted_fragments.append(prereq_full_block)
+            prereq_content = re.sub(r'Prerequisite\(s\):', '', prereq_full_block, flags=re.I).strip()
+            if prereq_content.lower() not in ('none', 'none.'): details['Prerequisite(s)'] = prereq_content
+
+    if fees_match:
+        fees_search_text = data_text[fees_match.start():]
+        fees_block_match = re.search(r'Course specific fees.*', fees_search_text, re.I | re.S)
+        if fees_block_match:
+            fees_full_block = fees_block_match.group(0).strip()
+            extracted_fragments.append(fees_full_block)
+            fees_content = re.sub(r'Course specific fees(?:.|\n)*?:\s*', '', fees_full_block, flags=re.I).strip()
+            details['Course Fees'] = fees_content
+    
+    other_text = original_data_text
+    for fragment in extracted_fragments:
+        other_text = other_text.replace(fragment, '', 1).strip()
+    details['Other'] = other_text
+    
+    for key, value in details.items():
+        if isinstance(value, str): details[key] = clean_text(value)
+    return details
+
+
+def generated_pages(count, seed=0):
+    """Random combinations of the segments above, in random order and separated by <br>/<strong> tags."""
+    rng = random.Random(seed)
+    pages = []
+    for i in range(count):
+        parts = [rng.choice(options) for options in GENERATED_SEGMENTS if rng.random() < 0.7]
+        head, rest = parts[:1], parts[1:]
+        rng.shuffle(rest)
+        body = "<br><br>".join(f"<strong>{p}</strong>" if rng.random() < 0.3 else p for p in head + rest)
+        pages.append((f"generated #{i}", PAGE_TEMPLATE.format(title=f"TEST&nbsp;{1000 + i}&nbsp;-&nbsp;Generated", body=body)))
+    return pages
+
+
+def load_fixtures():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "course_preview_*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def pages_per_second(parser, inputs, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for page_input in inputs:
+            parser(page_input)
+    return iterations * len(inputs) / (time.perf_counter() - started)
+
+
+def main(iterations, generated):
+    fixtures = load_fixtures()
+    mismatches = 0
+    for name, html in fixtures + generated_pages(generated):
+        expected, actual = reference_parse_course_html(html), parse_course_html(html)
+        if expected != actual:
+            mismatches += 1
+            print(f"❌ {name}:")
+            for key in SCRAPED_DATA_COLUMNS:
+                if expected[key] != actual[key]:
+                    print(f"   {key}: expected {expected[key]!r}, got {actual[key]!r}")
+    print(f"Compared {len(fixtures)} fixture pages and {generated} generated pages: {mismatches} mismatches.")
+
+    # Whole pages (dominated by building the BeautifulSoup tree, which both parsers share)
+    # and the text stage alone, on the text extracted from every fixture and generated page.
+    pages = [html for _, html in fixtures]
+    texts = [text for text in (extract_preview_text(html) for _, html in fixtures + generated_pages(generated)) if text is not None]
+    for label, reference, new, inputs in [("whole page", reference_parse_course_html, parse_course_html, pages),
+                                          ("text stage", reference_parse_text, parse_preview_text, texts)]:
+        reference_rate = pages_per_second(reference, inputs, iterations)
+        new_rate = pages_per_second(new, inputs, iterations)
+        print(f"{label}: reference {reference_rate:10.1f} pages/s, course_preview_parser {new_rate:10.1f} pages/s ({new_rate / reference_rate:.2f}x)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark the course preview parser.")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed passes over the pages (default: 50).")
+    parser.add_argument("--generated", type=int, default=2000, help="Generated pages to compare (default: 2000).")
+    args = parser.parse_args()
+    main(args.iterations, args.generated)
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+import time
+
+# --- Script Overview ---
+# Compares the original parsing setup (a full html.parser tree of every page) with the
+# html_parsing.py setup (fastest available backend + SoupStrainer) on the sample pages in
+# benchmarks/fixtures/.
+# For every extractor it checks that both setups return identical records, then reports
+# pages per second for each. Run from the "creating_data" folder:
+#   python benchmarks/bench_html_parsing.py [--iterations N]
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+sys.path.insert(0, os.path.dirname(HERE))
+
+import html_parsing # noqa: E402
+faculty_script = importlib.import_module("1_generate_faculty")
+offerings_script = importlib.import_module("2_generate_all_offerings")
+catalog_script = importlib.import_module("3_generate_all_catalog")
+details_script = importlib.import_module("6_scrape_course_info")
+
+# (label, backend, use strainers)
+SETUPS = [
+    ("original (html.parser, full tree)", "html.parser", False),
+    ("configured (auto backend + strainer)", "auto", True),
+]
+CATALOG_INFO = {"year": "2025-2026", "type": "Undergraduate"}
+
+
+class FixtureFetcher:
+    """Stands in for fetcher.Fetcher and always returns the same page."""
+    def __init__(self, html):
+        self.html = html
+
+    async def get_text(self, url, timeout=30):
+        return self.html
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def extract_faculty(html, loop):
+    return faculty_script.parse_faculty_data(html, faculty_script.BASE_URL)
+
+
+def extract_profile(html, loop):
+    offerings, errors = [], []
+    offerings_script.parse_profile_offerings(html, "https://facultyinfo.unt.edu/faculty-profile?profile=ab0012", "0", "Abigail R. Abbott", {}, offerings, errors)
+    return offerings, [(e["Error Type"], e["Message"]) for e in errors]
+
+
+def extract_pagemax(html, loop):
+    return loop.run_until_complete(catalog_script.get_pagemax_and_descriptive_title(FixtureFetcher(html), 37))
+
+
+def extract_catalog_page(html, loop):
+    return loop.run_until_complete(catalog_script.process_course_page(FixtureFetcher(html), 37, 1, CATALOG_INFO))
+
+
+def extract_preview(html, loop):
+    return details_script.parse_course_html(html)
+
+
+EXTRACTORS = [
+    ("parse_faculty_data", "faculty_search.html", extract_faculty),
+    ("parse_profile_offerings", "faculty_profile.html", extract_profile),
+    ("get_pagemax_and_descriptive_title", "catalog_search.html", extract_pagemax),
+    ("process_course_page", "catalog_search.html", extract_catalog_page),
+    ("parse_course_html", "course_preview_basic.html", extract_preview),
+    ("parse_course_html", "course_preview_repeatable.html", extract_preview),
+    ("parse_course_html", "course_preview_no_prereq.html", extract_preview),
+]
+
+
+def run_setup(backend, use_strainers, extractor, html, loop, iterations):
+    html_parsing.PARSER_BACKEND = backend
+    html_parsing.USE_STRAINERS = use_strainers
+    result = extractor(html, loop)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        extractor(html, loop)
+    elapsed = time.perf_counter() - started
+    return result, iterations / elapsed
+
+
+def main(iterations):
+    loop = asyncio.new_event_loop()
+    print(f"lxml available: {html_parsing.LXML_AVAILABLE} ({iterations} iterations per measurement)\n")
+    all_identical = True
+
+    for name, fixture, extractor in EXTRACTORS:
+        html = load_fixture(fixture)
+        results = []
+        print(f"{name} on {fixture}:")
+        for label, backend, use_strainers in SETUPS:
+            result, pages_per_second = run_setup(backend, use_strainers, extractor, html, loop, iterations)
+            results.append(result)
+            print(f"  {label:<40} {pages_per_second:10.1f} pages/s")
+        identical = all(r == results[0] for r in results[1:])
+        all_identical &= identical
+        print(f"  extracted records identical: {identical}\n")
+
+    loop.close()
+    if not all_identical:
+        print("❌ At least one extractor returned different records.")
+        sys.exit(1)
+    print("✅ All extractors returned identical records.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark and cross-check the HTML parsing backends.")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed parses per extractor and setup (default: 50).")
+    main(parser.parse_args().iterations)
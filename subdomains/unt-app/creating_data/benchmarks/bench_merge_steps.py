@@ -0,0 +1,126 @@
+import argparse
+import contextlib
+import gc
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# --- Script Overview ---
+# Microbenchmark of merge steps 4-7 of 4_catalog_groups.py (4, 5a-5e, 6 and 7), with the years of
+# each group held as a bit mask (CourseGroup.year_mask, what the script uses) and as a set of years
+# (SetYearsGroup below, what groups used before). Both run the same merge code: the overlap test is
+# `a & b` and a merge does `a |= b` either way.
+# 1. Loads the catalog and runs the initial grouping (methods 1 and 2) once.
+# 2. For each representation and repetition, rebuilds the groups from that result (not timed) and
+#    runs methods 3-7, timing each merge step on its own.
+# 3. Prints the median time of each step for both, and checks both gave the same groups.
+# 4. Times the two operations on their own, on the years of the groups going into method 3: the
+#    overlap test between two groups and the merge of one group's years into another's.
+# Run from the "creating_data" folder:
+#   python benchmarks/bench_merge_steps.py [--histories N] [--departments N] [--repeat N]
+#   python benchmarks/bench_merge_steps.py --input 0_all_catalog1.csv
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from bench_catalog_groups import catalog_groups, generate_catalog, timed # noqa: E402
+
+STEPS = ["4", "5a", "5b", "5c", "5d", "5e", "6", "7"]
+
+
+class SetYearsGroup(catalog_groups.CourseGroup):
+    """CourseGroup with its years in a set instead of a bit mask."""
+    def __init__(self, courses):
+        super().__init__(courses)
+        self.year_mask = {c.parsed_year for c in self.courses if c.parsed_year != -1}
+
+
+def initial_groups(input_file):
+    """The loaded Grouper and the courses of each group after methods 1 and 2."""
+    grouper = catalog_groups.Grouper(catalog_groups.Config(input_file=input_file))
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        grouper.load_courses()
+        groups, _ = grouper._perform_initial_grouping()
+    return grouper, [list(group.courses) for group in groups]
+
+
+def run_steps(grouper, group_courses, group_class):
+    """Runs methods 3-7 on fresh groups of group_class. Returns the time of each step and the resulting groups."""
+    groups = [group_class(courses) for courses in group_courses]
+    gc.collect()
+    step_times = {}
+    grouper._merge_within_buckets = timed(step_times, "buckets", catalog_groups.Grouper._merge_within_buckets.__get__(grouper))
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        groups = grouper._perform_merging(groups, {})
+    return step_times, [[course.original_index for course in group] for group in groups]
+
+
+def operation_times(group_courses, rounds=20):
+    """Seconds per overlap test and per merge of years, for sets (as before) and bit masks."""
+    sets = [SetYearsGroup(courses).year_mask for courses in group_courses]
+    masks = [catalog_groups.CourseGroup(courses).year_mask for courses in group_courses]
+    pairs = len(sets) - 1
+    results = {}
+    for label, years, overlap, merge in [
+        ("set", sets, lambda a, b: a.isdisjoint(b), lambda a, b: a | b),
+        ("mask", masks, lambda a, b: not a & b, lambda a, b: a | b),
+    ]:
+        for operation, function in [("overlap test", overlap), ("merge", merge)]:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for a, b in zip(years, years[1:]):
+                    function(a, b)
+            results[(label, operation)] = (time.perf_counter() - started) / (rounds * pairs)
+    return results
+
+
+def main(args):
+    with tempfile.TemporaryDirectory(prefix="merge_steps_bench_") as workdir:
+        if args.input:
+            input_file = args.input
+            print(f"Input: {args.input}")
+        else:
+            input_file = os.path.join(workdir, "0_all_catalog1.csv")
+            departments = args.departments or max(4, args.histories // 100)
+            rows = generate_catalog(input_file, args.histories, departments, args.seed)
+            print(f"Input: generated catalog with {rows} rows ({args.histories} course histories in {departments} departments, seed {args.seed})")
+        grouper, group_courses = initial_groups(input_file)
+
+    times = {"set": {step: [] for step in STEPS}, "mask": {step: [] for step in STEPS}}
+    results = {}
+    for _ in range(args.repeat):
+        for label, group_class in [("set", SetYearsGroup), ("mask", catalog_groups.CourseGroup)]:
+            step_times, results[label] = run_steps(grouper, group_courses, group_class)
+            for step in STEPS:
+                times[label][step].append(step_times.get(step, 0.0))
+
+    print(f"Median of {args.repeat} runs, {len(group_courses)} groups going into method 3:")
+    print(f"{'Step':<6}{'set ms':>10}{'mask ms':>10}{'speedup':>10}")
+    for step in STEPS + ["total"]:
+        set_time, mask_time = [statistics.median(times[label][step]) if step != "total" else
+                               statistics.median(map(sum, zip(*times[label].values()))) for label in ("set", "mask")]
+        print(f"{step:<6}{set_time * 1000:>10.1f}{mask_time * 1000:>10.1f}{set_time / mask_time if mask_time else float('nan'):>9.2f}x")
+
+    operations = operation_times(group_courses)
+    for operation in ("overlap test", "merge"):
+        set_time, mask_time = operations[("set", operation)], operations[("mask", operation)]
+        print(f"{operation}: set {set_time * 1e9:.0f} ns, mask {mask_time * 1e9:.0f} ns ({set_time / mask_time:.2f}x)")
+
+    if results["set"] != results["mask"]:
+        print("❌ The two representations gave different groups.")
+        sys.exit(1)
+    print(f"Both representations gave the same {len(results['mask'])} groups.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time merge steps 4-7 with bit mask and set year representations.")
+    parser.add_argument("--input", default=None, help="0_all_catalog1.csv to group (default: a generated catalog).")
+    parser.add_argument("--histories", type=int, default=6000, help="Course histories in the generated catalog (default: 6000).")
+    parser.add_argument("--departments", type=int, default=None, help="Departments in the generated catalog; fewer makes bigger buckets (default: histories / 100).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated catalog (default: 0).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per representation (default: 5).")
+    main(parser.parse_args())
@@ -0,0 +1,114 @@
+import argparse
+import contextlib
+import csv
+import datetime
+import io
+import os
+import sys
+import tempfile
+import time
+
+# --- Script Overview ---
+# Times merge methods 3-7 of 4_catalog_groups.py with the bucket merging of steps 4-7 spread over
+# 1, 2, 4, 8 and 16 worker processes (Config.merge_workers), and checks every run against the serial one.
+# 1. Generates a catalog with few departments, so the buckets are large (or use --input).
+# 2. For each number of workers, loads the catalog, runs methods 1 and 2 (not timed), then runs
+#    methods 3-7 with the merge pool started, timing each step. Starting the pool is included.
+# 3. The resulting groups (the original_index of each course, in order) and every course's Match
+#    Number must be identical to the serial run's, so the Group IDs are too.
+# 4. Prints the time of each step and the speedup for each number of workers. The pool never has
+#    more processes than CPU cores (one core means no pool at all), so the workers actually used are
+#    printed too. With --results-file FILE, one row per run is appended to FILE, so the scaling
+#    measured on different machines can be collected and compared.
+# Run from the "creating_data" folder:
+#   python benchmarks/bench_parallel_merge.py [--workers 1,2,4,8,16] [--histories N] [--departments N] [--results-file FILE]
+#   python benchmarks/bench_parallel_merge.py --input 0_all_catalog1.csv
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from bench_catalog_groups import catalog_groups, generate_catalog, timed # noqa: E402
+
+STEPS = ["3", "4", "5a", "5b", "5c", "5d", "5e", "6", "7"]
+RESULT_HEADERS = ["Timestamp", "Input", "CPU Cores", "Min Bucket", "Workers", "Workers Used"] + [f"Step {step} (s)" for step in STEPS] + ["Total (s)", "Speedup", "Identical"]
+
+
+def run_merging(input_file, workers, min_bucket):
+    """Runs methods 3-7 with `workers` processes. Returns the time of each step, the processes actually used and the resulting groups and match numbers."""
+    config = catalog_groups.Config(input_file=input_file, merge_workers=workers, parallel_min_bucket=min_bucket)
+    grouper = catalog_groups.Grouper(config)
+    step_times = {}
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        grouper.load_courses()
+        groups, matched = grouper._perform_initial_grouping()
+        grouper._merge_sequential_courses = timed(step_times, "3", grouper._merge_sequential_courses)
+        grouper._merge_within_buckets = timed(step_times, "buckets", grouper._merge_within_buckets)
+        with grouper.merge_workers():
+            workers_used = grouper.merge_pool_size
+            groups = grouper._perform_merging(groups, matched)
+    result = ([[course.original_index for course in group] for group in groups], [course.match_method for course in grouper.all_courses])
+    return step_times, workers_used, result
+
+
+def main(args):
+    workers_list = [int(n) for n in args.workers.split(",")]
+    with tempfile.TemporaryDirectory(prefix="parallel_merge_bench_") as workdir:
+        if args.input:
+            input_file = args.input
+            input_label = args.input
+        else:
+            input_file = os.path.join(workdir, "0_all_catalog1.csv")
+            rows = generate_catalog(input_file, args.histories, args.departments, args.seed)
+            input_label = f"generated catalog with {rows} rows ({args.histories} course histories in {args.departments} departments, seed {args.seed})"
+        print(f"Input: {input_label}")
+        print(f"CPU cores: {os.cpu_count()}, buckets merged in the pool from {args.min_bucket} groups")
+
+        runs = {}
+        for workers in workers_list:
+            started = time.perf_counter()
+            runs[workers] = run_merging(input_file, workers, args.min_bucket)
+            print(f"  {workers} worker(s) done in {time.perf_counter() - started:.1f} s")
+
+    serial_times, _, serial_result = runs[workers_list[0]]
+    print(f"\nSeconds per step (speedup of the total over {workers_list[0]} worker(s)):")
+    print(f"{'Workers':<9}{'used':>5}" + "".join(f"{step:>7}" for step in STEPS) + f"{'total':>9}{'speedup':>9}  result")
+    failed = False
+    result_rows = []
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for workers, (step_times, workers_used, result) in runs.items():
+        total = sum(step_times.get(step, 0.0) for step in STEPS)
+        speedup = sum(serial_times.values()) / total
+        identical = result == serial_result
+        failed = failed or not identical
+        print(f"{workers:<9}{workers_used:>5}" + "".join(f"{step_times.get(step, 0.0):>7.2f}" for step in STEPS)
+              + f"{total:>9.2f}{speedup:>8.2f}x  {'identical' if identical else '❌ different'}")
+        result_rows.append([timestamp, input_label, os.cpu_count() or 1, args.min_bucket, workers, workers_used]
+                           + [round(step_times.get(step, 0.0), 3) for step in STEPS] + [round(total, 3), round(speedup, 2), identical])
+
+    if args.results_file:
+        new_file = not os.path.exists(args.results_file)
+        with open(args.results_file, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(RESULT_HEADERS)
+            writer.writerows(result_rows)
+        print(f"Results appended to '{args.results_file}'.")
+
+    if failed:
+        print("❌ Some runs gave different groups than the first.")
+        sys.exit(1)
+    print("Every run gave the same groups and match numbers.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time merge steps 3-7 with the bucket merging spread over worker processes.")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="Comma-separated numbers of workers; the first is the baseline (default: 1,2,4,8,16).")
+    parser.add_argument("--input", default=None, help="0_all_catalog1.csv to group (default: a generated catalog).")
+    parser.add_argument("--histories", type=int, default=60000, help="Course histories in the generated catalog (default: 60000).")
+    parser.add_argument("--departments", type=int, default=20, help="Departments in the generated catalog; fewer makes bigger buckets (default: 20).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated catalog (default: 0).")
+    parser.add_argument("--min-bucket", type=int, default=catalog_groups.Config.parallel_min_bucket,
+                        help=f"Config.parallel_min_bucket for the runs (default: {catalog_groups.Config.parallel_min_bucket}).")
+    parser.add_argument("--results-file", default=None, help="CSV file to append one row per run to.")
+    main(parser.parse_args())
@@ -0,0 +1,173 @@
+import argparse
+import os
+import sys
+import time
+
+# --- Script Overview ---
+# Checks 2_generate_all_offerings.parse_profile_offerings (the linear walk_course_table) against the
+# original quadratic table code (reference_parse_profile_offerings below) and times both.
+#
+# The original found the suffix cell with `all_table_cells.index(cells[2])`. BeautifulSoup compares
+# tags by value, so when a semester cell repeats an earlier identical one (e.g. two "Fall 2023" rows)
+# that lookup returned the earlier cell and the link got the wrong row's suffix. The walker locates
+# cells by position instead. So the check is:
+# 1. Every row must be identical to the original with the lookup done by identity.
+# 2. Rows that differ from the unmodified original are counted; they may only differ in "Link To Highlight".
+# Run from the "creating_data" folder:
+#   python benchmarks/bench_profile_table_walker.py [--iterations N] [--rows N]
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+sys.path.insert(0, os.path.dirname(HERE))
+
+import importlib # noqa: E402
+from html_parsing import make_soup, PROFILE_COURSE_TABLES_STRAINER # noqa: E402
+offerings_script = importlib.import_module("2_generate_all_offerings")
+
+WEBSITE_LINK = "https://facultyinfo.unt.edu/faculty-profile?profile=ab0012"
+SEMESTERS = ["Spring", "Summer 5W1", "Summer 10W", "Fall"]
+
+
+def index_by_identity(cells, cell):
+    return next(position for position, candidate in enumerate(cells) if candidate is cell)
+
+
+def reference_parse_profile_offerings(html, website_link, faculty_id, faculty_name, semester_map, offerings, errors, cell_index=list.index):
+    """
+    The original parse_profile_offerings from 2_generate_all_offerings.py. The only edit is that
+    the suffix-cell lookup (`all_table_cells.index(cells[2])`) can be swapped via `cell_index`.
+    """
+    soup = make_soup(html, parse_only=PROFILE_COURSE_TABLES_STRAINER) # Only build the course tables
+
+    course_tables = soup.find_all('table', class_='profile-courses-table')
+    if not course_tables:
+        return
+
+    for table in course_tables:
+        all_table_cells = table.find_all('td')
+        # Get all rows to easily find previous/next siblings
+        all_rows = table.find_all('tr')
+        for i, table_row in enumerate(all_rows):
+            cells = table_row.find_all('td')
+            
+            if not cells or len(cells) < 3:
+                continue
+            
+            full_course_name_raw = cells[0].get_text(strip=True)
+            course_name_scraped = cells[1].get_text(strip=True)
+            semester_string_raw = cells[2].get_text(strip=True)
+
+            if not full_course_name_raw and not course_name_scraped and not semester_string_raw:
+                continue
+            if full_course_name_raw.lower() == "course code" or course_name_scraped.lower() == "course title":
+                continue
+
+            # --- New Prefix/Suffix Logic ---
+            prefix_text = None
+            suffix_text = None
+
+            # Get Prefix: text from the last cell of the previous row
+            if i > 0:
+                prev_row_cells = all_rows[i-1].find_all('td')
+                if prev_row_cells:
+                    # Use text from the last cell of the previous row
+                    prefix_text = prev_row_cells[-1].get_text(strip=True)
+
+            # Get Suffix: text from the very next cell in the table
+            try:
+                current_cell_index = cell_index(all_table_cells, cells[2])
+                if current_cell_index + 1 < len(all_table_cells):
+                    next_cell = all_table_cells[current_cell_index + 1]
+                    suffix_text = next_cell.get_text(strip=True)
+            except ValueError:
+                # This can happen if a row has less than 3 cells but wasn't skipped.
+                # As a safeguard, we can log this or just pass.
+                errors.append(offerings_script.make_error("Processing Warning", f"Faculty: {faculty_name} (ID: {faculty_id})", f"Could not find cell in all_table_cells for row '{full_course_name_raw}'."))
+            # --- End New Logic ---
+
+            course_code = offerings_script.extract_course_code(full_course_name_raw)
+            year, specific_semester = offerings_script.extract_year_specific_semester(semester_string_raw)
+            broad_semester = offerings_script.get_broad_semester(specific_semester, semester_string_raw, semester_map)
+            
+            # Call the updated function with prefix and suffix
+            link_highlight = offerings_script.generate_highlight_link(
+                website_link,
+                text_start=full_course_name_raw,
+                text_end=semester_string_raw,
+                prefix_text=prefix_text,
+                suffix_text=suffix_text
+            )
+
+            offerings.append({
+                "Full Course Name": full_course_name_raw,
+                "Course Code": course_code,
+                "Course Name": course_name_scraped,
+                "Year": year,
+                "Specific Semester": specific_semester,
+                "Broad Semester": broad_semester,
+                "Faculty ID": faculty_id,
+                "Link To Highlight": link_highlight
+            })
+
+
+def generated_profile(rows):
+    """A profile page with one course table of `rows` offerings (many repeated semester cells)."""
+    body = "".join(
+        f"<tr><td>CSCE {1000 + (i * 37) % 4000}.{i % 20:03d}</td><td>Course {i % 50}</td><td>{SEMESTERS[i % 4]} {2010 + i % 15}</td></tr>"
+        for i in range(rows)
+    )
+    return (f'<html><body><table class="profile-courses-table"><tr><td>Course Code</td><td>Course Title</td><td>Semester</td></tr>'
+            f'{body}</table></body></html>')
+
+
+def parse(parser, html, **kwargs):
+    offerings, errors = [], []
+    parser(html, WEBSITE_LINK, "0", "Abigail R. Abbott", {}, offerings, errors, **kwargs)
+    return offerings
+
+
+def pages_per_second(parser, html, iterations, **kwargs):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse(parser, html, **kwargs)
+    return iterations / (time.perf_counter() - started)
+
+
+def main(iterations, rows):
+    with open(os.path.join(FIXTURES_DIR, "faculty_profile.html"), encoding="utf-8") as f:
+        pages = [("faculty_profile.html", f.read()), (f"generated profile ({rows} rows)", generated_profile(rows))]
+
+    ok = True
+    for name, html in pages:
+        walker_rows = parse(offerings_script.parse_profile_offerings, html)
+        identity_rows = parse(reference_parse_profile_offerings, html, cell_index=index_by_identity)
+        original_rows = parse(reference_parse_profile_offerings, html)
+
+        matches_identity = walker_rows == identity_rows
+        changed = [(new, old) for new, old in zip(walker_rows, original_rows) if new != old]
+        only_links_changed = len(walker_rows) == len(original_rows) and all(
+            {k: v for k, v in new.items() if k != "Link To Highlight"} == {k: v for k, v in old.items() if k != "Link To Highlight"}
+            for new, old in changed
+        )
+        ok &= matches_identity and only_links_changed
+
+        print(f"{name}: {len(walker_rows)} offerings")
+        print(f"  identical to the original with lookup by identity: {matches_identity}")
+        print(f"  highlight links corrected vs. the unmodified original: {len(changed)} (other fields unchanged: {only_links_changed})")
+        original_rate = pages_per_second(reference_parse_profile_offerings, html, iterations)
+        walker_rate = pages_per_second(offerings_script.parse_profile_offerings, html, iterations)
+        print(f"  original {original_rate:8.1f} pages/s, walk_course_table {walker_rate:8.1f} pages/s ({walker_rate / original_rate:.1f}x)\n")
+
+    if not ok:
+        print("❌ The walker's output does not match the original.")
+        sys.exit(1)
+    print("✅ Walker output matches.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check and benchmark the profile course table walker.")
+    parser.add_argument("--iterations", type=int, default=10, help="Timed parses per page and parser (default: 10).")
+    parser.add_argument("--rows", type=int, default=600, help="Rows in the generated profile page (default: 600).")
+    args = parser.parse_args()
+    main(args.iterations, args.rows)
@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import contextlib
+import csv
+import datetime
+import importlib
+import itertools
+import os
+import shutil
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+# --- Script Overview ---
+# End-to-end scrape benchmark against the local mock server (mock_server.py).
+#
+# 1. Starts mock_server.py with the given latency, jitter, error rate and stall rate.
+# 2. In a fresh temporary folder, writes input files for each stage that point at the mock server
+#    (search links for script 1, faculty.csv for script 2, a catalog mapping for script 3 and
+#    0_all_catalog2.csv for script 6), then runs each script's main function in-process.
+#    While a stage runs, the mock host gets the fetcher.py limits of the real host it stands in for.
+# 3. Reports, per stage: requests, errors, requests/sec, p50/p99 request latency (time from
+#    sending a request to its response, as seen by the fetcher) and total wall time.
+#    With --results-file, one row per stage is appended to a CSV so runs can be compared.
+#
+# Run from the "creating_data" folder, e.g. to compare two concurrency settings:
+#   python benchmarks/bench_scrape.py --concurrency 8 --results-file bench_results.csv
+#   python benchmarks/bench_scrape.py --concurrency 32 --results-file bench_results.csv
+# --- End Script Overview ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CREATING_DATA_DIR = os.path.dirname(HERE)
+sys.path.insert(0, CREATING_DATA_DIR)
+
+import fetcher # noqa: E402
+
+MOCK_HOST = "127.0.0.1"
+STAGES = {
+    "1": ("1_generate_faculty", "facultyinfo.unt.edu"),
+    "2": ("2_generate_all_offerings", "facultyinfo.unt.edu"),
+    "3": ("3_generate_all_catalog", "catalog.unt.edu"),
+    "6": ("6_scrape_course_info", "catalog.unt.edu"),
+}
+RESULT_HEADERS = ["Timestamp", "Stage", "Concurrency", "Latency (ms)", "Jitter (ms)", "Error Rate",
+                  "Requests", "Errors", "Requests/sec", "p50 (ms)", "p99 (ms)", "Wall Time (s)"]
+
+# (latency in seconds, status) for every request the fetcher completes; status is None for timeouts/connection errors
+request_log = []
+_original_release = fetcher.HostController.release
+
+async def _recording_release(self, status, started_at, retry_after=None):
+    request_log.append((time.monotonic() - started_at, status))
+    await _original_release(self, status, started_at, retry_after)
+
+fetcher.HostController.release = _recording_release
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind((MOCK_HOST, 0))
+        return s.getsockname()[1]
+
+
+def start_mock_server(port, args):
+    process = subprocess.Popen([
+        sys.executable, os.path.join(HERE, "mock_server.py"), "--host", MOCK_HOST, "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--stall-rate", str(args.stall_rate), "--catalog-pages", str(args.catalog_pages),
+    ])
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection((MOCK_HOST, port), timeout=0.2):
+            return process
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("The mock server did not start.")
+
+
+def write_csv(filename, headers, rows):
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, round(fraction * (len(sorted_values) - 1)))]
+
+
+# --- Stage drivers: write the stage's input files into the current folder, then run it ---
+
+def run_stage_1(module, base, args):
+    prefixes = ("".join(p) for p in itertools.product(string.ascii_lowercase, repeat=2))
+    write_csv(module.INPUT_CSV_FILE, ["Faculty Search Link"],
+              [[f"{base}/faculty-search?name={prefix}"] for prefix in itertools.islice(prefixes, args.searches)])
+    module.main(args.concurrency or module.MAX_CONCURRENT_REQUESTS)
+
+
+def run_stage_2(module, base, args):
+    shutil.copy(os.path.join(CREATING_DATA_DIR, module.SEMESTER_MAPPING_FILE), module.SEMESTER_MAPPING_FILE)
+    write_csv(module.FACULTY_CSV_FILE, ["Faculty Name", "Faculty Title", "Faculty ID", "Department", "College", "Website Link"],
+              [[f"Faculty {i}", "Professor", i, "Computer Science and Engineering", "College of Engineering",
+                f"{base}/faculty-profile?profile=bm{i:04d}"] for i in range(args.profiles)])
+    module.generate_course_offerings_report(args.concurrency or module.MAX_CONCURRENT_REQUESTS)
+
+
+def run_stage_3(module, base, args):
+    write_csv(module.CATALOG_MAPPING_FILE, ["Catalog ID", "Year", "Catalog Type", "Frozen"],
+              [[100 + i, f"{2025 - i}-{2026 - i}", "Undergraduate", "False"] for i in range(args.catalogs)])
+    module.SEARCH_URL_TEMPLATE = base + "/search_advanced.php?cur_cat_oid={catalog_oid}&cpage={page_num}&search_database=Search&filter%5Bkeyword%5D=&filter%5B3%5D=1"
+    if args.concurrency:
+        module.MAX_CONCURRENT_REQUESTS = args.concurrency
+    asyncio.run(module.main_scraper())
+
+
+def run_stage_6(module, base, args):
+    write_csv(module.INPUT_CSV, ["Catalog ID", "Group ID", "Match Number", "Course Code", "Course Name",
+                                 "Catalog Code", "Year", "Catalog Type", "Course Link"],
+              [[i, i, 1, f"CSCE {1000 + i}", f"Course {i}", "37", "2025-2026", "Undergraduate",
+                f"{base}/preview_course_nopop.php?catoid=37&coid={170000 + i}"] for i in range(args.courses)])
+    if args.concurrency:
+        module.MAX_CONCURRENT_REQUESTS = args.concurrency
+        module.NUM_WORKERS = module.MAX_CONCURRENT_REQUESTS + module.PARSE_WORKERS
+        module.QUEUE_SIZE = 2 * module.NUM_WORKERS
+    asyncio.run(module.main())
+
+
+STAGE_DRIVERS = {"1": run_stage_1, "2": run_stage_2, "3": run_stage_3, "6": run_stage_6}
+
+
+def run_stage(stage, base, args):
+    module_name, real_host = STAGES[stage]
+    module = importlib.import_module(module_name)
+    fetcher.HOST_LIMITS[MOCK_HOST] = fetcher.HOST_LIMITS[real_host]
+    request_log.clear()
+
+    started = time.perf_counter()
+    with open(f"stage_{stage}.log", "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        STAGE_DRIVERS[stage](module, base, args)
+    wall_time = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in request_log)
+    errors = sum(1 for _, status in request_log if status is None or status >= 400)
+    return {
+        "Stage": module_name,
+        "Requests": len(request_log),
+        "Errors": errors,
+        "Requests/sec": round(len(request_log) / wall_time, 1),
+        "p50 (ms)": round(percentile(latencies, 0.50) * 1000, 1),
+        "p99 (ms)": round(percentile(latencies, 0.99) * 1000, 1),
+        "Wall Time (s)": round(wall_time, 2),
+    }
+
+
+def main(args):
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        sys.exit(f"Unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    port = free_port()
+    base = f"http://{MOCK_HOST}:{port}"
+    workdir = tempfile.mkdtemp(prefix="scrape_bench_")
+    server = start_mock_server(port, args)
+    previous_cwd = os.getcwd()
+    results = []
+    try:
+        os.chdir(workdir)
+        for stage in stages:
+            print(f"Running stage {stage} ({STAGES[stage][0]})...")
+            results.append(run_stage(stage, base, args))
+    finally:
+        os.chdir(previous_cwd)
+        server.terminate()
+        server.wait()
+
+    print(f"\nMock server: {args.latency_ms} ms +/- {args.jitter_ms} ms latency, {args.error_rate:.1%} errors, {args.stall_rate:.1%} stalled bodies; "
+          f"concurrency: {args.concurrency or 'script defaults'}")
+    print(f"{'Stage':<28}{'Requests':>10}{'Errors':>8}{'Req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'Wall s':>9}")
+    for r in results:
+        print(f"{r['Stage']:<28}{r['Requests']:>10}{r['Errors']:>8}{r['Requests/sec']:>9}{r['p50 (ms)']:>9}{r['p99 (ms)']:>9}{r['Wall Time (s)']:>9}")
+
+    if args.results_file:
+        new_file = not os.path.exists(args.results_file)
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(args.results_file, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_HEADERS)
+            if new_file:
+                writer.writeheader()
+            for r in results:
+                writer.writerow({**r, "Timestamp": timestamp, "Concurrency": args.concurrency or "default",
+                                 "Latency (ms)": args.latency_ms, "Jitter (ms)": args.jitter_ms, "Error Rate": args.error_rate})
+        print(f"Results appended to '{args.results_file}'.")
+
+    if args.keep_workdir:
+        print(f"Stage inputs, outputs and logs kept in '{workdir}'.")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scripts 1, 2, 3 and 6 against the local mock server.")
+    parser.add_argument("--stages", default="1,2,3,6", help="Comma-separated stages to run (default: 1,2,3,6).")
+    parser.add_argument("--concurrency", type=int, default=None, help="Override every script's MAX_CONCURRENT_REQUESTS.")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Mean mock server latency (default: 40).")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Latency jitter (default: 20).")
+    parser.add_argument("--error-rate", type=float, default=0.01, help="Fraction of requests answered with a 503 (default: 0.01).")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of requests whose body stops halfway, so they time out (default: 0).")
+    parser.add_argument("--searches", type=int, default=200, help="Faculty search pages for script 1 (default: 200).")
+    parser.add_argument("--profiles", type=int, default=300, help="Faculty profiles for script 2 (default: 300).")
+    parser.add_argument("--catalogs", type=int, default=4, help="Catalogs for script 3 (default: 4).")
+    parser.add_argument("--catalog-pages", type=int, default=25, help="Pages per catalog for script 3 (default: 25).")
+    parser.add_argument("--courses", type=int, default=500, help="Course previews for script 6 (default: 500).")
+    parser.add_argument("--results-file", default=None, help="CSV file to append one row per stage to.")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the temporary folder with each stage's files and logs.")
+    main(parser.parse_args())
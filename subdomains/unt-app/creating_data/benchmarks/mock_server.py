@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import glob
+import os
+import random
+import zlib
+
+from aiohttp import web
+
+# --- Script Overview ---
+# Local stand-in for facultyinfo.unt.edu and catalog.unt.edu that replays the recorded pages in
+# benchmarks/fixtures/, so scraper throughput can be tuned without touching the real sites.
+#
+# Routes (query strings are accepted but only used to pick a page):
+#   /faculty-search              -> faculty_search.html
+#   /faculty-profile             -> faculty_profile.html
+#   /search_advanced.php         -> catalog_search.html, with its pagination rewritten to --catalog-pages pages
+#   /preview_course_nopop.php    -> one of the course_preview_*.html pages, picked by coid
+#
+# Every response is delayed by --latency-ms +/- --jitter-ms, and a --error-rate fraction of
+# requests get a "503 Service Unavailable" instead. A --stall-rate fraction send their headers and
+# the start of the page, then never finish the body, so the client's read times out after a 200.
+# Used by bench_scrape.py, or run it on its own:
+#   python benchmarks/mock_server.py --port 8700 --latency-ms 40 --jitter-ms 20 --error-rate 0.01
+# --- End Script Overview ---
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RECORDED_CATALOG_PAGES = 219 # Last page number in the recorded catalog_search.html
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def make_app(latency_ms=40.0, jitter_ms=20.0, error_rate=0.0, catalog_pages=25, seed=None, stall_rate=0.0):
+    """Builds the aiohttp application. `seed` makes the latency and error sequence repeatable."""
+    rng = random.Random(seed)
+    faculty_search = load_fixture("faculty_search.html")
+    faculty_profile = load_fixture("faculty_profile.html")
+    catalog_search = load_fixture("catalog_search.html").replace(
+        f"cpage={RECORDED_CATALOG_PAGES}\">{RECORDED_CATALOG_PAGES}<", f"cpage={catalog_pages}\">{catalog_pages}<"
+    )
+    previews = [load_fixture(os.path.basename(path)) for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "course_preview_*.html")))]
+
+    def replay(pick_page):
+        async def handler(request):
+            delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+            await asyncio.sleep(delay)
+            if rng.random() < error_rate:
+                return web.Response(status=503, text="Service Unavailable")
+            if rng.random() < stall_rate:
+                body = pick_page(request).encode()
+                response = web.StreamResponse(headers={"Content-Type": "text/html"})
+                response.content_length = len(body)
+                await response.prepare(request)
+                await response.write(body[:len(body) // 2])
+                while request.transport is not None and not request.transport.is_closing():
+                    await asyncio.sleep(0.1) # Until the client gives up and disconnects
+                return response
+            return web.Response(text=pick_page(request), content_type="text/html")
+        return handler
+
+    app = web.Application()
+    app.router.add_get("/faculty-search", replay(lambda request: faculty_search))
+    app.router.add_get("/faculty-profile", replay(lambda request: faculty_profile))
+    app.router.add_get("/search_advanced.php", replay(lambda request: catalog_search))
+    app.router.add_get("/preview_course_nopop.php", replay(
+        lambda request: previews[zlib.crc32(request.query.get("coid", "").encode()) % len(previews)]
+    ))
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the recorded UNT fixture pages with simulated latency and errors.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Mean response delay in milliseconds (default: 40).")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="Delay varies uniformly by up to this much (default: 20).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 503 (default: 0).")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of requests whose body stops halfway (default: 0).")
+    parser.add_argument("--catalog-pages", type=int, default=25, help="Pages each catalog search claims to have (default: 25).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the latency/error sequence.")
+    args = parser.parse_args()
+    app = make_app(args.latency_ms, args.jitter_ms, args.error_rate, args.catalog_pages, args.seed, args.stall_rate)
+    web.run_app(app, host=args.host, port=args.port, print=None)
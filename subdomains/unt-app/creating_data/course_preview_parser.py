@@ -0,0 +1,114 @@
+import re
+from html_parsing import make_soup, COURSE_PREVIEW_STRAINER
+
+# --- Module Overview ---
+# Parser for catalog course preview pages (preview_course_nopop.php), used by 6_scrape_course_info.py.
+#
+# extract_preview_text() gets the text after the course title out of the page (BeautifulSoup),
+# and parse_preview_text() splits it into fields. The text is read as:
+#   [hours block] [description] ... "Prerequisite(s): ..." ... "Course specific fees ...: ..." ...
+# All patterns are compiled once. After the hours block is matched, a single tokenizer pass over
+# the rest of the text finds the first "Prerequisite(s):", the first "Course specific fees" and
+# the marker that ends the prerequisite block, and every field (including "Other", the text
+# left over once the other fields are taken out) is cut out of the text by position.
+#
+# benchmarks/bench_course_preview_parser.py checks the output against the original
+# implementation on the fixture pages and reports pages per second for both stages.
+# --- End Module Overview ---
+
+SCRAPED_DATA_COLUMNS = ['Hours', 'Specific Hours', 'Description', 'Prerequisite(s)', 'Course Fees', 'Other']
+
+HOURS_PATTERN = re.compile(r'([\d–-]+)\s+hours?(\s*\([^)]+\))?')
+MARKER_PATTERN = re.compile(
+    r'(?P<prereq>Prerequisite\(s\):)'
+    r'|(?P<fees>Course specific fees)'
+    r'|(?P<stop>May be repeated|May only be taken|Not offered every term)',
+    re.I
+)
+PREREQ_LABEL_PATTERN = re.compile(r'Prerequisite\(s\):', re.I)
+FEES_LABEL_PATTERN = re.compile(r'Course specific fees.*?:\s*', re.I | re.S)
+
+
+def clean_text(text):
+    """Normalizes whitespace in a string."""
+    return ' '.join(text.split()).replace(' ,', ',')
+
+
+def find_markers(text: str):
+    """
+    One pass over `text`. Returns (prereq start, prereq end, fees start); each is None when absent.
+    The prerequisite block ends at the first "Course specific fees" or repeat/term note after
+    its label, or at the end of the text.
+    """
+    prereq_start = prereq_end = fees_start = None
+    for match in MARKER_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if prereq_start is not None and prereq_end is None and kind != 'prereq':
+            prereq_end = match.start()
+        if kind == 'prereq' and prereq_start is None:
+            prereq_start = match.start()
+        elif kind == 'fees' and fees_start is None:
+            fees_start = match.start()
+        if prereq_start is not None and prereq_end is not None and fees_start is not None:
+            break
+    if prereq_start is not None and prereq_end is None:
+        prereq_end = len(text)
+    return prereq_start, prereq_end, fees_start
+
+
+def extract_preview_text(html_content: str):
+    """Returns the whitespace-normalized text after the course title, or None if the page has no title paragraph."""
+    # html.parser keeps the page's <h1> nested inside its <p>, which the extraction below relies on
+    soup = make_soup(html_content, parse_only=COURSE_PREVIEW_STRAINER, backend='html.parser')
+
+    h1 = soup.find('h1', id='course_preview_title')
+    if not h1 or not h1.parent or h1.parent.name != 'p': return None
+
+    h1_text = h1.get_text(strip=True)
+    data_text = h1.parent.get_text(separator='---').strip().replace('---', ' ')
+    return clean_text(data_text.replace(h1_text, '', 1))
+
+
+def parse_preview_text(text: str) -> dict:
+    """Splits the text after the course title into the SCRAPED_DATA_COLUMNS fields."""
+    details = dict.fromkeys(SCRAPED_DATA_COLUMNS, '')
+    hours_match = HOURS_PATTERN.match(text)
+    if hours_match:
+        details['Hours'] = hours_match.group(1)
+        if hours_match.group(2): details['Specific Hours'] = hours_match.group(2).lstrip()
+        text = text[hours_match.end():].strip()
+
+    prereq_start, prereq_end, fees_start = find_markers(text)
+    first_marker_pos = min(pos for pos in (prereq_start, fees_start, len(text)) if pos is not None)
+    details['Description'] = text[:first_marker_pos].strip()
+    other_text = text[first_marker_pos:]
+
+    if prereq_start is not None:
+        prereq_block = text[prereq_start:prereq_end].rstrip()
+        prereq_content = PREREQ_LABEL_PATTERN.sub('', prereq_block).strip()
+        if prereq_content.lower() not in ('none', 'none.'): details['Prerequisite(s)'] = prereq_content
+        # Take the block out of what is left over for "Other"
+        block_pos = prereq_start - first_marker_pos
+        other_text = (other_text[:block_pos] + other_text[block_pos + len(prereq_block):]).strip()
+
+    if fees_start is not None:
+        fees_block = text[fees_start:]
+        details['Course Fees'] = FEES_LABEL_PATTERN.sub('', fees_block).strip()
+        # The fees block runs to the end of the text. It only remains intact in "Other" if the
+        # prerequisite block (if any) came before it.
+        if other_text.endswith(fees_block):
+            other_text = other_text[:-len(fees_block)].strip()
+
+    details['Other'] = other_text
+
+    for key, value in details.items():
+        details[key] = clean_text(value)
+    return details
+
+
+def parse_course_html(html_content: str) -> dict:
+    """Parses course HTML with robust logic for all fields."""
+    text = extract_preview_text(html_content)
+    if text is None:
+        return dict.fromkeys(SCRAPED_DATA_COLUMNS, '')
+    return parse_preview_text(text)
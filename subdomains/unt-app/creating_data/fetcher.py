@@ -0,0 +1,281 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import telemetry
+from http_cache import CACHE_FILE, ResponseCache
+
+# --- Module Overview ---
+# Shared HTTP fetch layer used by the scraping scripts (1, 2, 3 and 6).
+#
+# Every request goes through one aiohttp session and a per-host controller:
+# 1. Token bucket: each host gets `rate` requests per second (with a small burst),
+#    so pacing no longer ties up a concurrency slot the way a sleep inside a semaphore does.
+# 2. AIMD concurrency: each host starts at `initial_concurrency` requests in flight.
+#    Every successful response adds 1/limit of a slot (one whole slot per window of
+#    successes) and nudges the rate up; a 429, a 5xx, or a connection error/timeout
+#    halves both the slot count and the rate. Errors from requests that were already in
+#    flight when the limits were last cut don't cut them again, so one burst of 429s
+#    counts as a single signal. While the average latency is well above the best
+#    latency seen, the limits are held instead of increased.
+# 3. Retry-After: a 429 with a Retry-After header pauses the host's bucket for that long.
+# 4. Response cache (http_cache.py): pages still within their max-age are served from disk
+#    without touching the network; stale ones are revalidated with a conditional GET.
+# 5. Telemetry (telemetry.py): every request's latency, status and body size, and every
+#    cache hit and 304, is recorded per host for the run report.
+#
+# The current rate, concurrency and counters for each host are available from
+# Fetcher.host_stats() / Fetcher.describe_rates(), so scripts can print them as they run.
+# --- End Module Overview ---
+
+# --- Configuration ---
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+LATENCY_TOLERANCE = 3.0       # Hold (don't grow) limits while average latency exceeds this multiple of the best latency
+LATENCY_SMOOTHING = 0.2       # Weight of the newest sample in the moving average latency
+RATE_INCREASE = 0.5           # Requests/second added to a host's rate after each successful response
+USE_HTTP_CACHE = True         # Serve/revalidate pages from the on-disk cache (see http_cache.py)
+
+@dataclass
+class HostLimits:
+    """Starting point and bounds for one host's rate and concurrency."""
+    rate: float = 10.0                 # Starting requests per second
+    min_rate: float = 0.5
+    max_rate: float = 50.0
+    burst: int = 5                     # Requests that may be sent back-to-back after an idle period
+    initial_concurrency: int = 4
+    min_concurrency: int = 1
+    max_concurrency: int = 16
+
+HOST_LIMITS: Dict[str, HostLimits] = {
+    "facultyinfo.unt.edu": HostLimits(rate=10.0, max_rate=40.0, initial_concurrency=4, max_concurrency=16),
+    "catalog.unt.edu": HostLimits(rate=10.0, max_rate=50.0, initial_concurrency=4, max_concurrency=32),
+}
+DEFAULT_HOST_LIMITS = HostLimits()
+# --- End Configuration ---
+
+
+class TokenBucket:
+    """Async token bucket: take() waits until a request is allowed under the current rate."""
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def pause(self, seconds: float):
+        """Stops handing out tokens for `seconds` (used for Retry-After)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def take(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order.
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostController:
+    """Tracks one host's in-flight requests and adapts its rate and concurrency (AIMD)."""
+    def __init__(self, host: str, limits: HostLimits, max_concurrency: Optional[int] = None):
+        self.host = host
+        self.limits = limits
+        self.max_concurrency = min(limits.max_concurrency, max_concurrency) if max_concurrency else limits.max_concurrency
+        self.concurrency = float(max(limits.min_concurrency, min(limits.initial_concurrency, self.max_concurrency)))
+        self.bucket = TokenBucket(limits.rate, limits.burst)
+        self.in_flight = 0
+        self.last_decrease_at = 0.0
+        self._cond = asyncio.Condition()
+
+        # Counters exposed through Fetcher.host_stats()
+        self.requests = 0
+        self.successes = 0
+        self.throttled = 0
+        self.cache_hits = 0       # Served from the cache without a request
+        self.not_modified = 0     # Revalidated with a 304 response
+        self.avg_latency: Optional[float] = None
+        self.best_latency: Optional[float] = None
+
+    async def acquire(self):
+        async with self._cond:
+            while self.in_flight >= int(self.concurrency):
+                await self._cond.wait()
+            self.in_flight += 1
+        try:
+            await self.bucket.take()
+        except BaseException:
+            # Cancelled while waiting for a token (e.g. during a Retry-After pause): give the slot back
+            await self.abandon()
+            raise
+
+    async def abandon(self):
+        """Gives back the slot of a cancelled request. A cancellation says nothing about the host, so nothing is counted."""
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    async def release(self, status: Optional[int], started_at: float, retry_after: Optional[float] = None):
+        """Records the outcome of a request. `status` is None for connection errors and timeouts."""
+        now = time.monotonic()
+        latency = now - started_at
+        async with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+
+            if status is None or status == 429 or status >= 500:
+                self.throttled += 1
+                if started_at >= self.last_decrease_at:
+                    self.concurrency = max(self.limits.min_concurrency, self.concurrency / 2)
+                    self.bucket.rate = max(self.limits.min_rate, self.bucket.rate / 2)
+                    self.last_decrease_at = now
+                if retry_after:
+                    self.bucket.pause(retry_after)
+            else:
+                self.successes += 1
+                if self.avg_latency is None:
+                    self.avg_latency = latency
+                else:
+                    self.avg_latency = LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.avg_latency
+                self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+
+                if self.avg_latency <= LATENCY_TOLERANCE * self.best_latency:
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+                    self.bucket.rate = min(self.limits.max_rate, self.bucket.rate + RATE_INCREASE)
+
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        return {
+            "rate": round(self.bucket.rate, 2),
+            "concurrency": int(self.concurrency),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "successes": self.successes,
+            "throttled": self.throttled,
+            "cache_hits": self.cache_hits,
+            "not_modified": self.not_modified,
+            "avg_latency": round(self.avg_latency, 3) if self.avg_latency is not None else None,
+        }
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None # HTTP-date form; the halved rate is enough of a backoff
+
+
+class Fetcher:
+    """
+    One pooled aiohttp session plus a HostController per host.
+    Use as `async with Fetcher() as fetcher: html = await fetcher.get_text(url)`.
+    get_text() raises aiohttp.ClientResponseError for 4xx/5xx responses, like raise_for_status().
+    """
+    def __init__(self, max_concurrency: Optional[int] = None, headers: Optional[Dict[str, str]] = HEADERS,
+                 host_limits: Optional[Dict[str, HostLimits]] = None, use_cache: bool = USE_HTTP_CACHE,
+                 cache_path: str = CACHE_FILE):
+        self.max_concurrency = max_concurrency
+        self.headers = headers or {}
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+        self.use_cache = use_cache
+        self.cache_path = cache_path
+        self.controllers: Dict[str, HostController] = {}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.cache: Optional[ResponseCache] = None
+
+    async def __aenter__(self):
+        # Connection counts are bounded by the host controllers, not by the connector.
+        self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0))
+        if self.use_cache:
+            self.cache = ResponseCache(self.cache_path)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+
+    def controller_for(self, url: str) -> HostController:
+        host = urlsplit(url).hostname or ""
+        if host not in self.controllers:
+            limits = self.host_limits.get(host, DEFAULT_HOST_LIMITS)
+            self.controllers[host] = HostController(host, limits, self.max_concurrency)
+        return self.controllers[host]
+
+    async def get_text(self, url: str, timeout: float = 30) -> str:
+        controller = self.controller_for(url)
+        headers = self.headers
+        cached = self.cache.get(url) if self.cache else None
+        if cached:
+            if self.cache.is_fresh(url, cached):
+                controller.cache_hits += 1
+                telemetry.record_cache_hit(controller.host)
+                return cached.body
+            headers = {**self.headers, **self.cache.conditional_headers(cached)}
+
+        await controller.acquire()
+        started = time.monotonic()
+        status = None
+        retry_after = None
+        nbytes = 0
+        cancelled = False
+        try:
+            async with self.session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                status = response.status
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if status == 304 and cached:
+                    controller.not_modified += 1
+                    telemetry.record_not_modified(controller.host)
+                    self.cache.touch(url)
+                    return cached.body
+                response.raise_for_status()
+                try:
+                    nbytes = len(await response.read())
+                    text = await response.text()
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    status = None # The headers arrived but the body didn't: an error, not a 200
+                    raise
+                if self.cache:
+                    self.cache.store(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                return text
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if cancelled:
+                await controller.abandon()
+            else:
+                telemetry.record_request(controller.host, status, time.monotonic() - started, nbytes)
+                await controller.release(status, started, retry_after)
+
+    def host_stats(self) -> Dict[str, Dict]:
+        """Current rate (req/s), concurrency limit and counters for every host seen so far."""
+        return {host: controller.stats() for host, controller in self.controllers.items()}
+
+    def describe_rates(self) -> str:
+        parts = []
+        for host, s in self.host_stats().items():
+            parts.append(f"{host}: {s['rate']} req/s, {s['concurrency']} slots, {s['requests']} requests ({s['throttled']} throttled), "
+                         f"{s['cache_hits']} cache hits, {s['not_modified']} not modified")
+        return "; ".join(parts) if parts else "no requests made"
@@ -0,0 +1,55 @@
+import os
+from bs4 import BeautifulSoup, SoupStrainer
+
+# --- Module Overview ---
+# Shared HTML parsing layer used by the scraping scripts.
+#
+# make_soup() builds a BeautifulSoup tree with the fastest available tree builder
+# (lxml when it is installed, Python's html.parser otherwise) and, when given a
+# SoupStrainer, only builds the part of the page the caller actually reads
+# (e.g. the faculty result blocks or the profile course tables).
+#
+# Pages whose markup is invalid in a way the extraction code depends on can ask for
+# a specific backend. The course preview page, for example, nests its <h1> inside a
+# <p>; html.parser keeps that nesting, lxml does not.
+#
+# Set SCRAPER_HTML_PARSER=html.parser (or lxml) to force a backend, and
+# SCRAPER_HTML_STRAINERS=0 to build full trees (the original behavior), e.g. to compare output.
+# --- End Module Overview ---
+
+# --- Configuration ---
+PARSER_BACKEND = os.environ.get("SCRAPER_HTML_PARSER", "auto")     # "auto", "lxml", or "html.parser"
+USE_STRAINERS = os.environ.get("SCRAPER_HTML_STRAINERS", "1") != "0"
+# --- End Configuration ---
+
+try:
+    import lxml # noqa: F401 (only checking that the tree builder is available)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+def resolve_backend(backend=None):
+    """Returns the bs4 feature name to use for `backend` (defaults to PARSER_BACKEND)."""
+    backend = backend or PARSER_BACKEND
+    if backend == "auto":
+        return "lxml" if LXML_AVAILABLE else "html.parser"
+    return backend
+
+
+def make_soup(html, parse_only=None, backend=None):
+    """
+    Parses `html` with the configured backend. If `parse_only` (a SoupStrainer) is given
+    and strainers are enabled, only matching elements and their contents are built.
+    """
+    if parse_only is not None and not USE_STRAINERS:
+        parse_only = None
+    return BeautifulSoup(html, resolve_backend(backend), parse_only=parse_only)
+
+
+# --- Strainers for the regions each scraper reads ---
+FACULTY_RESULTS_STRAINER = SoupStrainer('div', class_='results-result')          # 1_generate_faculty.py
+PROFILE_COURSE_TABLES_STRAINER = SoupStrainer('table', class_='profile-courses-table') # 2_generate_all_offerings.py
+CATALOG_PAGINATION_STRAINER = SoupStrainer(['title', 'nav'])                     # 3_generate_all_catalog.py (page count)
+CATALOG_RESULTS_STRAINER = SoupStrainer('table')                                 # 3_generate_all_catalog.py (course list)
+COURSE_PREVIEW_STRAINER = SoupStrainer('p')                                      # 6_scrape_course_info.py
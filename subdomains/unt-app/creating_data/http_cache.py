@@ -0,0 +1,111 @@
+import csv
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Pattern, Set, Tuple
+
+# --- Module Overview ---
+# On-disk HTTP response cache used by fetcher.py.
+#
+# Every page is stored in a SQLite file keyed by URL, together with its ETag and
+# Last-Modified headers and the time it was last confirmed.
+# 1. Fresh: if the entry is younger than the max-age for its URL, the cached body is returned
+#    and no request is sent at all. Only pages of catalogs marked "Frozen" in the catalog
+#    mapping file get a long max-age; they no longer change.
+# 2. Stale: the fetcher sends a conditional GET (If-None-Match / If-Modified-Since).
+#    A "304 Not Modified" only refreshes the entry's timestamp, so a rerun only downloads
+#    pages that actually changed.
+# --- End Module Overview ---
+
+# --- Configuration ---
+CACHE_FILE = "0_http_cache.sqlite"
+DAY = 24 * 60 * 60
+
+# catalog.unt.edu pages (previews, searches) of the catalogs marked Frozen in this file are
+# reused for FROZEN_CATALOG_MAX_AGE without a request.
+CATALOG_MAPPING_FILE = "0_catalog_mapping.csv"
+FROZEN_CATALOG_MAX_AGE = 30 * DAY
+# (URL regex, max-age in seconds) for any other URL. The first matching pattern wins; URLs that
+# match nothing use DEFAULT_MAX_AGE. A max-age of 0 means "always revalidate": every page of the
+# current catalog, faculty profiles and search results is checked with a conditional GET, so a
+# nightly run never misses a change, and an unchanged page only costs a 304.
+CACHE_POLICIES: List[Tuple[str, int]] = []
+DEFAULT_MAX_AGE = 0
+# --- End Configuration ---
+
+
+@dataclass
+class CachedResponse:
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+def load_frozen_catalogs(filepath: str = CATALOG_MAPPING_FILE) -> Set[str]:
+    """Catalog IDs (catoids) marked Frozen in the catalog mapping file; empty if there is none."""
+    if not os.path.exists(filepath):
+        return set()
+    with open(filepath, mode='r', encoding='utf-8', newline='') as infile:
+        return {row["Catalog ID"].strip() for row in csv.DictReader(infile)
+                if (row.get("Catalog ID") or "").strip() and (row.get("Frozen") or "").strip().lower() in ('true', '1', 't')}
+
+
+class ResponseCache:
+    """SQLite-backed store of response bodies and validators, keyed by URL."""
+    def __init__(self, path: str = CACHE_FILE, policies: Optional[List[Tuple[str, int]]] = None,
+                 frozen_catalogs: Optional[Set[str]] = None):
+        self.path = path
+        self.policies: List[Tuple[Pattern, int]] = [(re.compile(p), age) for p, age in (CACHE_POLICIES if policies is None else policies)]
+        self.frozen_catalogs = load_frozen_catalogs() if frozen_catalogs is None else frozen_catalogs
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            body TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL
+        )
+        ''')
+
+    def max_age_for(self, url: str) -> int:
+        catoid = re.search(r"catalog\.unt\.edu/.*[?&](?:catoid|cur_cat_oid)=(\d+)", url)
+        if catoid and catoid.group(1) in self.frozen_catalogs:
+            return FROZEN_CATALOG_MAX_AGE
+        for pattern, max_age in self.policies:
+            if pattern.search(url):
+                return max_age
+        return DEFAULT_MAX_AGE
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        row = self.conn.execute("SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def is_fresh(self, url: str, entry: CachedResponse) -> bool:
+        return time.time() - entry.fetched_at < self.max_age_for(url)
+
+    def conditional_headers(self, entry: CachedResponse) -> dict:
+        """Validators to send with a revalidation request."""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, body, etag, last_modified, time.time())
+        )
+
+    def touch(self, url: str):
+        """Marks an entry as just confirmed (after a 304 Not Modified)."""
+        self.conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def close(self):
+        self.conn.close()
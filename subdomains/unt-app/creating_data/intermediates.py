@@ -0,0 +1,199 @@
+import csv
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# --- Module Overview ---
+# Typed columnar copies of the catalog intermediate files, shared by scripts 3-6.
+#
+# The CSV files stay the handoff format (and what you open in a spreadsheet). When pyarrow is
+# installed, write_typed_copy() also writes "<name>.parquet" next to a CSV: the same string
+# columns plus the fields every downstream stage used to re-derive from them with per-row regexes:
+#   Start Year       int16  first year of "2024-2025" (-1 if there is none)
+#   Dept Code        str    first standalone 3-4 capital letters of the course code ("CSCE")
+#   Course Number    str    first standalone 3-4 digit number of the course code ("1030")
+#   Grade Level      int8   first digit of the course number (-1 if there is none)
+#   Normalized Name  str    course name, lowercase and alphanumeric only
+#   Base Name        str    course name before any ":" subtitle, without a trailing Roman numeral
+#   Roman Numeral    str    that trailing Roman numeral, I to X ("" if there is none)
+#   Subtitle         str    course name after the first ":" ("" if there is none)
+#   Normalized Base Name  str  base name, lowercase and alphanumeric only
+# load_catalog_frame() memory-maps the Parquet copy when it still matches its CSV (same size and
+# modification time as when the copy was written) and otherwise falls back to reading the CSV and
+# deriving the columns in one vectorized pass, so a hand-edited CSV is never silently ignored.
+# That pass runs in Arrow compute for ASCII rows and with Python's `re` for the rest (or for every
+# row without pyarrow), so both give exactly what the per-row Python parsing used to.
+#
+# Set SCRAPER_PARQUET=0 to neither write nor read the Parquet copies.
+# --- End Module Overview ---
+
+# --- Configuration ---
+USE_PARQUET = os.environ.get("SCRAPER_PARQUET", "1") != "0"
+# --- End Configuration ---
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+PARSED_COLUMNS = ["Start Year", "Dept Code", "Course Number", "Grade Level", "Normalized Name",
+                  "Base Name", "Roman Numeral", "Subtitle", "Normalized Base Name"]
+ROMAN_NUMERALS = "X|IX|VIII|VII|VI|V|IV|III|II|I" # A trailing one, after whitespace, is split off the base name
+# The ASCII characters str.strip() and Python's \s treat as whitespace (RE2's \s has no \x0b or \x1c-\x1f)
+ASCII_WHITESPACE = " \t\n\x0b\x0c\r\x1c\x1d\x1e\x1f"
+ASCII_WHITESPACE_CLASS = r" \t\n\x0b\x0c\r\x1c-\x1f"
+SOURCE_METADATA_KEY = b"source_csv_stat" # "<size>:<mtime_ns>" of the CSV the copy was written from
+
+
+def typed_copy_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _source_stat(csv_path: str) -> bytes:
+    stat = os.stat(csv_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+
+def _parse_with_python_re(codes: pd.Series, names: pd.Series, years: pd.Series) -> Dict[str, pd.Series]:
+    """PARSED_COLUMNS of object columns, with Python's `re` and str methods (Unicode-aware \d, \W, \s and lower())."""
+    parsed = {}
+    start_year = years.str.strip().str.extract(r"^(\d{4})", expand=False)
+    parsed["Start Year"] = start_year.map(lambda year: int(year) if isinstance(year, str) else -1).astype("int16")
+    parsed["Dept Code"] = codes.str.strip().str.extract(r"\b([A-Z]{3,4})\b", expand=False).fillna("")
+    course_number = codes.str.extract(r"\b(\d{3,4})\b", expand=False).fillna("")
+    parsed["Course Number"] = course_number
+    parsed["Grade Level"] = course_number.map(lambda number: int(number[0]) if number else -1).astype("int8")
+    # [\W_] is exactly the characters for which str.isalnum() is False
+    parsed["Normalized Name"] = names.str.lower().str.replace(r"[\W_]+", "", regex=True)
+    # "Topics II: Ethics" -> base "Topics", numeral "II", subtitle "Ethics"
+    name_parts = names.str.strip().str.extract(r"(?s)^([^:]*):?(.*)$")
+    title = name_parts[0].str.strip()
+    roman_match = title.str.extract(rf"(?s)^(.*?)\s+({ROMAN_NUMERALS})$")
+    parsed["Base Name"] = title.where(roman_match[1].isna(), roman_match[0].str.strip())
+    parsed["Roman Numeral"] = roman_match[1].fillna("")
+    parsed["Subtitle"] = name_parts[1].str.strip()
+    parsed["Normalized Base Name"] = parsed["Base Name"].str.lower().str.replace(r"[\W_]+", "", regex=True)
+    return parsed
+
+
+def _parse_ascii_with_arrow(codes: "pa.Array", names: "pa.Array", years: "pa.Array") -> Dict[str, "pa.Array"]:
+    """
+    The same columns with pyarrow.compute, in C++. Only exact for ASCII strings: Arrow's regexes
+    (RE2) have ASCII-only \d and \b, so whitespace and letters are spelled out as ASCII sets below.
+    """
+    parsed = {}
+    trimmed_years = pc.utf8_trim(years, ASCII_WHITESPACE)
+    has_year = pc.match_substring_regex(trimmed_years, r"^[0-9]{4}")
+    parsed["Start Year"] = pc.cast(pc.if_else(has_year, pc.utf8_slice_codeunits(trimmed_years, 0, 4), "-1"), pa.int16())
+    parsed["Dept Code"] = pc.fill_null(pc.struct_field(pc.extract_regex(codes, r"\b(?P<dept>[A-Z]{3,4})\b"), [0]), "")
+    course_number = pc.fill_null(pc.struct_field(pc.extract_regex(codes, r"\b(?P<number>[0-9]{3,4})\b"), [0]), "")
+    parsed["Course Number"] = course_number
+    first_digit = pc.utf8_slice_codeunits(course_number, 0, 1)
+    parsed["Grade Level"] = pc.cast(pc.if_else(pc.equal(first_digit, ""), "-1", first_digit), pa.int8())
+    parsed["Normalized Name"] = pc.replace_substring_regex(pc.ascii_lower(names), r"[^a-z0-9]+", "")
+    name_parts = pc.split_pattern(pc.utf8_trim(names, ASCII_WHITESPACE), ":", max_splits=1)
+    title = pc.utf8_trim(pc.list_element(name_parts, 0), ASCII_WHITESPACE)
+    subtitle = pc.list_element(pc.list_slice(name_parts, 1, 2, return_fixed_size_list=True), 0) # null without a ":"
+    parsed["Subtitle"] = pc.utf8_trim(pc.fill_null(subtitle, ""), ASCII_WHITESPACE)
+    # The numeral regex is slow on long names, so it only runs on titles that end in I, V or X
+    may_have_numeral = pc.is_in(pc.utf8_slice_codeunits(title, -1), value_set=pa.array(["I", "V", "X"]))
+    candidates = pc.filter(title, may_have_numeral)
+    roman_match = pc.extract_regex(candidates, rf"(?s)^(?P<base>.*?)[{ASCII_WHITESPACE_CLASS}]+(?P<numeral>{ROMAN_NUMERALS})$")
+    candidate_bases = pc.if_else(pc.is_valid(roman_match), pc.utf8_trim(pc.struct_field(roman_match, [0]), ASCII_WHITESPACE), candidates)
+    parsed["Base Name"] = pc.replace_with_mask(title, may_have_numeral, candidate_bases)
+    candidate_numerals = pc.fill_null(pc.struct_field(roman_match, [1]), "")
+    parsed["Roman Numeral"] = pc.replace_with_mask(pa.nulls(len(title), pa.string()).fill_null(""), may_have_numeral, candidate_numerals)
+    parsed["Normalized Base Name"] = pc.replace_substring_regex(pc.ascii_lower(parsed["Base Name"]), r"[^a-z0-9]+", "")
+    return parsed
+
+
+def add_parsed_columns(df: pd.DataFrame, code_col: str = "Course Code", name_col: str = "Course Name", year_col: str = "Year") -> pd.DataFrame:
+    """
+    Adds PARSED_COLUMNS to a frame of catalog rows, parsing each column in one vectorized pass:
+    with Arrow compute when pyarrow is installed, and Python's `re` for rows that are not pure ASCII.
+    """
+    columns = [df[col] for col in (code_col, name_col, year_col)]
+    # Object columns keep Python's `re` and str methods, whatever string dtype pandas defaults to
+    if not PYARROW_AVAILABLE:
+        parsed = _parse_with_python_re(*(column.astype(object) for column in columns))
+    else:
+        arrays = [pa.array(column, type=pa.string()) for column in columns]
+        arrays = [array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array for array in arrays]
+        parsed = {col: array.to_pandas().set_axis(df.index) for col, array in _parse_ascii_with_arrow(*arrays).items()}
+        is_ascii = [pc.string_is_ascii(array) for array in arrays]
+        non_ascii = ~pc.and_(pc.and_(is_ascii[0], is_ascii[1]), is_ascii[2]).to_numpy(zero_copy_only=False)
+        if non_ascii.any():
+            for col, values in _parse_with_python_re(*(column[non_ascii].astype(object) for column in columns)).items():
+                parsed[col] = parsed[col].copy()
+                parsed[col][non_ascii] = values.to_numpy()
+    for col in PARSED_COLUMNS:
+        df[col] = parsed[col]
+    return df
+
+
+def deduplicated_list(column: pd.Series) -> list:
+    """The values of a column as a list in which equal values are one shared object (like sys.intern)."""
+    codes, uniques = pd.factorize(column)
+    return np.asarray(uniques, dtype=object)[codes].tolist()
+
+
+def read_csv_as_strings(csv_path: str) -> pd.DataFrame:
+    """Reads a CSV with every value as a string and empty cells as "" (like csv.DictReader)."""
+    if PYARROW_AVAILABLE:
+        with open(csv_path, encoding="utf-8-sig", newline="") as f:
+            header = next(csv.reader(f), [])
+        try: # Arrow's reader is several times faster, and its columns go to Arrow compute as they are
+            return pa_csv.read_csv(
+                csv_path,
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(column_types={col: pa.string() for col in header}, strings_can_be_null=False, quoted_strings_can_be_null=False),
+            ).to_pandas()
+        except pa.ArrowInvalid: # e.g. a row with a different number of fields, which pandas tolerates
+            pass
+    return pd.read_csv(csv_path, dtype=object, keep_default_na=False)
+
+
+def write_typed_copy(csv_path: str) -> Optional[str]:
+    """Writes the Parquet copy of a catalog CSV that was just written. Returns its path, or None if skipped."""
+    if not (USE_PARQUET and PYARROW_AVAILABLE):
+        return None
+    df = add_parsed_columns(read_csv_as_strings(csv_path))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_METADATA_KEY: _source_stat(csv_path)})
+    path = typed_copy_path(csv_path)
+    pq.write_table(table, path + ".tmp")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def read_typed_copy(csv_path: str) -> Optional[pd.DataFrame]:
+    """The Parquet copy of `csv_path` (memory-mapped), or None if there is none or it no longer matches the CSV."""
+    path = typed_copy_path(csv_path)
+    if not (USE_PARQUET and PYARROW_AVAILABLE and os.path.exists(path) and os.path.exists(csv_path)):
+        return None
+    try:
+        schema = pq.read_schema(path)
+        if (schema.metadata or {}).get(SOURCE_METADATA_KEY) != _source_stat(csv_path):
+            return None
+        if not set(PARSED_COLUMNS) <= set(schema.names): # Written before a column was added
+            return None
+        return pq.read_table(path, memory_map=True).to_pandas()
+    except (OSError, pa.ArrowException):
+        return None
+
+
+def load_catalog_frame(csv_path: str) -> pd.DataFrame:
+    """
+    Catalog rows with their string columns plus PARSED_COLUMNS, from the Parquet copy when it is
+    current and from the CSV otherwise. Raises FileNotFoundError if the CSV does not exist.
+    """
+    df = read_typed_copy(csv_path)
+    if df is not None:
+        return df
+    return add_parsed_columns(read_csv_as_strings(csv_path))
@@ -0,0 +1,369 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# --- Script Overview ---
+# Runs scripts 1-7 in order, skipping every stage whose outputs are already up to date.
+#
+# Each stage lists the files it reads and the files it writes. Before a stage runs, the runner
+# fingerprints it: a SHA-256 of each input file, of the script itself (its "Configuration" section
+# included) and of every local module it imports (fetcher.py, html_parsing.py, ...), plus its
+# command-line arguments. A stage is skipped when its fingerprint matches the one recorded after
+# its last successful run and its outputs still exist with the recorded contents.
+#
+# Because fingerprints use file contents rather than timestamps, a change only travels as far as
+# the data it actually changes. Editing the matching logic in 5_offering_groups.py reruns stage 5,
+# and stage 7 only if "all_offerings.csv" came out different; the scraping stages are left alone.
+#
+# Each stage depends on the stages that write its input files. With --parallel, a stage starts as
+# soon as those have finished, so the two scraping branches (facultyinfo.unt.edu and
+# catalog.unt.edu) overlap. After the run, a timeline and the critical path (the chain of stages
+# that decided the wall time) are printed.
+#
+# Usage (from the "creating_data" folder):
+#   python run_pipeline.py                  # run whatever is out of date
+#   python run_pipeline.py --dry-run        # only show what would run and why
+#   python run_pipeline.py --force 3        # rerun stage 3 (e.g. to pick up new catalog listings)
+#   python run_pipeline.py --stages 4,5,7   # only consider these stages
+#   python run_pipeline.py --parallel       # run the faculty branch (1, 2) and the catalog branch (3, 4, 6)
+#                                           # at the same time; they only meet at stage 5
+#   python run_pipeline.py --mark-current   # record the existing files as up to date without running anything
+#                                           # (e.g. the first time, so the scrapes are not repeated)
+# --- End Script Overview ---
+
+# --- Configuration ---
+STATE_FILE = "0_pipeline_state.json" # Fingerprints and output hashes from the last successful run of each stage
+PIPELINE_LOG_DIR = "pipeline_logs"    # With --parallel, each stage's console output goes to <script name>.log here
+HASH_CHUNK_SIZE = 1 << 20
+
+@dataclass
+class Stage:
+    """One script of the pipeline and the files it reads and writes (relative to this folder)."""
+    name: str
+    script: str
+    inputs: List[str]
+    outputs: List[str]
+    args: List[str] = field(default_factory=list)
+
+STAGES = [
+    Stage("1", "1_generate_faculty.py", inputs=[], outputs=["faculty.csv"]),
+    Stage("2", "2_generate_all_offerings.py", inputs=["faculty.csv", "semester_mapping.csv"], outputs=["0_all_offerings.csv"]),
+    Stage("3", "3_generate_all_catalog.py", inputs=["0_catalog_mapping.csv"], outputs=["0_all_catalog1.csv"]),
+    Stage("4", "4_catalog_groups.py", inputs=["0_all_catalog1.csv"], outputs=["0_all_catalog2.csv"]),
+    Stage("5", "5_offering_groups.py", inputs=["0_all_offerings.csv", "0_all_catalog2.csv"], outputs=["all_offerings.csv"]),
+    Stage("6", "6_scrape_course_info.py", inputs=["0_all_catalog2.csv"], outputs=["all_catalog.csv"]),
+    Stage("7", "7_generate_db.py", inputs=["faculty.csv", "all_catalog.csv", "all_offerings.csv"], outputs=["courses.db"]),
+]
+# --- End Configuration ---
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass
+class StageTiming:
+    """When a stage started and finished during this run, in seconds since the run started."""
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    status: str = ""
+
+
+def file_hash(path: str) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_code_files(script: str) -> List[str]:
+    """The script plus every module in this folder it imports, directly or through another local module."""
+    found = []
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.append(path)
+        with open(os.path.join(HERE, path), encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module_file = name.split(".")[0] + ".py"
+                if os.path.exists(os.path.join(HERE, module_file)):
+                    pending.append(module_file)
+    return sorted(found)
+
+
+def fingerprint(stage: Stage) -> Dict:
+    """Hashes of everything a stage's outputs depend on."""
+    return {
+        "inputs": {path: file_hash(path) for path in stage.inputs},
+        "code": {path: file_hash(os.path.join(HERE, path)) for path in local_code_files(stage.script)},
+        "args": stage.args,
+    }
+
+
+def describe_changes(old: Dict, new: Dict) -> str:
+    """Short reason a stage is out of date, from its recorded and current fingerprints."""
+    changed = [path for kind in ("inputs", "code") for path, digest in new[kind].items() if old[kind].get(path) != digest]
+    if old["args"] != new["args"]:
+        changed.append("arguments")
+    return "changed: " + ", ".join(changed) if changed else "dependencies changed"
+
+
+def load_state() -> Dict:
+    if not os.path.exists(STATE_FILE):
+        return {}
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"⚠️ Could not read '{STATE_FILE}'; every stage will be treated as out of date.")
+        return {}
+
+
+def save_state(state: Dict):
+    with open(STATE_FILE + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(STATE_FILE + ".tmp", STATE_FILE)
+
+
+def stale_reason(stage: Stage, current: Dict, recorded: Optional[Dict]) -> Optional[str]:
+    """Why `stage` has to run, or None if its outputs are up to date."""
+    if recorded is None:
+        return "no previous run recorded"
+    if recorded["fingerprint"] != current:
+        return describe_changes(recorded["fingerprint"], current)
+    for path, digest in recorded["outputs"].items():
+        actual = file_hash(path)
+        if actual is None:
+            return f"'{path}' is missing"
+        if actual != digest:
+            return f"'{path}' was modified outside the pipeline"
+    return None
+
+
+def run_stage(stage: Stage, log_path: Optional[str] = None) -> bool:
+    """
+    Runs one script in this folder, with its output going to `log_path` if given.
+    Returns True if it exited cleanly and wrote all of its outputs.
+    """
+    sys.stdout.flush() # Keep our messages ahead of the script's output when redirected
+    if log_path:
+        with open(log_path, "w", encoding="utf-8") as log:
+            result = subprocess.run([sys.executable, stage.script, *stage.args], cwd=HERE, stdout=log, stderr=subprocess.STDOUT)
+    else:
+        result = subprocess.run([sys.executable, stage.script, *stage.args], cwd=HERE)
+    if result.returncode != 0:
+        print(f"❌ Stage {stage.name} ({stage.script}) exited with code {result.returncode}.")
+        return False
+    missing = [path for path in stage.outputs if not os.path.exists(path)]
+    if missing:
+        print(f"❌ Stage {stage.name} ({stage.script}) finished without writing: {', '.join(missing)}.")
+        return False
+    return True
+
+
+def record_run(state: Dict, stage: Stage, current: Dict):
+    state[stage.name] = {
+        "fingerprint": current,
+        "outputs": {path: file_hash(path) for path in stage.outputs},
+        "completed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    save_state(state)
+
+
+def mark_current(stages: List[Stage]):
+    """Records each stage's existing inputs, code and outputs as up to date without running it."""
+    state = load_state()
+    for stage in stages:
+        missing = [path for path in stage.inputs + stage.outputs if not os.path.exists(path)]
+        if missing:
+            print(f"⚠️ Stage {stage.name} ({stage.script}) not marked; missing: {', '.join(missing)}.")
+            continue
+        record_run(state, stage, fingerprint(stage))
+        print(f"✅ Stage {stage.name} ({stage.script}) marked as up to date.")
+
+
+def stage_dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+    """For each stage, the (selected) stages that write one of its input files."""
+    produced_by = {path: stage.name for stage in stages for path in stage.outputs}
+    return {stage.name: sorted({produced_by[path] for path in stage.inputs if path in produced_by}) for stage in stages}
+
+
+def critical_path(timings: Dict[str, StageTiming], dependencies: Dict[str, List[str]]) -> List[str]:
+    """The chain of stages that ended last: the last stage to finish, the dependency it waited on longest, and so on."""
+    finished = {name: timing for name, timing in timings.items() if timing.finished is not None}
+    if not finished:
+        return []
+    path = [max(finished, key=lambda name: finished[name].finished)]
+    while True:
+        waited_on = [name for name in dependencies[path[0]] if name in finished]
+        if not waited_on:
+            return path
+        path.insert(0, max(waited_on, key=lambda name: finished[name].finished))
+
+
+def print_timeline(stages: List[Stage], timings: Dict[str, StageTiming], dependencies: Dict[str, List[str]], wall_time: float, parallel: bool):
+    """Prints when each stage ran and, for a parallel run, the critical path and the wall time saved by it."""
+    print("\n⏱️ Timeline (seconds since start):")
+    for stage in stages:
+        timing = timings.get(stage.name)
+        if timing is None or timing.started is None:
+            print(f"  Stage {stage.name}  {stage.script:<28} {'':>15}  {timing.status if timing else 'not started'}")
+            continue
+        end = f"{timing.finished:7.1f}" if timing.finished is not None else "      -"
+        print(f"  Stage {stage.name}  {stage.script:<28} {timing.started:7.1f} →{end}  {timing.status}")
+
+    path = critical_path(timings, dependencies) if parallel else []
+    if path:
+        path_time = sum(timings[name].finished - timings[name].started for name in path)
+        busy_time = sum(t.finished - t.started for t in timings.values() if t.finished is not None)
+        print(f"Critical path: {' → '.join(path)} ({path_time:.1f}s of stage time)")
+        print(f"Wall time: {wall_time:.1f}s (running the stages one after another: {busy_time:.1f}s)")
+
+
+def dry_run(stages: List[Stage], forced: List[str], state: Dict):
+    """Prints which stages would run and why, without running anything."""
+    pending_outputs = set() # Outputs of stages that would run, so later stages count as stale too
+    for stage in stages:
+        current = fingerprint(stage)
+        waiting_on = sorted(path for path in stage.inputs if path in pending_outputs)
+        if stage.name in forced:
+            reason = "forced"
+        elif waiting_on:
+            reason = f"an earlier stage may change {', '.join(waiting_on)}"
+        else:
+            reason = stale_reason(stage, current, state.get(stage.name))
+
+        if reason is None:
+            print(f"✅ Stage {stage.name} ({stage.script}) is up to date.")
+        else:
+            print(f"▶️ Stage {stage.name} ({stage.script}): {reason}.")
+            pending_outputs.update(stage.outputs)
+
+
+def main(selected: List[str], forced: List[str], dry: bool, parallel: bool):
+    state = load_state()
+    stages = [stage for stage in STAGES if stage.name in selected]
+    if dry:
+        dry_run(stages, forced, state)
+        return
+
+    produced_by = {path: stage.name for stage in STAGES for path in stage.outputs}
+    dependencies = stage_dependencies(stages)
+    if parallel:
+        os.makedirs(PIPELINE_LOG_DIR, exist_ok=True)
+
+    # A stage is started once every stage it depends on has finished. Sequentially that is simply
+    # the order of STAGES; with --parallel, the faculty branch (1, 2) and the catalog branch
+    # (3, 4, 6) run side by side and join at stage 5.
+    pending = list(stages)
+    running = {} # Future -> (stage, fingerprint)
+    done, failed = set(), set()
+    timings: Dict[str, StageTiming] = {}
+    run_started = time.perf_counter()
+    elapsed = lambda: time.perf_counter() - run_started
+
+    def start_ready_stages(pool):
+        for stage in list(pending):
+            deps = dependencies[stage.name]
+            if any(name in failed for name in deps):
+                pending.remove(stage)
+                failed.add(stage.name)
+                timings[stage.name] = StageTiming(status="blocked")
+                print(f"⏭️ Stage {stage.name} ({stage.script}) skipped because an earlier stage failed.")
+                continue
+            if not all(name in done for name in deps):
+                if parallel:
+                    continue
+                break # Sequential: keep the order of STAGES
+            if running and not parallel:
+                break
+            pending.remove(stage)
+
+            current = fingerprint(stage)
+            reason = "forced" if stage.name in forced else stale_reason(stage, current, state.get(stage.name))
+            if reason is None:
+                print(f"✅ Stage {stage.name} ({stage.script}) is up to date.")
+                done.add(stage.name)
+                timings[stage.name] = StageTiming(status="up to date")
+                continue
+            missing_inputs = [path for path in stage.inputs if current["inputs"][path] is None]
+            if missing_inputs:
+                for path in missing_inputs:
+                    hint = f" (run stage {produced_by[path]} first)" if path in produced_by else ""
+                    print(f"❌ Stage {stage.name} ({stage.script}) needs '{path}', which does not exist{hint}.")
+                failed.add(stage.name)
+                timings[stage.name] = StageTiming(status="failed")
+                continue
+
+            log_path = os.path.join(PIPELINE_LOG_DIR, f"{os.path.splitext(stage.script)[0]}.log") if parallel else None
+            print(f"▶️ Stage {stage.name} ({stage.script}): {reason}." + (f" Output in '{log_path}'." if log_path else ""))
+            timings[stage.name] = StageTiming(started=elapsed(), status="running")
+            running[pool.submit(run_stage, stage, log_path)] = (stage, current)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(stages))) as pool:
+        start_ready_stages(pool)
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, current = running.pop(future)
+                timing = timings[stage.name]
+                timing.finished = elapsed()
+                if future.result():
+                    record_run(state, stage, current)
+                    done.add(stage.name)
+                    timing.status = "ran"
+                    print(f"💾 Stage {stage.name} finished in {timing.finished - timing.started:.1f}s.")
+                else:
+                    failed.add(stage.name)
+                    timing.status = "failed"
+            start_ready_stages(pool)
+
+    if any(timing.started is not None for timing in timings.values()):
+        print_timeline(stages, timings, dependencies, elapsed(), parallel)
+    if failed:
+        print(f"\n❌ Pipeline stopped; failed or skipped stages: {', '.join(sorted(failed))}.")
+        sys.exit(1)
+    print("\n🎉 Pipeline is up to date.")
+
+
+if __name__ == "__main__":
+    stage_names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Run scripts 1-7, skipping stages whose outputs are up to date.")
+    parser.add_argument("--stages", default=",".join(stage_names), help="Comma-separated stages to consider (default: all).")
+    parser.add_argument("--force", default="", help="Comma-separated stages to run even if they are up to date.")
+    parser.add_argument("--dry-run", action="store_true", help="Only print which stages would run and why.")
+    parser.add_argument("--parallel", action="store_true",
+                        help=f"Run independent stages at the same time (each stage's output goes to '{PIPELINE_LOG_DIR}/').")
+    parser.add_argument("--mark-current", action="store_true", help="Record the selected stages' existing files as up to date, without running them.")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.stages.split(",") if name.strip()]
+    forced = [name.strip() for name in args.force.split(",") if name.strip()]
+    unknown = sorted(set(selected + forced) - set(stage_names))
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(stage_names)})")
+    os.chdir(HERE)
+    if args.mark_current:
+        mark_current([stage for stage in STAGES if stage.name in selected])
+    else:
+        main(selected, forced, args.dry_run, args.parallel)
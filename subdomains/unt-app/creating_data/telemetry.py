@@ -0,0 +1,245 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional, Sequence
+
+# --- Module Overview ---
+# Shared run telemetry for the scraping scripts (1, 2, 3 and 6).
+#
+# fetcher.py records every request (latency, status code, bytes received) and every cache hit or
+# "304 Not Modified" per host; the scripts record retries and how long parsing each page took.
+# At the end of a run, write_reports() writes two files to TELEMETRY_DIR:
+#   <stage>.json  the full run report (per-host counters and histograms, parse time, duration)
+#   <stage>.prom  the same numbers in Prometheus text format, e.g. for node_exporter's textfile
+#                 collector, so slow or failing runs can be graphed and alerted on
+#
+# Usage: call start_stage("<script name>") at the start of a run and write_reports() at the end;
+# everything in between is picked up through the module-level record_*() functions.
+# --- End Module Overview ---
+
+# --- Configuration ---
+TELEMETRY_DIR = "telemetry"
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+METRIC_PREFIX = "unt_scraper"
+# --- End Configuration ---
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style) plus sum and count."""
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None if empty or in +Inf)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self) -> Dict:
+        return {
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)},
+            "sum": round(self.sum, 6),
+            "count": self.count,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class HostMetrics:
+    """Counters and latency histogram for one host."""
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.status_codes = Counter() # "200", "503", ... and "error" for timeouts/connection errors, also while reading the body
+        self.bytes_received = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.not_modified = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.latency.count,
+            "status_codes": dict(self.status_codes),
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "not_modified": self.not_modified,
+            "latency_seconds": self.latency.to_dict(),
+        }
+
+
+class Telemetry:
+    """Everything recorded during one run of one stage. Safe to record into from worker threads."""
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started_at = time.time()
+        self.hosts: Dict[str, HostMetrics] = {}
+        self.parse_time = Histogram(PARSE_BUCKETS)
+        self._lock = threading.Lock()
+
+    def host(self, host: str) -> HostMetrics:
+        if host not in self.hosts:
+            self.hosts[host] = HostMetrics()
+        return self.hosts[host]
+
+    def record_request(self, host: str, status: Optional[int], latency: float, nbytes: int = 0):
+        with self._lock:
+            metrics = self.host(host)
+            metrics.latency.observe(latency)
+            metrics.status_codes[str(status) if status is not None else "error"] += 1
+            metrics.bytes_received += nbytes
+
+    def record_cache_hit(self, host: str):
+        with self._lock:
+            self.host(host).cache_hits += 1
+
+    def record_not_modified(self, host: str):
+        with self._lock:
+            self.host(host).not_modified += 1
+
+    def record_retry(self, host: str):
+        with self._lock:
+            self.host(host).retries += 1
+
+    def record_parse(self, seconds: float):
+        with self._lock:
+            self.parse_time.observe(seconds)
+
+    def report(self) -> Dict:
+        with self._lock:
+            return {
+                "stage": self.stage,
+                "started_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started_at)),
+                "duration_seconds": round(time.time() - self.started_at, 3),
+                "hosts": {host: metrics.to_dict() for host, metrics in self.hosts.items()},
+                "parse_seconds": self.parse_time.to_dict(),
+            }
+
+    def prometheus_text(self) -> str:
+        """The report in Prometheus text exposition format."""
+        report = self.report()
+        stage = _label_value(self.stage)
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+
+        def histogram(name, labels, data):
+            cumulative = 0
+            for bound, count in data["buckets"].items():
+                cumulative += count
+                lines.append(f'{METRIC_PREFIX}_{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{METRIC_PREFIX}_{name}_sum{{{labels}}} {data['sum']}")
+            lines.append(f"{METRIC_PREFIX}_{name}_count{{{labels}}} {data['count']}")
+
+        metric("stage_duration_seconds", "gauge", "Wall time of the last run of the stage.")
+        lines.append(f'{METRIC_PREFIX}_stage_duration_seconds{{stage="{stage}"}} {report["duration_seconds"]}')
+        metric("stage_last_run_timestamp_seconds", "gauge", "Unix time the last run of the stage started.")
+        lines.append(f'{METRIC_PREFIX}_stage_last_run_timestamp_seconds{{stage="{stage}"}} {round(self.started_at, 3)}')
+
+        metric("requests_total", "counter", "HTTP requests sent, by response status (error = timeout/connection error, including while reading the body).")
+        for host, data in report["hosts"].items():
+            for status, count in sorted(data["status_codes"].items()):
+                lines.append(f'{METRIC_PREFIX}_requests_total{{stage="{stage}",host="{_label_value(host)}",status="{status}"}} {count}')
+        for name, key, help_text in [
+            ("response_bytes_total", "bytes_received", "Response body bytes received."),
+            ("retries_total", "retries", "Requests retried after a failure."),
+            ("cache_hits_total", "cache_hits", "Pages served from the HTTP cache without a request."),
+            ("not_modified_total", "not_modified", "Cached pages revalidated with a 304 response."),
+        ]:
+            metric(name, "counter", help_text)
+            for host, data in report["hosts"].items():
+                lines.append(f'{METRIC_PREFIX}_{name}{{stage="{stage}",host="{_label_value(host)}"}} {data[key]}')
+
+        metric("request_duration_seconds", "histogram", "Time from sending a request to receiving its response.")
+        for host, data in report["hosts"].items():
+            histogram("request_duration_seconds", f'stage="{stage}",host="{_label_value(host)}"', data["latency_seconds"])
+        metric("parse_duration_seconds", "histogram", "Time spent parsing one page.")
+        histogram("parse_duration_seconds", f'stage="{stage}"', report["parse_seconds"])
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, directory: str = TELEMETRY_DIR):
+        """Writes <stage>.json and <stage>.prom to `directory`. Returns the two paths."""
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{self.stage}.json")
+        prom_path = os.path.join(directory, f"{self.stage}.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        # Write then rename, so a collector never reads a half-written file
+        with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(prom_path + ".tmp", prom_path)
+        return json_path, prom_path
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_current = Telemetry(os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0])
+
+
+def start_stage(stage: str) -> Telemetry:
+    """Starts recording a new run of `stage`; later record_*() calls go to it."""
+    global _current
+    _current = Telemetry(stage)
+    return _current
+
+
+def current() -> Telemetry:
+    return _current
+
+
+def record_request(host: str, status: Optional[int], latency: float, nbytes: int = 0):
+    _current.record_request(host, status, latency, nbytes)
+
+
+def record_cache_hit(host: str):
+    _current.record_cache_hit(host)
+
+
+def record_not_modified(host: str):
+    _current.record_not_modified(host)
+
+
+def record_retry(host: str):
+    _current.record_retry(host)
+
+
+def record_parse(seconds: float):
+    _current.record_parse(seconds)
+
+
+def timed_parse(parse, *args):
+    """Calls parse(*args) and records the time it took as one page parse. Safe to run in a worker thread."""
+    started = time.perf_counter()
+    try:
+        return parse(*args)
+    finally:
+        record_parse(time.perf_counter() - started)
+
+
+def write_reports():
+    """Writes the current stage's JSON and Prometheus reports and prints where they went."""
+    json_path, prom_path = _current.write_reports()
+    print(f"📈 Telemetry written to '{json_path}' and '{prom_path}'.")